@@ -13,8 +13,7 @@ from app.database import Base
 from app.config import settings
 
 # Import all models so Alembic can detect them
-# TODO: Import models as they are created
-# from app.models import winery, wine, scraper
+from app.models import winery, wine, scraper  # noqa: F401
 
 # this is the Alembic Config object
 config = context.config
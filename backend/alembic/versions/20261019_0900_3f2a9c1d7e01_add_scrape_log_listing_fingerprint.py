@@ -0,0 +1,31 @@
+"""add listing fingerprint to scrape_logs
+
+Revision ID: 3f2a9c1d7e01
+Revises: 
+Create Date: 2026-10-19 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7e01'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scrape_logs', sa.Column('listing_fingerprint', sa.String(64), nullable=True))
+    # Change gating looks up the latest successful run per winery
+    op.create_index(
+        'idx_scrape_logs_winery_finished',
+        'scrape_logs',
+        ['winery_id', 'status', 'scrape_finished_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_scrape_logs_winery_finished', table_name='scrape_logs')
+    op.drop_column('scrape_logs', 'listing_fingerprint')
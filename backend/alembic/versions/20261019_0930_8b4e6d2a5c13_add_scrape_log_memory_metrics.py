@@ -0,0 +1,26 @@
+"""add browser memory metrics to scrape_logs
+
+Revision ID: 8b4e6d2a5c13
+Revises: 3f2a9c1d7e01
+Create Date: 2026-10-19 09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d2a5c13'
+down_revision = '3f2a9c1d7e01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scrape_logs', sa.Column('peak_rss_mb', sa.Float(), nullable=True))
+    op.add_column('scrape_logs', sa.Column('contexts_recycled', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scrape_logs', 'contexts_recycled')
+    op.drop_column('scrape_logs', 'peak_rss_mb')
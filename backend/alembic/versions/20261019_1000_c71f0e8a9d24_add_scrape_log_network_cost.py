@@ -0,0 +1,34 @@
+"""add network cost metrics to scrape_logs
+
+Revision ID: c71f0e8a9d24
+Revises: 8b4e6d2a5c13
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71f0e8a9d24'
+down_revision = '8b4e6d2a5c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scrape_logs', sa.Column('network_requests', sa.Integer(), nullable=True))
+    op.add_column('scrape_logs', sa.Column('network_bytes', sa.BigInteger(), nullable=True))
+    op.add_column('scrape_logs', sa.Column('network_cache_hits', sa.Integer(), nullable=True))
+    op.add_column('scrape_logs', sa.Column('network_blocked', sa.Integer(), nullable=True))
+    op.add_column('scrape_logs', sa.Column('network_failed', sa.Integer(), nullable=True))
+    op.add_column('scrape_logs', sa.Column('network_heaviest_pages', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scrape_logs', 'network_heaviest_pages')
+    op.drop_column('scrape_logs', 'network_failed')
+    op.drop_column('scrape_logs', 'network_blocked')
+    op.drop_column('scrape_logs', 'network_cache_hits')
+    op.drop_column('scrape_logs', 'network_bytes')
+    op.drop_column('scrape_logs', 'network_requests')
@@ -0,0 +1,26 @@
+"""add deferred pages to scrape_logs
+
+Revision ID: d95a3b7c2e46
+Revises: c71f0e8a9d24
+Create Date: 2026-10-19 10:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd95a3b7c2e46'
+down_revision = 'c71f0e8a9d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scrape_logs', sa.Column('pages_deferred', sa.Integer(), nullable=True))
+    op.add_column('scrape_logs', sa.Column('deferred_urls', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scrape_logs', 'deferred_urls')
+    op.drop_column('scrape_logs', 'pages_deferred')
@@ -0,0 +1,48 @@
+"""add wine identity key (winery, normalized name, vintage)
+
+Revision ID: e3c8f1a6b902
+Revises: d95a3b7c2e46
+Create Date: 2026-10-19 11:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3c8f1a6b902'
+down_revision = 'd95a3b7c2e46'
+branch_labels = None
+depends_on = None
+
+IDENTITY = "winery_id, lower(btrim(regexp_replace(name, '[ \\t\\n\\r\\f\\v]+', ' ', 'g'))), coalesce(vintage, '')"
+
+
+def upgrade() -> None:
+    # Existing duplicates would block the unique index. Keep one row per
+    # identity (live > available > most recently seen > oldest), move the
+    # others' price history onto it, then delete them.
+    op.execute(f"""
+        CREATE TEMP TABLE wine_duplicates AS
+        SELECT id, first_value(id) OVER (
+                   PARTITION BY {IDENTITY}
+                   ORDER BY (status = 'live') DESC, is_available DESC,
+                            last_seen_at DESC NULLS LAST, id
+               ) AS keep_id
+        FROM wines
+    """)
+    op.execute("""
+        UPDATE price_history ph SET wine_id = d.keep_id
+        FROM wine_duplicates d
+        WHERE ph.wine_id = d.id AND d.id <> d.keep_id
+    """)
+    op.execute("""
+        DELETE FROM wines w USING wine_duplicates d
+        WHERE w.id = d.id AND d.id <> d.keep_id
+    """)
+    op.execute("DROP TABLE wine_duplicates")
+
+    op.execute(f"CREATE UNIQUE INDEX uq_wines_identity ON wines ({IDENTITY})")
+
+
+def downgrade() -> None:
+    op.drop_index('uq_wines_identity', table_name='wines')
@@ -0,0 +1,33 @@
+"""backfill price_history from current wine prices
+
+Revision ID: f2d7b4e9a1c5
+Revises: e3c8f1a6b902
+Create Date: 2026-10-19 11:30:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2d7b4e9a1c5'
+down_revision = 'e3c8f1a6b902'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Scrapes only record price changes from now on - give every priced wine
+    # without history a starting point (its current price, as of when it was
+    # last seen)
+    op.execute("""
+        INSERT INTO price_history (wine_id, price, recorded_at)
+        SELECT w.id, w.price, coalesce(w.last_seen_at, w.updated_at, w.created_at, now())
+        FROM wines w
+        WHERE w.price IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM price_history ph WHERE ph.wine_id = w.id)
+    """)
+
+
+def downgrade() -> None:
+    # Backfilled rows can't be told apart from recorded ones - nothing to undo
+    pass
@@ -0,0 +1,37 @@
+"""add catalog_changes feed
+
+Revision ID: a4c9e2f7b318
+Revises: f2d7b4e9a1c5
+Create Date: 2026-10-19 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c9e2f7b318'
+down_revision = 'f2d7b4e9a1c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_changes',
+        sa.Column('version', sa.BigInteger(), primary_key=True),
+        # No foreign key: the feed outlives deleted wines
+        sa.Column('wine_id', sa.Integer(), nullable=False),
+        sa.Column('winery_id', sa.Integer(), nullable=True),
+        sa.Column('change_type', sa.String(20), nullable=False),
+        sa.Column('old_value', sa.String(100), nullable=True),
+        sa.Column('new_value', sa.String(100), nullable=True),
+        sa.Column('source', sa.String(20), nullable=False),
+        sa.Column('changed_at', sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_index('ix_catalog_changes_wine_id', 'catalog_changes', ['wine_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_catalog_changes_wine_id', table_name='catalog_changes')
+    op.drop_table('catalog_changes')
@@ -0,0 +1,36 @@
+"""add wine archive tables and archivable-wines index
+
+Revision ID: b8e3d5a1c607
+Revises: a4c9e2f7b318
+Create Date: 2026-10-19 12:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e3d5a1c607'
+down_revision = 'a4c9e2f7b318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # archive_wines.py picks the longest-unavailable wines
+    op.execute("CREATE INDEX ix_wines_archivable ON wines (last_seen_at) WHERE is_available = false")
+
+    # Cold storage for archive_wines.py --move: same columns, no indexes or
+    # constraints beyond the primary key, plus when the row was moved
+    op.execute("CREATE TABLE wines_archive (LIKE wines INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE wines_archive ADD PRIMARY KEY (id)")
+    op.add_column('wines_archive', sa.Column('archived_at', sa.TIMESTAMP(), nullable=True))
+    op.execute("CREATE TABLE price_history_archive (LIKE price_history INCLUDING DEFAULTS)")
+    op.create_index('ix_price_history_archive_wine_id', 'price_history_archive', ['wine_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_price_history_archive_wine_id', table_name='price_history_archive')
+    op.drop_table('price_history_archive')
+    op.drop_table('wines_archive')
+    op.execute("DROP INDEX ix_wines_archivable")
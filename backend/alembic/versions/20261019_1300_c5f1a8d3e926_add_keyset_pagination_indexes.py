@@ -0,0 +1,27 @@
+"""add composite index for keyset pagination
+
+Revision ID: c5f1a8d3e926
+Revises: b8e3d5a1c607
+Create Date: 2026-10-19 13:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f1a8d3e926'
+down_revision = 'b8e3d5a1c607'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GET /api/wines pages live wines by (name, id)
+    op.execute(
+        "CREATE INDEX ix_wines_live_name_id ON wines (name, id) "
+        "WHERE status = 'live' AND is_available = true"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX ix_wines_live_name_id")
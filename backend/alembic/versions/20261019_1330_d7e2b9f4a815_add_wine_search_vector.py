@@ -0,0 +1,38 @@
+"""add stored search_vector column for full-text wine search
+
+Revision ID: d7e2b9f4a815
+Revises: c5f1a8d3e926
+Create Date: 2026-10-19 13:30:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e2b9f4a815'
+down_revision = 'c5f1a8d3e926'
+branch_labels = None
+depends_on = None
+
+# Same expression as app.models.wine.WINE_SEARCH_VECTOR_SQL at this revision
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(variety, '') || ' ' || coalesce(vintage, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute(f"ALTER TABLE wines ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED")
+    op.execute("CREATE INDEX ix_wines_search_vector ON wines USING gin (search_vector)")
+    # The schema.sql expression index was never used by a query; the column replaces it
+    op.execute("DROP INDEX IF EXISTS idx_wines_search")
+
+
+def downgrade() -> None:
+    op.execute(
+        "CREATE INDEX idx_wines_search ON wines "
+        "USING gin(to_tsvector('english', name || ' ' || COALESCE(description, '')))"
+    )
+    op.execute("DROP INDEX ix_wines_search_vector")
+    op.execute("ALTER TABLE wines DROP COLUMN search_vector")
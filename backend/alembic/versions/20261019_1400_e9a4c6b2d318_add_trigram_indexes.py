@@ -0,0 +1,32 @@
+"""add pg_trgm trigram indexes for fuzzy search
+
+Revision ID: e9a4c6b2d318
+Revises: d7e2b9f4a815
+Create Date: 2026-10-19 14:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9a4c6b2d318'
+down_revision = 'd7e2b9f4a815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # pg_trgm ships with PostgreSQL (contrib); creating it needs a superuser or
+    # database owner on PG 13+ (it is a trusted extension)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Fuzzy search (app/services/fuzzy_search.py); also serve ILIKE '%term%'
+    op.execute("CREATE INDEX ix_wines_name_trgm ON wines USING gin (name gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_wines_variety_trgm ON wines USING gin (variety gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_wineries_name_trgm ON wineries USING gin (name gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX ix_wineries_name_trgm")
+    op.execute("DROP INDEX ix_wines_variety_trgm")
+    op.execute("DROP INDEX ix_wines_name_trgm")
+    # The extension is left installed - other objects may depend on it
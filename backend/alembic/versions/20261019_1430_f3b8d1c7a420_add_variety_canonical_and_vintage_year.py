@@ -0,0 +1,109 @@
+"""add canonical variety, vintage year and non-vintage columns
+
+Revision ID: f3b8d1c7a420
+Revises: e9a4c6b2d318
+Create Date: 2026-10-19 14:30:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d1c7a420'
+down_revision = 'e9a4c6b2d318'
+branch_labels = None
+depends_on = None
+
+# Same expressions as app.models.wine (app.scrapers.varieties.VARIETY_PATTERNS)
+# at this revision: (canonical name, whole-word regex of its spellings). A
+# variety matching exactly one is renamed; blends and unknown names are kept
+# as stored (trimmed).
+PATTERNS = [
+    ('Shiraz', r'(^|[^a-z0-9à-ÿ])(shiraz|syrah)($|[^a-z0-9à-ÿ])'),
+    ('Riesling', r'(^|[^a-z0-9à-ÿ])(riesling)($|[^a-z0-9à-ÿ])'),
+    ('Chardonnay', r'(^|[^a-z0-9à-ÿ])(chardonnay)($|[^a-z0-9à-ÿ])'),
+    ('Pinot Noir', r'(^|[^a-z0-9à-ÿ])(pinot\s+noir)($|[^a-z0-9à-ÿ])'),
+    ('Cabernet Sauvignon', r'(^|[^a-z0-9à-ÿ])(cabernet\s+sauvignon|cabernet(?!\s+franc))($|[^a-z0-9à-ÿ])'),
+    ('Merlot', r'(^|[^a-z0-9à-ÿ])(merlot)($|[^a-z0-9à-ÿ])'),
+    ('Tempranillo', r'(^|[^a-z0-9à-ÿ])(tempranillo)($|[^a-z0-9à-ÿ])'),
+    ('Viognier', r'(^|[^a-z0-9à-ÿ])(viognier)($|[^a-z0-9à-ÿ])'),
+    ('Sangiovese', r'(^|[^a-z0-9à-ÿ])(sangiovese)($|[^a-z0-9à-ÿ])'),
+    ('Pinot Gris', r'(^|[^a-z0-9à-ÿ])(pinot\s+gris|pinot\s+grigio)($|[^a-z0-9à-ÿ])'),
+    ('Sauvignon Blanc', r'(^|[^a-z0-9à-ÿ])(sauvignon\s+blanc|sauv\s+blanc|savvy\s+b|sav\s+blanc)($|[^a-z0-9à-ÿ])'),
+    ('Semillon', r'(^|[^a-z0-9à-ÿ])(semillon)($|[^a-z0-9à-ÿ])'),
+    ('Gewurztraminer', r'(^|[^a-z0-9à-ÿ])(gewurztraminer)($|[^a-z0-9à-ÿ])'),
+    ('Cabernet Franc', r'(^|[^a-z0-9à-ÿ])(cabernet\s+franc)($|[^a-z0-9à-ÿ])'),
+    ('Malbec', r'(^|[^a-z0-9à-ÿ])(malbec)($|[^a-z0-9à-ÿ])'),
+    ('Grenache', r'(^|[^a-z0-9à-ÿ])(grenache)($|[^a-z0-9à-ÿ])'),
+    ('Mourvedre', r'(^|[^a-z0-9à-ÿ])(mourvedre)($|[^a-z0-9à-ÿ])'),
+    ('Marsanne', r'(^|[^a-z0-9à-ÿ])(marsanne)($|[^a-z0-9à-ÿ])'),
+    ('Roussanne', r'(^|[^a-z0-9à-ÿ])(roussanne)($|[^a-z0-9à-ÿ])'),
+    ('Vermentino', r'(^|[^a-z0-9à-ÿ])(vermentino)($|[^a-z0-9à-ÿ])'),
+    ('Fiano', r'(^|[^a-z0-9à-ÿ])(fiano)($|[^a-z0-9à-ÿ])'),
+    ('Arneis', r'(^|[^a-z0-9à-ÿ])(arneis)($|[^a-z0-9à-ÿ])'),
+    ('Nebbiolo', r'(^|[^a-z0-9à-ÿ])(nebbiolo)($|[^a-z0-9à-ÿ])'),
+    ('Montepulciano', r'(^|[^a-z0-9à-ÿ])(montepulciano)($|[^a-z0-9à-ÿ])'),
+    ('Barbera', r'(^|[^a-z0-9à-ÿ])(barbera)($|[^a-z0-9à-ÿ])'),
+    ('Zinfandel', r'(^|[^a-z0-9à-ÿ])(zinfandel)($|[^a-z0-9à-ÿ])'),
+    ('Petit Verdot', r'(^|[^a-z0-9à-ÿ])(petit\s+verdot)($|[^a-z0-9à-ÿ])'),
+    ('Rosé', r'(^|[^a-z0-9à-ÿ])(rose|rosé)($|[^a-z0-9à-ÿ])'),
+    ('Sparkling', r'(^|[^a-z0-9à-ÿ])(sparkling)($|[^a-z0-9à-ÿ])'),
+    ('Blanc de Blancs', r'(^|[^a-z0-9à-ÿ])(blanc\s+de\s+blancs|blanc\s+de\s+blanc)($|[^a-z0-9à-ÿ])'),
+    ('Blanc de Noirs', r'(^|[^a-z0-9à-ÿ])(blanc\s+de\s+noirs)($|[^a-z0-9à-ÿ])'),
+    ('Prosecco', r'(^|[^a-z0-9à-ÿ])(prosecco)($|[^a-z0-9à-ÿ])'),
+    ('Methode Traditionnelle', r'(^|[^a-z0-9à-ÿ])(methode\s+traditionnelle)($|[^a-z0-9à-ÿ])'),
+    ('Champagne', r'(^|[^a-z0-9à-ÿ])(champagne)($|[^a-z0-9à-ÿ])'),
+    ('Moscato', r'(^|[^a-z0-9à-ÿ])(moscato)($|[^a-z0-9à-ÿ])'),
+    ('Grüner Veltliner', r'(^|[^a-z0-9à-ÿ])(gruner\s+veltliner|grüner\s+veltliner)($|[^a-z0-9à-ÿ])'),
+    ('Chenin Blanc', r'(^|[^a-z0-9à-ÿ])(chenin\s+blanc)($|[^a-z0-9à-ÿ])'),
+    ('Verdelho', r'(^|[^a-z0-9à-ÿ])(verdelho)($|[^a-z0-9à-ÿ])'),
+    ('Savagnin', r'(^|[^a-z0-9à-ÿ])(savagnin)($|[^a-z0-9à-ÿ])'),
+    ('Petit Manseng', r'(^|[^a-z0-9à-ÿ])(petit\s+manseng)($|[^a-z0-9à-ÿ])'),
+    ('Albariño', r'(^|[^a-z0-9à-ÿ])(albarino|albariño)($|[^a-z0-9à-ÿ])'),
+    ('Gamay', r'(^|[^a-z0-9à-ÿ])(gamay)($|[^a-z0-9à-ÿ])'),
+    ("Nero d'Avola", r"(^|[^a-z0-9à-ÿ])(nero\s+d'avola)($|[^a-z0-9à-ÿ])"),
+    ('Aglianico', r'(^|[^a-z0-9à-ÿ])(aglianico)($|[^a-z0-9à-ÿ])'),
+    ('Graciano', r'(^|[^a-z0-9à-ÿ])(graciano)($|[^a-z0-9à-ÿ])'),
+    ('Tannat', r'(^|[^a-z0-9à-ÿ])(tannat)($|[^a-z0-9à-ÿ])'),
+    ('Carménère', r'(^|[^a-z0-9à-ÿ])(carmenere|carménère)($|[^a-z0-9à-ÿ])'),
+    ('Touriga Nacional', r'(^|[^a-z0-9à-ÿ])(touriga\s+nacional)($|[^a-z0-9à-ÿ])'),
+    ('Primitivo', r'(^|[^a-z0-9à-ÿ])(primitivo)($|[^a-z0-9à-ÿ])'),
+    ('Dolcetto', r'(^|[^a-z0-9à-ÿ])(dolcetto)($|[^a-z0-9à-ÿ])'),
+    ('Cortese', r'(^|[^a-z0-9à-ÿ])(cortese)($|[^a-z0-9à-ÿ])'),
+    ('Verdicchio', r'(^|[^a-z0-9à-ÿ])(verdicchio)($|[^a-z0-9à-ÿ])'),
+]
+
+
+def _quote(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def _variety_canonical_sql() -> str:
+    matches = [(canonical, f"variety ~* '{_quote(pattern)}'") for canonical, pattern in PATTERNS]
+    found = ' + '.join(f"({match})::int" for _, match in matches)
+    whens = ' '.join(f"WHEN {match} THEN '{_quote(canonical)}'" for canonical, match in matches)
+    return f"CASE WHEN {found} = 1 THEN CASE {whens} END ELSE nullif(btrim(variety), '') END"
+
+
+VARIETY_CANONICAL_SQL = _variety_canonical_sql()
+VINTAGE_YEAR_SQL = "CASE WHEN btrim(vintage) ~ '^[0-9]{4}$' THEN btrim(vintage)::integer END"
+NON_VINTAGE_SQL = "coalesce(upper(btrim(vintage)) = 'NV', false)"
+
+
+def upgrade() -> None:
+    op.execute(
+        f"ALTER TABLE wines "
+        f"ADD COLUMN variety_canonical varchar(100) GENERATED ALWAYS AS ({VARIETY_CANONICAL_SQL}) STORED, "
+        f"ADD COLUMN vintage_year integer GENERATED ALWAYS AS ({VINTAGE_YEAR_SQL}) STORED, "
+        f"ADD COLUMN is_non_vintage boolean NOT NULL GENERATED ALWAYS AS ({NON_VINTAGE_SQL}) STORED"
+    )
+    op.execute("CREATE INDEX ix_wines_variety_canonical ON wines (variety_canonical)")
+    op.execute("CREATE INDEX ix_wines_vintage_year ON wines (vintage_year)")
+    op.execute("CREATE INDEX ix_wines_non_vintage ON wines (id) WHERE is_non_vintage")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX ix_wines_non_vintage")
+    op.execute("DROP INDEX ix_wines_vintage_year")
+    op.execute("DROP INDEX ix_wines_variety_canonical")
+    op.execute("ALTER TABLE wines DROP COLUMN is_non_vintage, DROP COLUMN vintage_year, DROP COLUMN variety_canonical")
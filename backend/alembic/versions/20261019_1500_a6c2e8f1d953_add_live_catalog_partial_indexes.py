@@ -0,0 +1,33 @@
+"""add partial indexes for live-catalog filters
+
+Revision ID: a6c2e8f1d953
+Revises: f3b8d1c7a420
+Create Date: 2026-10-19 15:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c2e8f1d953'
+down_revision = 'f3b8d1c7a420'
+branch_labels = None
+depends_on = None
+
+LIVE = "WHERE status = 'live' AND is_available = true"
+
+
+def upgrade() -> None:
+    # Covers the facet columns: whole-catalog counts become index-only scans
+    op.execute(
+        "CREATE INDEX ix_wines_live_winery_name_id ON wines (winery_id, name, id) "
+        f"INCLUDE (variety_canonical, vintage, price) {LIVE}"
+    )
+    op.execute(f"CREATE INDEX ix_wines_live_variety_name_id ON wines (variety_canonical, name, id) {LIVE}")
+    op.execute(f"CREATE INDEX ix_wines_live_price_id ON wines (price, id) {LIVE}")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX ix_wines_live_price_id")
+    op.execute("DROP INDEX ix_wines_live_variety_name_id")
+    op.execute("DROP INDEX ix_wines_live_winery_name_id")
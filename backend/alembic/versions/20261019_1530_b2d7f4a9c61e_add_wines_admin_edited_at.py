@@ -0,0 +1,25 @@
+"""add wines.admin_edited_at
+
+Revision ID: b2d7f4a9c61e
+Revises: a6c2e8f1d953
+Create Date: 2026-10-19 15:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d7f4a9c61e'
+down_revision = 'a6c2e8f1d953'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Last admin edit of name / variety / vintage / description (reextract.py leaves those alone)
+    op.add_column('wines', sa.Column('admin_edited_at', sa.TIMESTAMP(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('wines', 'admin_edited_at')
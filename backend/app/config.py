@@ -15,6 +15,10 @@ class Settings(BaseSettings):
         alias="DATABASE_URL"
     )
     
+    # Most connections one process (API worker, scraper, script) opens, sync and
+    # async pools together (see app/database.py)
+    db_max_connections: int = Field(default=30, alias="DB_MAX_CONNECTIONS")
+    
     # API
     api_host: str = Field(default="0.0.0.0", alias="API_HOST")
     api_port: int = Field(default=8000, alias="API_PORT")
@@ -32,6 +36,46 @@ class Settings(BaseSettings):
     admin_username: str = Field(default="admin", alias="ADMIN_USERNAME")
     admin_password: str = Field(default="admin123", alias="ADMIN_PASSWORD")
     
+    # Scraper
+    # A winery whose listing fingerprint is unchanged skips its product pages,
+    # but only until the last full scrape is older than this
+    scraper_fingerprint_max_age_hours: int = Field(default=72, alias="SCRAPER_FINGERPRINT_MAX_AGE_HOURS")
+    # Browser lifecycle: recycle contexts after N pages or above the RSS ceiling
+    scraper_parallel_workers: int = Field(default=3, alias="SCRAPER_PARALLEL_WORKERS")
+    scraper_context_max_pages: int = Field(default=50, alias="SCRAPER_CONTEXT_MAX_PAGES")
+    scraper_max_open_pages: int = Field(default=4, alias="SCRAPER_MAX_OPEN_PAGES")
+    scraper_max_rss_mb: int = Field(default=1024, alias="SCRAPER_MAX_RSS_MB")
+    # Shared warm browser (python -m app.scrapers.browser_server); empty = launch per process
+    scraper_browser_endpoint: str = Field(default="", alias="SCRAPER_BROWSER_ENDPOINT")
+    scraper_browser_server_host: str = Field(default="127.0.0.1", alias="SCRAPER_BROWSER_SERVER_HOST")
+    scraper_browser_server_port: int = Field(default=3789, alias="SCRAPER_BROWSER_SERVER_PORT")
+    scraper_browser_server_max_rss_mb: int = Field(default=2048, alias="SCRAPER_BROWSER_SERVER_MAX_RSS_MB")
+    # Raw product page archive for re-extraction (relative paths are under backend/)
+    scraper_archive_enabled: bool = Field(default=True, alias="SCRAPER_ARCHIVE_ENABLED")
+    scraper_archive_dir: str = Field(default="html_archive", alias="SCRAPER_ARCHIVE_DIR")
+    scraper_archive_retention_days: int = Field(default=90, alias="SCRAPER_ARCHIVE_RETENTION_DAYS")
+    # Hybrid mode: use listing card data and only open product pages that need it
+    scraper_hybrid_listing: bool = Field(default=True, alias="SCRAPER_HYBRID_LISTING")
+    # scrape_all.py crawl frontier: stop handing out pages after this many minutes (0 = no deadline);
+    # wines with 2+ distinct prices within SCRAPER_VOLATILITY_DAYS are crawled before stale ones
+    scraper_run_deadline_minutes: int = Field(default=0, alias="SCRAPER_RUN_DEADLINE_MINUTES")
+    scraper_volatility_days: int = Field(default=14, alias="SCRAPER_VOLATILITY_DAYS")
+    # Adaptive navigation timeouts: p99 x 1.5 of each host's latency, within these bounds
+    scraper_latency_stats_file: str = Field(default="scraper_state/host_latency.json", alias="SCRAPER_LATENCY_STATS_FILE")
+    scraper_timeout_min_ms: int = Field(default=5000, alias="SCRAPER_TIMEOUT_MIN_MS")
+    scraper_timeout_max_ms: int = Field(default=90000, alias="SCRAPER_TIMEOUT_MAX_MS")
+    # Scrapes with at least this many wines are saved through a COPY staging table
+    scraper_copy_threshold: int = Field(default=500, alias="SCRAPER_COPY_THRESHOLD")
+    
+    # API: totals of GET /api/wines are reused per filter set for this long (0 = always count)
+    wine_count_cache_seconds: int = Field(default=60, alias="WINE_COUNT_CACHE_SECONDS")
+    # Autocomplete index: checked for catalog changes (and rebuilt) this often
+    suggest_refresh_seconds: int = Field(default=30, alias="SUGGEST_REFRESH_SECONDS")
+    
+    # Maintenance: archive_wines.py archives wines unavailable for longer than this
+    archive_unavailable_after_days: int = Field(default=90, alias="ARCHIVE_UNAVAILABLE_AFTER_DAYS")
+    archive_batch_size: int = Field(default=500, alias="ARCHIVE_BATCH_SIZE")
+    
     # Environment
     environment: str = Field(default="development", alias="ENVIRONMENT")
     
@@ -1,24 +1,76 @@
 """
 Database connection and session management
 """
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
+# Connection budget per process (DB_MAX_CONNECTIONS, pool + overflow of both
+# engines together). Most API reads go through the async engine, so the sync
+# one - admin writes, scrapers, CLI scripts - gets a third of it
+SYNC_MAX_CONNECTIONS = max(2, settings.db_max_connections // 3)
+ASYNC_MAX_CONNECTIONS = max(2, settings.db_max_connections - SYNC_MAX_CONNECTIONS)
+
 # Create database engine
 engine = create_engine(
     settings.database_url,
     connect_args={"client_encoding": "utf8"},
     pool_pre_ping=True,  # Enable connection health checks
-    pool_size=10,  # Maximum number of connections in the pool
-    max_overflow=20,  # Maximum overflow connections
+    pool_size=SYNC_MAX_CONNECTIONS // 2,  # Connections kept open in the pool
+    max_overflow=SYNC_MAX_CONNECTIONS - SYNC_MAX_CONNECTIONS // 2,  # Extra connections under load
     echo=settings.environment == "development"  # Log SQL in development
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> str:
+    """Same database through the asyncpg driver (postgresql:// -> postgresql+asyncpg://)"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Async engine for the public read endpoints: requests wait on the event loop
+# instead of holding a threadpool worker each. Created on first use, so scrapers
+# and CLI scripts (sync only) neither need asyncpg nor open a second pool
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """The process's async engine (created on the first call)"""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            async_database_url(settings.database_url),
+            pool_pre_ping=True,
+            pool_size=ASYNC_MAX_CONNECTIONS // 2,
+            max_overflow=ASYNC_MAX_CONNECTIONS - ASYNC_MAX_CONNECTIONS // 2,
+            echo=settings.environment == "development"
+        )
+        _async_sessionmaker = async_sessionmaker(_async_engine, class_=AsyncSession, expire_on_commit=False)
+    return _async_engine
+
+
+def async_session() -> AsyncSession:
+    """New async session (use as `async with async_session() as db:`)"""
+    get_async_engine()
+    return _async_sessionmaker()
+
+
+async def dispose_async_engine():
+    """Close the async connection pool, if one was opened"""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_sessionmaker = None
+
+
 # Create base class for declarative models
 Base = declarative_base()
 
@@ -36,3 +88,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session
+    Usage in async FastAPI endpoints:
+        @app.get("/endpoint")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(...))
+    
+    No lazy loading on async sessions - load relationships up front
+    (selectinload/joinedload).
+    """
+    async with async_session() as db:
+        yield db
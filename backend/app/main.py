@@ -4,8 +4,9 @@ FastAPI main application for CBR Wine Hunter
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import engine, Base
-from app.routers import wineries, wines, admin
+from app.database import engine, dispose_async_engine, Base
+from app.routers import wineries, wines, admin, search
+from app.services.suggest_index import start_suggest_index, stop_suggest_index
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -29,6 +30,20 @@ app.add_middleware(
 app.include_router(wineries.router)
 app.include_router(wines.router)
 app.include_router(admin.router)
+app.include_router(search.router)
+
+
+@app.on_event("startup")
+async def build_suggest_index():
+    """Build the autocomplete index and keep it in step with the catalog"""
+    await start_suggest_index()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    """Close the async connection pool"""
+    await stop_suggest_index()
+    await dispose_async_engine()
 
 
 @app.get("/")
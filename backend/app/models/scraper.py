@@ -0,0 +1,80 @@
+"""
+Scraper bookkeeping database models
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, TIMESTAMP, Text, ForeignKey, JSON, Float
+from app.database import Base
+from datetime import datetime
+
+
+class ScraperConfig(Base):
+    __tablename__ = "scraper_configs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    winery_id = Column(Integer, ForeignKey('wineries.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # Shop platform: 'shopify', 'woocommerce', 'squarespace', 'wix', 'square',
+    # 'godaddy' or 'generic' - auto-detected on first scrape (see scrapers/platforms.py)
+    platform_type = Column(String(50))
+
+    requires_javascript = Column(Boolean, default=False)
+    product_list_url = Column(Text)
+    product_url_pattern = Column(Text)
+    selectors = Column(JSON)
+    pagination_config = Column(JSON)
+    notes = Column(Text)
+    is_active = Column(Boolean, default=True, index=True)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ScraperConfig {self.winery_id} {self.platform_type}>"
+
+
+class ScrapeLog(Base):
+    __tablename__ = "scrape_logs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    winery_id = Column(Integer, ForeignKey('wineries.id', ondelete='CASCADE'), index=True)
+    scrape_started_at = Column(TIMESTAMP)
+    scrape_finished_at = Column(TIMESTAMP)
+
+    # Run outcome: 'success', 'unchanged', 'partial', 'deferred', 'failed'
+    # - success: listing + product pages scraped and saved
+    # - unchanged: listing fingerprint matched the last full scrape, product pages skipped
+    # - partial: run deadline hit - some product pages deferred (see deferred_urls)
+    # - deferred: run deadline hit before the listing was loaded
+    # - failed: scrape raised or found no wines
+    status = Column(String(50), index=True)
+
+    wines_found = Column(Integer, default=0)
+    wines_added = Column(Integer, default=0)
+    wines_updated = Column(Integer, default=0)
+    wines_removed = Column(Integer, default=0)
+    error_message = Column(Text)
+    flagged_for_review = Column(Boolean, default=False)
+    flagged_products = Column(JSON)
+
+    # SHA-256 of the listing page's product URL set + listing prices
+    listing_fingerprint = Column(String(64))
+
+    # Browser memory metrics for the run (see scrapers/browser_pool.py)
+    peak_rss_mb = Column(Float)
+    contexts_recycled = Column(Integer)
+    
+    # Product pages left unvisited when the run deadline passed (scrape_all.py)
+    pages_deferred = Column(Integer)
+    deferred_urls = Column(JSON)
+    
+    # Network cost of the run, all pages (see scrapers/network_stats.py)
+    network_requests = Column(Integer)
+    network_bytes = Column(BigInteger)
+    network_cache_hits = Column(Integer)
+    network_blocked = Column(Integer)
+    network_failed = Column(Integer)
+    # Most expensive pages: [{"url", "requests", "bytes", ...}]
+    network_heaviest_pages = Column(JSON)
+
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ScrapeLog {self.winery_id} {self.status} @ {self.scrape_started_at}>"
@@ -1,14 +1,70 @@
 """
 Wine database model
 """
-from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, DECIMAL, Text, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, TIMESTAMP, DECIMAL, Text, ForeignKey, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.scrapers.varieties import variety_canonical_sql
 from datetime import datetime
 
 
+# Identity of a wine within its winery: (winery_id, normalized name, vintage).
+# Name normalization matches app.services.wine_service.identity_key
+# (case-insensitive, whitespace runs collapsed to a space, then trimmed); no
+# vintage is ''. The whitespace class is spelled out rather than \s, whose
+# meaning depends on the database locale.
+# Used verbatim as ON CONFLICT targets, so keep in sync with uq_wines_identity.
+WINE_NAME_KEY_SQL = "lower(btrim(regexp_replace(name, '[ \\t\\n\\r\\f\\v]+', ' ', 'g')))"
+WINE_VINTAGE_KEY_SQL = "coalesce(vintage, '')"
+
+# Full-text search document (app.services.wine_search): name ranks above
+# variety/vintage above description
+WINE_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(variety, '') || ' ' || coalesce(vintage, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+# Filterable forms of variety and vintage (indexed; the raw columns are kept as
+# scraped): one name per variety (app/scrapers/varieties.py), the vintage as a
+# year, and a flag for non-vintage wines
+WINE_VARIETY_CANONICAL_SQL = variety_canonical_sql('variety')
+WINE_VINTAGE_YEAR_SQL = "CASE WHEN btrim(vintage) ~ '^[0-9]{4}$' THEN btrim(vintage)::integer END"
+WINE_NON_VINTAGE_SQL = "coalesce(upper(btrim(vintage)) = 'NV', false)"
+
+# Predicate of the partial indexes for the public catalog (live_wines_query)
+LIVE_WINES_SQL = "status = 'live' AND is_available = true"
+
+
 class Wine(Base):
     __tablename__ = "wines"
+    __table_args__ = (
+        Index('uq_wines_identity', 'winery_id', text(WINE_NAME_KEY_SQL), text(WINE_VINTAGE_KEY_SQL), unique=True),
+        # Candidates for archive_wines.py
+        Index('ix_wines_archivable', 'last_seen_at',
+              postgresql_where=text("is_available = false")),
+        # Keyset pagination (app/services/pagination.py): public list by name,
+        # admin lists page newest first on the primary key
+        Index('ix_wines_live_name_id', 'name', 'id',
+              postgresql_where=text(LIVE_WINES_SQL)),
+        # Public filters, scoped to the live catalog like every public query
+        # (check_query_plans.py): winery / variety pages in name order, price ranges.
+        # The winery index also covers the facet columns, so whole-catalog
+        # counts (facets, vintages) are index-only scans instead of reading
+        # every row with its description
+        Index('ix_wines_live_winery_name_id', 'winery_id', 'name', 'id',
+              postgresql_include=['variety_canonical', 'vintage', 'price'],
+              postgresql_where=text(LIVE_WINES_SQL)),
+        Index('ix_wines_live_variety_name_id', 'variety_canonical', 'name', 'id',
+              postgresql_where=text(LIVE_WINES_SQL)),
+        Index('ix_wines_live_price_id', 'price', 'id',
+              postgresql_where=text(LIVE_WINES_SQL)),
+        Index('ix_wines_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_wines_variety_canonical', 'variety_canonical'),
+        Index('ix_wines_vintage_year', 'vintage_year'),
+        Index('ix_wines_non_vintage', 'id', postgresql_where=text("is_non_vintage")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     winery_id = Column(Integer, ForeignKey('wineries.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -33,9 +89,52 @@ class Wine(Base):
     updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_seen_at = Column(TIMESTAMP, default=datetime.utcnow)
     first_seen_at = Column(TIMESTAMP, default=datetime.utcnow)
+    # Last time an admin edited name / variety / vintage / description by hand -
+    # reextract.py doesn't overwrite those on such wines
+    admin_edited_at = Column(TIMESTAMP)
+    
+    # Maintained by Postgres (generated column) - never written by the app
+    search_vector = Column(TSVECTOR, Computed(WINE_SEARCH_VECTOR_SQL, persisted=True))
+    variety_canonical = Column(String(100), Computed(WINE_VARIETY_CANONICAL_SQL, persisted=True))
+    vintage_year = Column(Integer, Computed(WINE_VINTAGE_YEAR_SQL, persisted=True))
+    is_non_vintage = Column(Boolean, Computed(WINE_NON_VINTAGE_SQL, persisted=True), nullable=False)
     
     # Relationship to winery
     winery = relationship("Winery", back_populates="wines")
     
     def __repr__(self):
         return f"<Wine {self.name} ({self.winery_id}) - {self.status}>"
+
+
+class PriceHistory(Base):
+    __tablename__ = "price_history"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    wine_id = Column(Integer, ForeignKey('wines.id', ondelete='CASCADE'), nullable=False, index=True)
+    price = Column(DECIMAL(10, 2), nullable=False)
+    recorded_at = Column(TIMESTAMP, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<PriceHistory {self.wine_id} ${self.price} @ {self.recorded_at}>"
+
+
+class CatalogChange(Base):
+    """
+    Append-only feed of wine changes, read by version (see app/services/catalog_changes.py)
+    
+    change_type: 'new', 'price', 'availability' or 'status' ('deleted' is a status)
+    wine_id has no foreign key so the feed outlives deleted wines.
+    """
+    __tablename__ = "catalog_changes"
+    
+    version = Column(BigInteger, primary_key=True)
+    wine_id = Column(Integer, nullable=False, index=True)
+    winery_id = Column(Integer)
+    change_type = Column(String(20), nullable=False)
+    old_value = Column(String(100))
+    new_value = Column(String(100))
+    source = Column(String(20), nullable=False)  # 'scrape', 'admin' or 'archive'
+    changed_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<CatalogChange v{self.version} wine {self.wine_id} {self.change_type}>"
@@ -1,11 +1,10 @@
 """
 Admin API endpoints for manual wine management
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from typing import List, Optional
+from sqlalchemy.orm import Session, contains_eager
+from typing import Optional
 from datetime import datetime
 import secrets
 import os
@@ -13,6 +12,11 @@ import os
 from ..database import get_db
 from ..models.wine import Wine
 from ..models.winery import Winery
+from ..services.pagination import keyset_page, next_page
+from ..services.wine_service import ADMIN_CURATED_FIELDS, flush_manual_wine, identity_conflict
+from ..services.catalog_changes import (
+    changes_since, deleted_wine_change, record_changes, wine_changes, wine_snapshot
+)
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 security = HTTPBasic()
@@ -46,10 +50,15 @@ def list_wines_admin(
     limit: int = 50,
     winery_id: Optional[int] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: Session = Depends(get_db),
     _: str = Depends(verify_admin)
 ):
-    """List all wines with admin details"""
+    """
+    List all wines with admin details (newest id first; pass next_cursor back as cursor)
+    include_total=false skips counting (total is null; use has_more)
+    """
     query = db.query(Wine).join(Winery)
     
     if winery_id:
@@ -58,11 +67,17 @@ def list_wines_admin(
     if search:
         query = query.filter(Wine.name.ilike(f"%{search}%"))
     
-    total = query.count()
-    wines = query.order_by(Wine.id.desc()).offset(skip).limit(limit).all()
+    # wine.winery is filled from the join above instead of one query per wine
+    page = keyset_page(query.options(contains_eager(Wine.winery)), Wine.id, Wine.id, cursor, descending=True)
+    if not cursor:
+        page = page.offset(skip)
+    wines, next_cursor = next_page(page.limit(limit + 1).all(), limit, 'id')
+    total = query.count() if include_total else None
     
     return {
         "total": total,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
         "wines": [
             {
                 "id": wine.id,
@@ -150,7 +165,10 @@ def create_wine(
         first_seen_at=datetime.utcnow(),
     )
     
-    db.add(new_wine)
+    owner = flush_manual_wine(db, new_wine)
+    if owner is not None:
+        raise identity_conflict(owner)
+    record_changes(db, wine_changes(new_wine, None))
     db.commit()
     db.refresh(new_wine)
     
@@ -171,6 +189,7 @@ def update_wine(
     wine = db.query(Wine).filter(Wine.id == wine_id).first()
     if not wine:
         raise HTTPException(status_code=404, detail="Wine not found")
+    before = wine_snapshot(wine)
     
     # Update fields
     if "name" in wine_data:
@@ -195,7 +214,13 @@ def update_wine(
         wine.is_available = wine_data["is_available"]
     
     wine.updated_at = datetime.utcnow()
+    if any(field in wine_data for field in ADMIN_CURATED_FIELDS):
+        wine.admin_edited_at = wine.updated_at
     
+    owner = flush_manual_wine(db, wine)
+    if owner is not None:
+        raise identity_conflict(owner)
+    record_changes(db, wine_changes(wine, before))
     db.commit()
     db.refresh(wine)
     
@@ -216,12 +241,53 @@ def delete_wine(
     if not wine:
         raise HTTPException(status_code=404, detail="Wine not found")
     
+    record_changes(db, [deleted_wine_change(wine)])
     db.delete(wine)
     db.commit()
     
     return {"message": "Wine deleted successfully"}
 
 
+# ============================================================================
+# CHANGE FEED
+# ============================================================================
+
+@router.get("/changes")
+def list_changes(
+    since: int = 0,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    _: str = Depends(verify_admin)
+):
+    """
+    Catalog changes after a version, oldest first
+    
+    Pass the returned `version` back as `since` to get the next batch;
+    `has_more` means another batch is already waiting.
+    """
+    changes = changes_since(db, since, limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    
+    return {
+        "version": changes[-1].version if changes else since,
+        "has_more": has_more,
+        "changes": [
+            {
+                "version": change.version,
+                "wine_id": change.wine_id,
+                "winery_id": change.winery_id,
+                "change_type": change.change_type,
+                "old_value": change.old_value,
+                "new_value": change.new_value,
+                "source": change.source,
+                "changed_at": change.changed_at.isoformat() if change.changed_at else None,
+            }
+            for change in changes
+        ]
+    }
+
+
 # ============================================================================
 # WINERY MANAGEMENT
 # ============================================================================
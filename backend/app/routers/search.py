@@ -0,0 +1,95 @@
+"""
+Search API endpoints
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, joinedload
+from typing import Optional
+from app.database import get_async_db
+from app.models.wine import Wine
+from app.routers.wines import WineResponse, live_wines_query
+from app.services import fuzzy_search, suggest_index
+from pydantic import BaseModel
+
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str  # 'wine', 'winery' or 'variety'
+    count: int  # live wines with this name / from this winery / of this variety
+
+
+class SuggestResponse(BaseModel):
+    query: str
+    suggestions: list[Suggestion]
+
+
+class FuzzyWineResponse(WineResponse):
+    score: Optional[float] = None  # similarity 0..1, None for exact matches
+
+
+class FuzzySearchResponse(BaseModel):
+    query: str
+    exact: bool  # True: wines are plain name matches; False: similarity-ranked
+    wines: list[FuzzyWineResponse]
+    suggestions: list[str]  # "did you mean" terms, only when nothing matched exactly
+
+
+# Create router
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    q: str = Query(..., max_length=100),
+    limit: int = Query(8, ge=1, le=suggest_index.MAX_SUGGESTIONS)
+):
+    """
+    Search box autocomplete (PUBLIC ENDPOINT)
+
+    Wine names, winery names and varieties starting with **q** (at any word),
+    most popular first. Served from an in-memory index - no database query.
+    """
+    return {"query": q, "suggestions": suggest_index.suggest(q, limit)}
+
+
+@router.get("/fuzzy", response_model=FuzzySearchResponse)
+async def fuzzy_search_wines(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Typo-tolerant wine search (PUBLIC ENDPOINT - only live wines)
+
+    Returns exact name matches when there are any. Otherwise returns wines whose
+    name, variety or winery name is similar to **q** (pg_trgm), best match first,
+    plus spelling **suggestions** ("did you mean ...").
+    """
+    q = ' '.join(q.split())
+    if len(q) < 2:
+        # Whitespace got past min_length; an empty search would match every live wine
+        return {"query": q, "exact": False, "wines": [], "suggestions": []}
+
+    exact = (await db.scalars(
+        live_wines_query(search=q).options(joinedload(Wine.winery)).order_by(Wine.name, Wine.id).limit(limit)
+    )).all()
+    if exact:
+        return {"query": q, "exact": True, "wines": exact, "suggestions": []}
+
+    score = fuzzy_search.score(q)
+    rows = (await db.execute(
+        fuzzy_search.fuzzy_wines_query(q).add_columns(score.label('score'))
+        .options(contains_eager(Wine.winery))
+        .order_by(score.desc(), Wine.id).limit(limit)
+    )).all()
+    suggestions = (await db.execute(fuzzy_search.suggestions_query(q))).all()
+
+    return {
+        "query": q,
+        "exact": False,
+        "wines": [
+            FuzzyWineResponse.model_validate(row.Wine).model_copy(update={'score': round(row.score, 3)})
+            for row in rows
+        ],
+        "suggestions": [s.term for s in suggestions],
+    }
@@ -2,10 +2,12 @@
 Wineries API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.database import get_db
+from app.database import get_async_db
 from app.models.winery import Winery
+from app.models.wine import Wine  # noqa: F401 - registers Winery.wines relationship
 
 
 # Import schemas (we'll define these inline for now to avoid circular imports)
@@ -60,11 +62,11 @@ router = APIRouter(prefix="/api/wineries", tags=["wineries"])
 
 
 @router.get("/", response_model=WineryListResponse)
-def get_wineries(
+async def get_wineries(
     skip: int = 0,
     limit: int = 100,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get list of all wineries
@@ -73,13 +75,13 @@ def get_wineries(
     - **limit**: Maximum number of wineries to return
     - **active_only**: Only return active wineries
     """
-    query = db.query(Winery)
+    query = select(Winery)
     
     if active_only:
-        query = query.filter(Winery.is_active == True)
+        query = query.where(Winery.is_active == True)
     
-    total = query.count()
-    wineries = query.order_by(Winery.name).offset(skip).limit(limit).all()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    wineries = (await db.scalars(query.order_by(Winery.name).offset(skip).limit(limit))).all()
     
     return {
         "total": total,
@@ -88,11 +90,11 @@ def get_wineries(
 
 
 @router.get("/{winery_id}", response_model=WineryResponse)
-def get_winery(winery_id: int, db: Session = Depends(get_db)):
+async def get_winery(winery_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a specific winery by ID
     """
-    winery = db.query(Winery).filter(Winery.id == winery_id).first()
+    winery = await db.scalar(select(Winery).where(Winery.id == winery_id))
     
     if not winery:
         raise HTTPException(status_code=404, detail="Winery not found")
@@ -101,11 +103,11 @@ def get_winery(winery_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/slug/{slug}", response_model=WineryResponse)
-def get_winery_by_slug(slug: str, db: Session = Depends(get_db)):
+async def get_winery_by_slug(slug: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get a specific winery by slug
     """
-    winery = db.query(Winery).filter(Winery.slug == slug).first()
+    winery = await db.scalar(select(Winery).where(Winery.slug == slug))
     
     if not winery:
         raise HTTPException(status_code=404, detail="Winery not found")
@@ -1,12 +1,23 @@
 """
 Wines API endpoints
 """
+import re
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from typing import Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.wine import Wine
 from app.models.winery import Winery
+from app.services.catalog_changes import deleted_wine_change, record_changes, wine_changes, wine_snapshot
+from app.services.count_cache import count_key, wine_counts
+from app.services.pagination import keyset_page, next_page
+from app.services import wine_search
+from app.services.facets import facets_query, collect_facets
+from app.services.wine_service import ADMIN_CURATED_FIELDS, flush_manual_wine, identity_conflict
+from app.scrapers.varieties import canonical_variety
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -31,86 +42,237 @@ class WineResponse(BaseModel):
     is_available: bool
     status: str  # NEW: Include status in response
     winery: WinerySummary
+    snippet: Optional[str] = None  # search_mode=fulltext: description excerpt, matches in <mark>
     
     class Config:
         from_attributes = True
 
 
-class WineListResponse(BaseModel):
+class FacetVariety(BaseModel):
+    name: str
+    count: int
+
+
+class FacetVintage(BaseModel):
+    year: str
+    count: int
+
+
+class FacetWinery(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+class FacetPriceBucket(BaseModel):
+    label: str
+    min: Optional[float] = None  # inclusive; None = no lower bound
+    max: Optional[float] = None  # exclusive; None = no upper bound
+    count: int
+
+
+class FacetsResponse(BaseModel):
     total: int
+    varieties: list[FacetVariety]
+    vintages: list[FacetVintage]
+    wineries: list[FacetWinery]
+    price_buckets: list[FacetPriceBucket]
+
+
+class WineListResponse(BaseModel):
+    total: Optional[int] = None  # None when requested with include_total=false
+    has_more: bool = False
     wines: list[WineResponse]
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page; None on the last page
 
 
 # Create router
 router = APIRouter(prefix="/api/wines", tags=["wines"])
 
 
-@router.get("/", response_model=WineListResponse)
-def get_wines(
-    skip: int = 0,
-    limit: int = 50,
+def canonical_varieties(varieties: Optional[list[str]]) -> list[str]:
+    """Variety filter values as wines.variety_canonical names, e.g. ['syrah'] -> ['Shiraz']"""
+    return sorted({canonical_variety(v) for v in varieties or []} - {None})
+
+
+def live_wines_query(
     variety: Optional[str] = None,
     vintage: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     winery_id: Optional[int] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    search_mode: str = 'name',
+    vintage_from: Optional[int] = None,
+    vintage_to: Optional[int] = None,
+    varieties: Optional[list[str]] = None,
 ):
-    """
-    Get list of wines with filtering (PUBLIC ENDPOINT - only live wines)
-    
-    - **skip**: Number of wines to skip (pagination)
-    - **limit**: Maximum number of wines to return
-    - **variety**: Filter by variety (e.g., 'Shiraz', 'Riesling')
-    - **vintage**: Filter by vintage (e.g., '2024', 'NV')
-    - **min_price**: Minimum price
-    - **max_price**: Maximum price
-    - **winery_id**: Filter by winery ID
-    - **search**: Search in wine name
-    
-    NOTE: Only returns wines with status='live' (approved for public display)
-    """
+    """Public wine filters (live, available wines only)"""
     # IMPORTANT: Only show 'live' wines to public users
-    query = db.query(Wine).filter(
+    query = select(Wine).where(
         Wine.is_available == True,
         Wine.status == 'live'
     )
     
     if variety:
-        query = query.filter(Wine.variety.ilike(f"%{variety}%"))
+        query = query.where(Wine.variety.ilike(f"%{variety}%"))
     
-    if vintage:
-        query = query.filter(Wine.vintage == vintage)
+    # Exact matches on the indexed normalized columns (not ILIKE on the raw ones)
+    canonical = canonical_varieties(varieties)
+    if canonical:
+        query = query.where(Wine.variety_canonical.in_(canonical))
+    
+    # ASCII digits only: str.isdigit() also accepts e.g. '²', which int() rejects
+    if vintage and vintage.strip().upper() == 'NV':
+        query = query.where(Wine.is_non_vintage == True)
+    elif vintage and re.fullmatch(r'[0-9]{4}', vintage.strip()):
+        query = query.where(Wine.vintage_year == int(vintage.strip()))
+    elif vintage:
+        query = query.where(Wine.vintage == vintage)
+    
+    if vintage_from is not None:
+        query = query.where(Wine.vintage_year >= vintage_from)
+    
+    if vintage_to is not None:
+        query = query.where(Wine.vintage_year <= vintage_to)
     
     if min_price is not None:
-        query = query.filter(Wine.price >= min_price)
+        query = query.where(Wine.price >= min_price)
     
     if max_price is not None:
-        query = query.filter(Wine.price <= max_price)
+        query = query.where(Wine.price <= max_price)
     
     if winery_id:
-        query = query.filter(Wine.winery_id == winery_id)
+        query = query.where(Wine.winery_id == winery_id)
     
-    if search:
-        query = query.filter(Wine.name.ilike(f"%{search}%"))
+    if search and search_mode == 'fulltext':
+        tsquery = wine_search.prefix_tsquery(search)
+        if tsquery is not None:
+            query = query.where(wine_search.matches(tsquery))
+    elif search:
+        query = query.where(Wine.name.ilike(f"%{search}%"))
     
-    total = query.count()
-    wines = query.order_by(Wine.name).offset(skip).limit(limit).all()
+    return query
+
+
+@router.get("/", response_model=WineListResponse)
+async def get_wines(
+    skip: int = 0,
+    limit: int = 50,
+    variety: Optional[str] = None,
+    varieties: Optional[list[str]] = Query(None),
+    vintage: Optional[str] = None,
+    vintage_from: Optional[int] = None,
+    vintage_to: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    winery_id: Optional[int] = None,
+    search: Optional[str] = None,
+    search_mode: str = Query('name', pattern='^(name|fulltext)$'),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get list of wines with filtering (PUBLIC ENDPOINT - only live wines)
+    
+    - **skip**: Number of wines to skip (offset pagination, ignored with cursor)
+    - **cursor**: `next_cursor` from the previous page (keyset pagination, constant cost at any depth)
+    - **limit**: Maximum number of wines to return
+    - **variety**: Filter by variety, matching part of the stored name (e.g., 'Pinot')
+    - **varieties**: Exact variety (e.g., 'Shiraz'); repeat for any of several
+      (`varieties=Shiraz&varieties=Riesling`). Spellings are normalized ('Syrah' -> 'Shiraz')
+    - **vintage**: Filter by vintage (e.g., '2024', 'NV')
+    - **vintage_from** / **vintage_to**: Vintage year range, inclusive (excludes NV)
+    - **min_price**: Minimum price
+    - **max_price**: Maximum price
+    - **winery_id**: Filter by winery ID
+    - **search**: Search in wine name
+    - **search_mode**: 'name' (substring of the name, ordered by name) or 'fulltext'
+      (words/prefixes in name, variety and description, ordered by relevance,
+      with a highlighted snippet; paged with skip - no cursor)
+    - **include_total**: false skips counting (total is null; use has_more)
+    
+    NOTE: Only returns wines with status='live' (approved for public display)
+    """
+    query = live_wines_query(variety, vintage, min_price, max_price, winery_id, search, search_mode,
+                             vintage_from, vintage_to, varieties)
+    tsquery = wine_search.prefix_tsquery(search) if search and search_mode == 'fulltext' else None
+    
+    # Wineries come in the same query - async sessions can't lazy-load wine.winery
+    # during serialization (and lazy loads would be one query per wine)
+    if tsquery is not None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="search_mode=fulltext is ordered by relevance - page with skip")
+        page = wine_search.ranked_page(query.options(joinedload(Wine.winery)), tsquery, skip, limit + 1)
+        rows = (await db.execute(page)).all()
+        wines = [
+            WineResponse.model_validate(row.Wine).model_copy(update={'snippet': row.snippet})
+            for row in rows[:limit]
+        ]
+        has_more, next_cursor = len(rows) > limit, None
+    else:
+        page = keyset_page(query.options(joinedload(Wine.winery)), Wine.name, Wine.id, cursor)
+        if not cursor:
+            page = page.offset(skip)
+        wines, next_cursor = next_page((await db.scalars(page.limit(limit + 1))).all(), limit, 'name')
+        has_more = next_cursor is not None
+    
+    # Totals are cached per filter set, so paging and reloads don't count again
+    total = None
+    if include_total:
+        key = count_key(variety=variety, varieties=tuple(canonical_varieties(varieties)), vintage=vintage,
+                        vintage_from=vintage_from, vintage_to=vintage_to, min_price=min_price, max_price=max_price,
+                        winery_id=winery_id, search=search, search_mode=search_mode)
+        total = wine_counts.get(key)
+        if total is None:
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
+            wine_counts.set(key, total)
     
     return {
         "total": total,
-        "wines": wines
+        "has_more": has_more,
+        "wines": wines,
+        "next_cursor": next_cursor
     }
 
 
+@router.get("/facets", response_model=FacetsResponse)
+async def get_facets(
+    variety: Optional[str] = None,
+    varieties: Optional[list[str]] = Query(None),
+    vintage: Optional[str] = None,
+    vintage_from: Optional[int] = None,
+    vintage_to: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    winery_id: Optional[int] = None,
+    search: Optional[str] = None,
+    search_mode: str = Query('name', pattern='^(name|fulltext)$'),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Filter counts for the wine list (PUBLIC ENDPOINT - only live wines)
+    
+    Takes the same filters as GET /api/wines and returns, for the matching
+    wines, the count per variety, vintage, winery and price bucket plus the
+    total - all from one GROUPING SETS query.
+    """
+    query = live_wines_query(variety, vintage, min_price, max_price, winery_id, search, search_mode,
+                             vintage_from, vintage_to, varieties)
+    rows = (await db.execute(facets_query(query))).all()
+    return collect_facets(rows)
+
+
 @router.get("/{wine_id}", response_model=WineResponse)
-def get_wine(wine_id: int, db: Session = Depends(get_db)):
+async def get_wine(wine_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific wine by ID (only if live)"""
-    wine = db.query(Wine).filter(
-        Wine.id == wine_id,
-        Wine.status == 'live'
-    ).first()
+    wine = await db.scalar(
+        select(Wine).options(joinedload(Wine.winery)).where(
+            Wine.id == wine_id,
+            Wine.status == 'live'
+        )
+    )
     
     if not wine:
         raise HTTPException(status_code=404, detail="Wine not found")
@@ -119,40 +281,40 @@ def get_wine(wine_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/varieties/list")
-def get_varieties(db: Session = Depends(get_db)):
-    """Get list of all wine varieties with counts (only live wines)"""
-    from sqlalchemy import func
-    
-    varieties = db.query(
-        Wine.variety,
-        func.count(Wine.id).label('count')
-    ).filter(
-        Wine.is_available == True,
-        Wine.status == 'live',
-        Wine.variety.isnot(None)
-    ).group_by(Wine.variety).order_by(Wine.variety).all()
+async def get_varieties(db: AsyncSession = Depends(get_async_db)):
+    """Get list of all wine varieties (normalized names) with counts (only live wines)"""
+    varieties = (await db.execute(
+        select(
+            Wine.variety_canonical,
+            func.count(Wine.id).label('count')
+        ).where(
+            Wine.is_available == True,
+            Wine.status == 'live',
+            Wine.variety_canonical.isnot(None)
+        ).group_by(Wine.variety_canonical).order_by(Wine.variety_canonical)
+    )).all()
     
     return {
         "varieties": [
-            {"name": v.variety, "count": v.count}
+            {"name": v.variety_canonical, "count": v.count}
             for v in varieties
         ]
     }
 
 
 @router.get("/vintages/list")
-def get_vintages(db: Session = Depends(get_db)):
+async def get_vintages(db: AsyncSession = Depends(get_async_db)):
     """Get list of all vintages with counts (only live wines)"""
-    from sqlalchemy import func
-    
-    vintages = db.query(
-        Wine.vintage,
-        func.count(Wine.id).label('count')
-    ).filter(
-        Wine.is_available == True,
-        Wine.status == 'live',
-        Wine.vintage.isnot(None)
-    ).group_by(Wine.vintage).order_by(Wine.vintage.desc()).all()
+    vintages = (await db.execute(
+        select(
+            Wine.vintage,
+            func.count(Wine.id).label('count')
+        ).where(
+            Wine.is_available == True,
+            Wine.status == 'live',
+            Wine.vintage.isnot(None)
+        ).group_by(Wine.vintage).order_by(Wine.vintage.desc())
+    )).all()
     
     return {
         "vintages": [
@@ -171,24 +333,35 @@ def get_pending_wines(
     skip: int = 0,
     limit: int = 100,
     winery_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: Session = Depends(get_db)
 ):
     """
     Get wines pending review (ADMIN ONLY)
     
-    Returns wines with status='pending' that need admin approval
+    Returns wines with status='pending' that need admin approval, newest first
+    (pass `next_cursor` back as **cursor** for the next page)
     """
     query = db.query(Wine).filter(Wine.status == 'pending')
     
     if winery_id:
         query = query.filter(Wine.winery_id == winery_id)
     
-    total = query.count()
-    wines = query.order_by(Wine.created_at.desc()).offset(skip).limit(limit).all()
+    # Wineries joined into the same query (no lazy load per wine when serializing)
+    # Newest first by id - created_at can be NULL (older rows), which a
+    # (created_at, id) cursor comparison would skip
+    page = keyset_page(query.options(joinedload(Wine.winery)), Wine.id, Wine.id, cursor, descending=True)
+    if not cursor:
+        page = page.offset(skip)
+    wines, next_cursor = next_page(page.limit(limit + 1).all(), limit, 'id')
+    total = query.count() if include_total else None
     
     return {
         "total": total,
-        "wines": wines
+        "has_more": next_cursor is not None,
+        "wines": wines,
+        "next_cursor": next_cursor
     }
 
 
@@ -199,6 +372,8 @@ def get_all_wines_admin(
     status: Optional[str] = None,
     winery_id: Optional[int] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: Session = Depends(get_db)
 ):
     """
@@ -207,6 +382,8 @@ def get_all_wines_admin(
     - **status**: Filter by status ('pending', 'live', 'archived')
     - **winery_id**: Filter by winery
     - **search**: Search in wine name
+    - **cursor**: `next_cursor` from the previous page (instead of skip)
+    - **include_total**: false skips counting (total is null; use has_more)
     """
     query = db.query(Wine)
     
@@ -219,12 +396,20 @@ def get_all_wines_admin(
     if search:
         query = query.filter(Wine.name.ilike(f"%{search}%"))
     
-    total = query.count()
-    wines = query.order_by(Wine.created_at.desc()).offset(skip).limit(limit).all()
+    # Wineries joined into the same query (no lazy load per wine when serializing)
+    # Newest first by id - created_at can be NULL (older rows), which a
+    # (created_at, id) cursor comparison would skip
+    page = keyset_page(query.options(joinedload(Wine.winery)), Wine.id, Wine.id, cursor, descending=True)
+    if not cursor:
+        page = page.offset(skip)
+    wines, next_cursor = next_page(page.limit(limit + 1).all(), limit, 'id')
+    total = query.count() if include_total else None
     
     return {
         "total": total,
-        "wines": wines
+        "has_more": next_cursor is not None,
+        "wines": wines,
+        "next_cursor": next_cursor
     }
 
 
@@ -238,8 +423,10 @@ def approve_wine(wine_id: int, db: Session = Depends(get_db)):
     if not wine:
         raise HTTPException(status_code=404, detail="Wine not found")
     
+    before = wine_snapshot(wine)
     wine.status = 'live'
     wine.updated_at = datetime.utcnow()
+    record_changes(db, wine_changes(wine, before))
     db.commit()
     db.refresh(wine)
     
@@ -261,6 +448,7 @@ def reject_wine(wine_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Wine not found")
     
     # Option 1: Delete the wine
+    record_changes(db, [deleted_wine_change(wine)])
     db.delete(wine)
     db.commit()
     
@@ -292,8 +480,10 @@ def update_wine_status(
     if not wine:
         raise HTTPException(status_code=404, detail="Wine not found")
     
+    before = wine_snapshot(wine)
     wine.status = status
     wine.updated_at = datetime.utcnow()
+    record_changes(db, wine_changes(wine, before))
     db.commit()
     db.refresh(wine)
     
@@ -381,7 +571,10 @@ def create_wine(wine_data: WineCreate, db: Session = Depends(get_db)):
         status=wine_data.status
     )
     
-    db.add(wine)
+    owner = flush_manual_wine(db, wine)
+    if owner is not None:
+        raise identity_conflict(owner)
+    record_changes(db, wine_changes(wine, None))
     db.commit()
     db.refresh(wine)
     
@@ -396,6 +589,8 @@ def update_wine(wine_id: int, wine_data: WineUpdate, db: Session = Depends(get_d
     if not wine:
         raise HTTPException(status_code=404, detail="Wine not found")
     
+    before = wine_snapshot(wine)
+    
     # Update fields that were provided
     update_data = wine_data.dict(exclude_unset=True)
     
@@ -409,7 +604,13 @@ def update_wine(wine_id: int, wine_data: WineUpdate, db: Session = Depends(get_d
         setattr(wine, field, value)
     
     wine.updated_at = datetime.utcnow()
+    if any(field in update_data for field in ADMIN_CURATED_FIELDS):
+        wine.admin_edited_at = wine.updated_at
     
+    owner = flush_manual_wine(db, wine)
+    if owner is not None:
+        raise identity_conflict(owner)
+    record_changes(db, wine_changes(wine, before))
     db.commit()
     db.refresh(wine)
     
@@ -423,6 +624,7 @@ def delete_wine(wine_id: int, db: Session = Depends(get_db)):
     if not wine:
         raise HTTPException(status_code=404, detail="Wine not found")
     
+    record_changes(db, [deleted_wine_change(wine)])
     db.delete(wine)
     db.commit()
     
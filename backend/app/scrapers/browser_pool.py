@@ -0,0 +1,241 @@
+"""
+Shared Chromium instance with context recycling and a memory ceiling
+
+One browser visiting hundreds of heavy winery pages grows steadily in RSS.
+BrowserPool keeps that bounded:
+- Pages are handed out from a single active browser context
+- The context is retired after SCRAPER_CONTEXT_MAX_PAGES pages, or as soon as
+  the browser's RSS crosses SCRAPER_MAX_RSS_MB, and closed once its last page closes
+- If RSS is still over the ceiling with nothing open, the browser is restarted
+- At most SCRAPER_MAX_OPEN_PAGES pages are open at once (new pages only ever go
+  to the active context, so this is also the per-context cap)
+
+If SCRAPER_BROWSER_ENDPOINT is set, the pool connects to the shared warm browser
+run by app/scrapers/browser_server.py instead of launching its own (falling back
+to a local launch if the server is down). That browser's memory is policed by
+the supervisor; "restarting" here just reconnects.
+
+Usage:
+    async with BrowserPool() as pool:
+        async with pool.page() as page:
+            await page.goto(url)
+"""
+import asyncio
+import os
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+import logging
+
+from playwright.async_api import async_playwright
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def process_tree_rss_mb(root_pid: int = None) -> Optional[float]:
+    """
+    Total RSS (MB) of all descendants of a process, read from /proc
+
+    With the default root (this process) that is the Playwright driver plus
+    every Chromium process. Shared pages are counted once per process, which
+    makes this an overestimate - fine for a ceiling.
+    Returns None where /proc isn't available (non-Linux).
+    """
+    root_pid = root_pid or os.getpid()
+    if not os.path.isdir('/proc'):
+        return None
+
+    children = defaultdict(list)
+    rss_pages = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+            # comm (field 2) may contain spaces - fields after it are space separated
+            fields = stat.rsplit(')', 1)[1].split()
+            pid = int(entry)
+            children[int(fields[1])].append(pid)
+            rss_pages[pid] = int(fields[21])
+        except (OSError, ValueError, IndexError):
+            continue  # Process exited while we were reading
+
+    total = 0
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+
+    return total * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+class _ContextSlot:
+    """A browser context plus the bookkeeping needed to recycle it"""
+
+    def __init__(self, context):
+        self.context = context
+        self.pages_served = 0
+        self.open_pages = 0
+        self.retiring = False
+
+
+class BrowserPool:
+    """
+    Owns one Chromium instance and hands out pages from recycled contexts
+    """
+
+    def __init__(
+        self,
+        max_pages_per_context: int = None,
+        max_open_pages: int = None,
+        max_rss_mb: int = None,
+        endpoint: str = None,
+    ):
+        self.max_pages_per_context = max_pages_per_context or settings.scraper_context_max_pages
+        self.max_open_pages = max_open_pages or settings.scraper_max_open_pages
+        self.max_rss_mb = max_rss_mb or settings.scraper_max_rss_mb
+        self.endpoint = endpoint if endpoint is not None else settings.scraper_browser_endpoint
+        self.connected_remote = False
+
+        self._playwright = None
+        self._browser = None
+        self._active: Optional[_ContextSlot] = None
+        self._slots = []
+        self._page_slots = asyncio.Semaphore(self.max_open_pages)
+        self._lock = asyncio.Lock()
+
+        self.metrics = {
+            'pages_opened': 0,
+            'contexts_created': 0,
+            'contexts_recycled': 0,
+            'browser_restarts': 0,
+            'peak_rss_mb': 0.0,
+            'last_rss_mb': 0.0,
+        }
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Start Playwright and launch the browser"""
+        self._playwright = await async_playwright().start()
+        await self._launch_browser()
+
+    async def close(self):
+        """Close every context, the browser and Playwright"""
+        await self._close_browser()
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _launch_browser(self):
+        if self.endpoint:
+            try:
+                self._browser = await self._playwright.chromium.connect(self.endpoint, timeout=5000)
+                self.connected_remote = True
+                logger.info(f"Connected to shared browser at {self.endpoint}")
+                return
+            except Exception as e:
+                logger.warning(f"Shared browser at {self.endpoint} unavailable ({str(e)}) - launching locally")
+        
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self.connected_remote = False
+
+    async def _close_browser(self):
+        for slot in self._slots:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass  # Browser may already be gone
+        self._slots = []
+        self._active = None
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+
+    async def _get_context(self) -> _ContextSlot:
+        """Return the active context slot, creating a fresh one if needed"""
+        if self._active is not None and self._active.pages_served >= self.max_pages_per_context:
+            self._active.retiring = True
+        if self._active is None or self._active.retiring:
+            context = await self._browser.new_context()
+            self._active = _ContextSlot(context)
+            self._slots.append(self._active)
+            self.metrics['contexts_created'] += 1
+        return self._active
+
+    @asynccontextmanager
+    async def page(self):
+        """Open a page in the active context; closed (and recycled) on exit"""
+        async with self._page_slots:
+            async with self._lock:
+                slot = await self._get_context()
+                slot.open_pages += 1
+                slot.pages_served += 1
+                self.metrics['pages_opened'] += 1
+
+            page = None
+            try:
+                page = await slot.context.new_page()
+                yield page
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                async with self._lock:
+                    slot.open_pages -= 1
+                    await self._after_page(slot)
+
+    async def _after_page(self, slot: _ContextSlot):
+        """Retire/close contexts and restart the browser when limits are hit"""
+        rss = self.sample_memory()
+        over_ceiling = rss is not None and rss > self.max_rss_mb
+
+        if slot.pages_served >= self.max_pages_per_context or over_ceiling:
+            slot.retiring = True
+
+        if slot.retiring and slot.open_pages == 0:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+            self._slots.remove(slot)
+            if self._active is slot:
+                self._active = None
+            self.metrics['contexts_recycled'] += 1
+            logger.info(f"Recycled browser context after {slot.pages_served} pages (RSS {rss} MB)")
+
+            # Closing contexts didn't bring memory back down - start over
+            if not self._slots:
+                rss = self.sample_memory()
+                if rss is not None and rss > self.max_rss_mb:
+                    logger.warning(f"Browser RSS {rss:.0f} MB over {self.max_rss_mb} MB with no open pages - restarting")
+                    await self._close_browser()
+                    await self._launch_browser()
+                    self.metrics['browser_restarts'] += 1
+
+    def sample_memory(self) -> Optional[float]:
+        """Measure browser RSS and update the run metrics"""
+        rss = process_tree_rss_mb()
+        if rss is not None:
+            rss = round(rss, 1)
+            self.metrics['last_rss_mb'] = rss
+            self.metrics['peak_rss_mb'] = max(self.metrics['peak_rss_mb'], rss)
+        return rss
+
+    def metrics_snapshot(self) -> Dict:
+        """Copy of the current memory/lifecycle metrics"""
+        return dict(self.metrics)
@@ -0,0 +1,148 @@
+"""
+Supervisor for a long-lived, shared Chromium browser server
+
+Every scraper process that launches its own Chromium pays the cold-start cost.
+This keeps one warm browser running behind Playwright's launch-server; scrapers
+connect to it (SCRAPER_BROWSER_ENDPOINT) and only open their own contexts.
+
+The supervisor restarts the browser when it crashes, and also when its process
+tree grows past SCRAPER_BROWSER_SERVER_MAX_RSS_MB (scrapers can't measure the
+memory of a browser they don't own).
+
+Usage:
+    python -m app.scrapers.browser_server
+
+Then set in .env:
+    SCRAPER_BROWSER_ENDPOINT=ws://127.0.0.1:3789/cbr-wine-hunter
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import logging
+
+from app.config import settings
+from app.scrapers.browser_pool import process_tree_rss_mb
+
+logger = logging.getLogger(__name__)
+
+WS_PATH = '/cbr-wine-hunter'
+RESTART_BACKOFF_SECONDS = [1, 2, 5, 10, 30]
+HEALTH_CHECK_INTERVAL_SECONDS = 5
+
+
+def endpoint_url(host: str, port: int) -> str:
+    """The stable websocket endpoint scrapers connect to"""
+    return f"ws://{host}:{port}{WS_PATH}"
+
+
+class BrowserServerSupervisor:
+    """
+    Runs `playwright launch-server` as a child process and keeps it alive
+    """
+
+    def __init__(self, host: str = None, port: int = None, max_rss_mb: int = None):
+        self.host = host or settings.scraper_browser_server_host
+        self.port = port or settings.scraper_browser_server_port
+        self.max_rss_mb = max_rss_mb or settings.scraper_browser_server_max_rss_mb
+        self.process = None
+        self.restarts = 0
+        self._stopping = False
+
+        # Fixed port + path, so the endpoint survives browser restarts
+        self._config_file = tempfile.NamedTemporaryFile(
+            mode='w', suffix='.json', prefix='browser-server-', delete=False
+        )
+        json.dump({
+            'headless': True,
+            'host': self.host,
+            'port': self.port,
+            'wsPath': WS_PATH,
+        }, self._config_file)
+        self._config_file.close()
+
+    @property
+    def endpoint(self) -> str:
+        return endpoint_url(self.host, self.port)
+
+    def start_browser(self):
+        """Launch the browser server and wait until it reports its endpoint"""
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'playwright', 'launch-server',
+             '--browser', 'chromium', '--config', self._config_file.name],
+            stdout=subprocess.PIPE,
+            text=True,
+            start_new_session=True,  # Own process group, so stop_browser() takes Chromium with it
+        )
+        # launch-server prints the ws endpoint once the browser is up
+        line = self.process.stdout.readline().strip()
+        if not line.startswith('ws://'):
+            raise RuntimeError(f"Browser server failed to start: {line or 'no output'}")
+        logger.info(f"Browser server ready at {line} (pid {self.process.pid})")
+
+    def stop_browser(self):
+        """Terminate the browser server (and its Chromium children)"""
+        if self.process is None:
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGTERM)
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(self.process.pid, signal.SIGKILL)
+            self.process.wait()
+        except ProcessLookupError:
+            pass  # Already gone
+        self.process = None
+
+    def _handle_signal(self, signum, frame):
+        logger.info(f"Received signal {signum} - shutting down browser server")
+        self._stopping = True
+
+    def run(self):
+        """Supervise forever: restart on crash or when over the memory ceiling"""
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+        failures = 0
+        try:
+            while not self._stopping:
+                try:
+                    self.start_browser()
+                    failures = 0
+                except Exception as e:
+                    logger.error(str(e))
+                    self.stop_browser()
+                    failures += 1
+                    time.sleep(RESTART_BACKOFF_SECONDS[min(failures, len(RESTART_BACKOFF_SECONDS)) - 1])
+                    continue
+
+                while not self._stopping:
+                    exit_code = self.process.poll()
+                    if exit_code is not None:
+                        logger.warning(f"Browser server exited with code {exit_code} - restarting")
+                        break
+
+                    rss = process_tree_rss_mb(self.process.pid)
+                    if rss is not None and rss > self.max_rss_mb:
+                        logger.warning(f"Browser server RSS {rss:.0f} MB over {self.max_rss_mb} MB - restarting")
+                        break
+
+                    time.sleep(HEALTH_CHECK_INTERVAL_SECONDS)
+
+                self.stop_browser()
+                if not self._stopping:
+                    self.restarts += 1
+        finally:
+            self.stop_browser()
+            os.unlink(self._config_file.name)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    supervisor = BrowserServerSupervisor()
+    print("Starting shared browser server")
+    print(f"Set SCRAPER_BROWSER_ENDPOINT={supervisor.endpoint}")
+    supervisor.run()
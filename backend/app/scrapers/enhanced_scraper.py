@@ -122,8 +122,9 @@ KNOWN ISSUES & LIMITATIONS
    - For most wineries (10-30 wines), this is sufficient
    - Capital Wines scraped 28/30+ wines successfully
 
-2. TIMEOUT HANDLING: 20-second timeout per product page
-   - Square.site (Lark Hill) consistently times out
+2. TIMEOUT HANDLING: Adaptive per-host timeouts (see host_latency.py)
+   - p99 x 1.5 of each host's recorded navigation latency, within bounds
+   - Defaults (30s listing / 20s product) until a host has history
    - Some individual product pages may timeout and be skipped
 
 3. VINTAGE EXTRACTION CHALLENGES:
@@ -177,75 +178,360 @@ AFTER PRODUCTION:
 ================================================================================
 """
 import asyncio
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+import hashlib
+import json
+import re
+import time
+from contextlib import asynccontextmanager
+from playwright.async_api import TimeoutError as PlaywrightTimeout
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import List, Dict, Optional
+from urllib.parse import urljoin, urlparse, urlunparse
 import logging
 from .base_scraper import BaseScraper
+from .browser_pool import BrowserPool
+from .html_archive import HtmlArchive
+from .host_latency import HostLatencyStats
+from .network_stats import NetworkStats
+from .platforms import detect_platform, get_strategy
+from .variants import extract_variants
 
 logger = logging.getLogger(__name__)
 
+# Where a product description lives (product pages and listing cards)
+DESCRIPTION_SELECTORS = [
+    '.description',
+    '.product-description',
+    '[itemprop="description"]',
+    '.wine-description'
+]
+
+# Text with any of these is shop policy / shipping copy, not a description
+DESCRIPTION_SKIP_PHRASES = [
+    'we ship our wines',
+    'shipping',
+    'delivery',
+    'please make up your order',
+    'bottles to ensure',
+    'purchase limits',
+    'terms and conditions'
+]
+
+
+def is_description(desc_text: Optional[str]) -> bool:
+    """Long enough to be a wine description and not shipping/policy text"""
+    return bool(desc_text) and len(desc_text) > 20 and not any(
+        phrase in desc_text.lower() for phrase in DESCRIPTION_SKIP_PHRASES
+    )
+
 
 class EnhancedScraper(BaseScraper):
     """
     Enhanced scraper that visits individual product pages for complete data
     """
     
-    def __init__(self, winery_id: int, winery_name: str, shop_url: str, config: Dict = None):
+    def __init__(self, winery_id: int, winery_name: str, shop_url: str, config: Dict = None,
+                 browser_pool: BrowserPool = None, html_archive: HtmlArchive = None,
+                 host_latency: HostLatencyStats = None):
         super().__init__(winery_id, winery_name, shop_url)
         self.config = config or {}
         self.requires_js = self.config.get('requires_javascript', True)
         
+        # Shop platform (scraper_configs.platform_type); detected from the listing if unknown
+        self.platform_type = self.config.get('platform_type')
+        self.strategy = get_strategy(self.platform_type)
+        
+        # Shared browser (e.g. region-wide runs); otherwise each scrape launches its own
+        self.browser_pool = browser_pool
+        
+        # Raw product page archive (see html_archive.py); None = don't archive
+        self.html_archive = html_archive
+        self.memory_stats = {}
+        
+        # Navigation timeouts learned per host; shared across wineries when passed in
+        self.owns_host_latency = host_latency is None
+        self.host_latency = host_latency or HostLatencyStats()
+        
+        # Network cost: winery total + per-page breakdown (see network_stats.py)
+        self.network_stats = NetworkStats()
+        self.page_network_stats = {}
+        
+        # Change gating: fingerprint of the last full scrape (if still fresh)
+        self.previous_fingerprint = self.config.get('listing_fingerprint')
+        self.listing_fingerprint = None
+        self.listing_unchanged = False
+        
+        # Hybrid mode: take wines straight from listing cards when the card has
+        # everything (or matches what we already have), and only open product
+        # pages for the rest. known_wines: {product_url: wine dict from the DB}
+        self.hybrid_listing = self.config.get('hybrid_listing', False)
+        self.known_wines = self.config.get('known_wines') or {}
+        self.listing_cards = {}
+        self.product_pages_skipped = 0
+        
     async def scrape_async(self) -> List[Dict]:
         """Async scrape method using Playwright"""
         
         logger.info(f"Starting enhanced scrape for {self.winery_name}")
         logger.info(f"URL: {self.shop_url}")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
-            try:
-                # Navigate to shop page
-                logger.info(f"Loading listing page...")
-                await page.goto(self.shop_url, wait_until='networkidle', timeout=30000)
-                await asyncio.sleep(2)
-                
-                # Get product URLs
-                product_urls = await self.extract_product_urls(page)
-                logger.info(f"Found {len(product_urls)} product URLs")
-                
+        pool = self.browser_pool or BrowserPool()
+        owns_pool = self.browser_pool is None
+        if owns_pool:
+            await pool.start()
+        
+        try:
+            # Navigate to shop page and get product URLs
+            product_urls = await self.load_listing(pool)
+            
+            # Skip the product-page fan-out if the listing hasn't changed
+            # since the last full scrape (same product URLs, same prices)
+            # (still goes through the teardown and summary below)
+            if self.listing_unchanged:
+                logger.info("Listing unchanged since last scrape - skipping product pages")
+            else:
                 # Visit each product page and extract details
-                wines = []
-                for i, url in enumerate(product_urls, 1):  # Process all products
-                    try:
-                        logger.info(f"Processing product {i}/{len(product_urls)}: {url}")
-                        wine_data = await self.scrape_product_page(page, url)
-                        if wine_data and self.validate_wine_data(wine_data):
-                            wines.append(wine_data)
-                            logger.info(f"  âœ“ Extracted: {wine_data.get('name')}")
-                    except Exception as e:
-                        logger.warning(f"  âœ— Error on {url}: {str(e)}")
-                        continue
-                
-                self.wines_found = wines
-                logger.info(f"Successfully scraped {len(wines)} wines")
-                
-            except PlaywrightTimeout:
-                error_msg = f"Timeout loading page: {self.shop_url}"
-                logger.error(error_msg)
-                self.errors.append(error_msg)
-            except Exception as e:
-                error_msg = f"Error scraping {self.winery_name}: {str(e)}"
-                logger.error(error_msg)
-                self.errors.append(error_msg)
-            finally:
-                await browser.close()
+                self.wines_found = await self.scrape_products(pool, product_urls)
+                logger.info(f"Successfully scraped {len(self.wines_found)} wines")
+            
+        except PlaywrightTimeout:
+            error_msg = f"Timeout loading page: {self.shop_url}"
+            logger.error(error_msg)
+            self.errors.append(error_msg)
+        except Exception as e:
+            error_msg = f"Error scraping {self.winery_name}: {str(e)}"
+            logger.error(error_msg)
+            self.errors.append(error_msg)
+        finally:
+            self.memory_stats = pool.metrics_snapshot()
+            if owns_pool:
+                await pool.close()
+            if self.owns_host_latency:
+                self.save_latency_stats()
         
+        logger.info(f"Network: {self.network_stats.as_dict()}")
         self.log_summary()
         return self.wines_found
     
+    async def load_listing(self, pool: BrowserPool) -> List[str]:
+        """
+        Load the listing page, extract product URLs and fingerprint the listing
+        
+        Sets self.listing_unchanged when the fingerprint matches the previous one.
+        """
+        async with self.metered_page(pool, self.shop_url) as page:
+            logger.info("Loading listing page...")
+            await self.navigate(page, self.shop_url, 'listing')
+            await asyncio.sleep(2)
+            
+            if not self.platform_type:
+                self.platform_type = detect_platform(await page.content(), self.shop_url)
+                self.strategy = get_strategy(self.platform_type)
+                logger.info(f"Detected platform: {self.platform_type}")
+            
+            product_urls = await self.extract_product_urls(page)
+            logger.info(f"Found {len(product_urls)} product URLs")
+            
+            if product_urls and self.hybrid_listing:
+                self.listing_cards = self.extract_listing_cards(await page.content(), product_urls)
+                logger.info(f"Parsed {len(self.listing_cards)} listing cards")
+            
+            if product_urls:
+                self.listing_fingerprint = await self.compute_listing_fingerprint(page, product_urls)
+                if self.previous_fingerprint and self.listing_fingerprint == self.previous_fingerprint:
+                    self.listing_unchanged = True
+        
+        return product_urls
+    
+    async def scrape_products(self, pool: BrowserPool, product_urls: List[str]) -> List[Dict]:
+        """
+        Visit each product page (one fresh page per product) and extract details
+        
+        In hybrid mode, products whose listing card is enough are taken from the
+        card and their page is skipped.
+        """
+        wines = []
+        for i, url in enumerate(product_urls, 1):  # Process all products
+            card_wine = self.take_listing_card(url)
+            if card_wine:
+                wines.append(card_wine)
+                continue
+            
+            logger.info(f"Processing product {i}/{len(product_urls)}: {url}")
+            wines.extend(await self.scrape_product(pool, url))
+        if self.hybrid_listing:
+            logger.info(f"Product pages skipped (listing card data used): {self.product_pages_skipped}/{len(product_urls)}")
+        return wines
+    
+    async def scrape_product(self, pool: BrowserPool, url: str) -> List[Dict]:
+        """Visit one product page on a fresh pool page; returns its valid wines"""
+        wines = []
+        try:
+            async with self.metered_page(pool, url) as page:
+                product_wines = await self.scrape_product_page(page, url)
+            for wine_data in product_wines:
+                if self.validate_wine_data(wine_data):
+                    wines.append(wine_data)
+                    logger.info(f"  âœ“ Extracted: {wine_data.get('name')} ({wine_data.get('vintage')})")
+        except Exception as e:
+            logger.warning(f"  âœ— Error on {url}: {str(e)}")
+        return wines
+    
+    def take_listing_card(self, url: str) -> Optional[Dict]:
+        """Hybrid mode: the product's wine from its listing card, if that's enough"""
+        if not self.hybrid_listing:
+            return None
+        card_wine = self.wine_from_listing_card(url)
+        if card_wine and self.validate_wine_data(card_wine):
+            self.product_pages_skipped += 1
+            logger.info(f"  âœ“ From listing card: {card_wine.get('name')}")
+            return card_wine
+        return None
+    
+    def extract_listing_cards(self, html: str, product_urls: List[str]) -> Dict[str, Dict]:
+        """
+        Parse listing cards with BaseScraper.extract_wine_from_element
+        
+        Card selectors are tried in order, first one that yields cards wins.
+        A card only counts if it links to exactly one of the product URLs
+        (so grid wrappers matching '[class*="product"]' are ignored).
+        Returns: {product_url: card wine dict}
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        wanted = set(product_urls)
+        card_selectors = [
+            '.product-card',
+            '.product-item',
+            'li.product',
+            '.product',
+            '.wine-item',
+            '.grid-item',
+            '[class*="product"]',
+            'article',
+        ]
+        
+        for selector in card_selectors:
+            cards = {}
+            for element in soup.select(selector):
+                linked = {
+                    self.base_product_url(a['href']) for a in element.select('a[href]')
+                } & wanted
+                if len(linked) != 1:
+                    continue
+                url = linked.pop()
+                wine_data = self.extract_wine_from_element(element)
+                if wine_data and url not in cards:
+                    wine_data['product_url'] = url
+                    # extract_wine_from_element falls back to any <p> ("Add to cart",
+                    # "Free shipping on 6+") - only keep a real, filtered description
+                    wine_data['description'] = self.card_description(element)
+                    cards[url] = wine_data
+            if cards:
+                logger.info(f"Found listing cards using selector: {selector}")
+                return cards
+        
+        return {}
+    
+    @staticmethod
+    def card_description(element) -> Optional[str]:
+        """Card description from the product page's description selectors and filter"""
+        for selector in DESCRIPTION_SELECTORS:
+            elem = element.select_one(selector)
+            if elem:
+                desc_text = re.sub(r'\s+', ' ', elem.get_text(' ', strip=True).replace('\u200b', '')).strip()
+                if is_description(desc_text):
+                    return desc_text
+        return None
+    
+    def base_product_url(self, href: str) -> Optional[str]:
+        """Absolute product URL without query params/anchors (as in extract_product_urls)"""
+        if href.startswith('/'):
+            href = urljoin(self.shop_url, href)
+        elif not href.startswith('http'):
+            return None
+        parsed = urlparse(href)
+        return urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
+    
+    def wine_from_listing_card(self, url: str) -> Optional[Dict]:
+        """
+        Wine data for a product from its listing card alone, or None if the
+        product page still needs a visit
+        
+        - Known wine whose card name/price match the DB: reuse the DB details
+          (description, vintage, variety came from an earlier product page visit)
+        - New or changed wine: only if the card itself has name, price, vintage
+          and description
+        """
+        card = self.listing_cards.get(url)
+        if not card or not card.get('name') or not card.get('price'):
+            return None
+        
+        known = self.known_wines.get(url)
+        if known and self.card_matches_known(card, known):
+            return {
+                'winery_id': self.winery_id,
+                'name': known['name'],
+                'variety': known.get('variety'),
+                'vintage': known.get('vintage'),
+                'price': card['price'],
+                'description': known.get('description'),
+                'product_url': url,
+            }
+        
+        if card.get('vintage') and card.get('description'):
+            name = card['name']
+            # Same first cleanup step as product pages: drop the vintage from the name
+            name = re.sub(r'\s*' + re.escape(card['vintage']) + r'\s*', ' ', name)
+            name = re.sub(r'\s+', ' ', name).strip()
+            return {**card, 'name': name or card['name'], 'product_url': url}
+        
+        return None
+    
+    @staticmethod
+    def card_matches_known(card: Dict, known: Dict) -> bool:
+        """Card price equals the DB price and the DB name's words all appear on the card"""
+        if known.get('price') is None or round(float(known['price']), 2) != round(float(card['price']), 2):
+            return False
+        card_words = set(re.findall(r'\w+', card['name'].lower()))
+        known_words = set(re.findall(r'\w+', (known.get('name') or '').lower()))
+        return bool(known_words) and known_words <= card_words
+    
+    @asynccontextmanager
+    async def metered_page(self, pool: BrowserPool, url: str):
+        """Pool page whose network traffic is counted against this winery"""
+        async with pool.page() as page:
+            page_stats = NetworkStats()
+            page_stats.attach(page)
+            try:
+                yield page
+            finally:
+                await page_stats.settle()
+                self.network_stats.merge(page_stats)
+                self.page_network_stats[url] = page_stats.as_dict()
+    
+    async def navigate(self, page, url: str, kind: str):
+        """
+        Load a page with this host's adaptive timeout and record how long it took
+        
+        kind: 'listing' or 'product' (tracked separately - listings are heavier)
+        """
+        timeout = self.host_latency.timeout_ms(url, kind)
+        started = time.monotonic()
+        try:
+            await page.goto(url, wait_until='networkidle', timeout=timeout)
+        except PlaywrightTimeout:
+            # Censored sample: the page needed at least this long
+            self.host_latency.record(url, kind, timeout)
+            raise
+        self.host_latency.record(url, kind, (time.monotonic() - started) * 1000)
+    
+    def save_latency_stats(self):
+        """Persist this run's latency samples (never fails the scrape)"""
+        try:
+            self.host_latency.save()
+        except OSError as e:
+            logger.warning(f"Could not save latency stats: {str(e)}")
+    
     def scrape(self) -> List[Dict]:
         """Synchronous wrapper for async scrape"""
         return asyncio.run(self.scrape_async())
@@ -255,6 +541,7 @@ class EnhancedScraper(BaseScraper):
         Extract product URLs from listing page
         
         Strategy: Try multiple CSS selectors in priority order
+        - Platform strategy selectors first, then the generic list
         - First match wins (prevents duplicates from different selectors)
         - Deduplicate by base URL (ignores query params and anchors)
         
@@ -268,7 +555,7 @@ class EnhancedScraper(BaseScraper):
         
         # Try to find product links with multiple fallback selectors
         # ORDER MATTERS: More specific patterns first, generic patterns last
-        link_selectors = [
+        link_selectors = self.strategy.listing_link_selectors + [
             'a[href*="/wine/"]',          # Barton Estate, Lerida - /wine/product-name/
             'a[href*="/product"]',         # Generic WooCommerce - /product/wine-name/
             'a[href*="/products"]',        # Shopify - /products/wine-name
@@ -306,13 +593,122 @@ class EnhancedScraper(BaseScraper):
         
         return urls
     
-    async def scrape_product_page(self, page, url: str) -> Dict:
-        """Scrape individual product page for complete details"""
+    async def compute_listing_fingerprint(self, page, product_urls: List[str]) -> str:
+        """
+        Fingerprint the listing page: discovered product URL set + listing prices
+        
+        Both parts are sorted so the fingerprint doesn't depend on display order.
+        Returns: hex SHA-256 digest
+        """
+        html = await page.content()
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        prices = []
+        for elem in soup.select('.price, [class*="price"], .amount'):
+            price = self.clean_price(elem.get_text(strip=True))
+            if price:
+                prices.append(price)
+        
+        payload = json.dumps({
+            'urls': sorted(set(product_urls)),
+            'prices': sorted(prices),
+        })
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    async def scrape_product_page(self, page, url: str) -> List[Dict]:
+        """
+        Scrape individual product page for complete details
+        Returns: one wine dict per vintage on the page (usually just one)
+        """
         try:
-            await page.goto(url, wait_until='networkidle', timeout=20000)
+            await self.navigate(page, url, 'product')
             await asyncio.sleep(1)
             
             html = await page.content()
+        except Exception as e:
+            logger.error(f"Error scraping product page {url}: {str(e)}")
+            return []
+        
+        # Keep the raw page so extraction fixes can be re-applied without re-crawling
+        if self.html_archive is not None:
+            try:
+                self.html_archive.store(self.winery_id, url, html)
+            except OSError as e:
+                logger.warning(f"Could not archive {url}: {str(e)}")
+        
+        return self.parse_product_wines(html, url)
+    
+    def parse_product_wines(self, html: str, url: str) -> List[Dict]:
+        """
+        All wines on a product page: the page's wine, split per vintage when
+        the page embeds vintage variants (see variants.py)
+        """
+        wine_data = self.parse_product_page(html, url)
+        if not wine_data:
+            return []
+        
+        try:
+            variants = extract_variants(html, url)
+        except Exception as e:
+            logger.warning(f"Could not read variants on {url}: {str(e)}")
+            variants = []
+        
+        return self.expand_vintage_variants(wine_data, variants)
+    
+    def expand_vintage_variants(self, wine_data: Dict, variants: List[Dict]) -> List[Dict]:
+        """
+        One wine per vintage variant (e.g. Wimbaliri: 2019 / 2021 / 2022 on one page)
+        
+        Variants that aren't vintages (bottle sizes, 6-packs) don't create wines,
+        and sold-out vintages are left out so the save marks them unavailable.
+        With fewer than two vintages the page's own wine is returned as is.
+        """
+        by_vintage = {}
+        for variant in variants:
+            match = re.search(r'\b(19\d{2}|20\d{2})\b|\bNV\b', variant.get('label') or '', re.IGNORECASE)
+            if match:
+                vintage = match.group(1) or 'NV'
+                # A vintage listed twice (750ml + magnum): the available, standard bottle wins
+                if vintage not in by_vintage or self.variant_rank(variant) > self.variant_rank(by_vintage[vintage]):
+                    by_vintage[vintage] = variant
+        
+        if len(by_vintage) < 2:
+            return [wine_data]
+        
+        # Base name without whatever vintage the page was showing
+        name = re.sub(r'\s*\b(19\d{2}|20\d{2})\b\s*', ' ', wine_data['name'])
+        name = re.sub(r'\s+', ' ', name).strip() or wine_data['name']
+        
+        wines = []
+        for vintage, variant in by_vintage.items():
+            if not variant.get('available', True):
+                continue
+            wines.append({
+                **wine_data,
+                'name': name,
+                'vintage': vintage,
+                'price': variant.get('price') or wine_data.get('price'),
+            })
+        
+        logger.info(f"  Split into {len(wines)} vintage variants: {', '.join(w['vintage'] for w in wines)}")
+        return wines
+    
+    @staticmethod
+    def variant_rank(variant: Dict) -> tuple:
+        """(available, standard 750ml bottle) - higher is the better variant for a vintage"""
+        label = (variant.get('label') or '').lower()
+        size = re.search(r'\b(\d+(?:\.\d+)?)\s*(ml|l|lt|litre|liter)s?\b', label)
+        standard = not re.search(r'magnum|jeroboam|half|pack|case|dozen', label) and (
+            size is None or (size.group(1) == '750' and size.group(2) == 'ml'))
+        return (variant.get('available', True) is not False, standard)
+    
+    def parse_product_page(self, html: str, url: str) -> Dict:
+        """
+        Extract wine details from product page HTML
+        
+        Depends only on (html, url), so reextract.py can run it over archived pages.
+        """
+        try:
             soup = BeautifulSoup(html, 'html.parser')
             
             # Helper function to clean text
@@ -328,11 +724,11 @@ class EnhancedScraper(BaseScraper):
                 text = re.sub(r'\s+', ' ', text).strip()
                 return text if text else None
             
-            # Extract name
-            name = None
+            # Extract name - platform strategy first, then the generic chain
+            name = clean_text(self.strategy.extract_name(soup))
             
             # Try h1 with product_title class (Pankhurst pattern)
-            product_h1 = soup.select_one('h1.product_title')
+            product_h1 = soup.select_one('h1.product_title') if not name else None
             if product_h1:
                 inner_div = product_h1.find('div')
                 if inner_div:
@@ -537,9 +933,9 @@ class EnhancedScraper(BaseScraper):
                 if not variety:
                     variety = self.extract_variety(name)
             
-            # Extract price
-            price = None
-            price_selectors = [
+            # Extract price - platform strategy first, then the generic chain
+            price = self.clean_price(self.strategy.extract_price_text(soup) or '')
+            price_selectors = [] if price else [
                 '.price',
                 '[class*="price"]',
                 'span:contains("$")',
@@ -553,33 +949,19 @@ class EnhancedScraper(BaseScraper):
                     if price:
                         break
             
-            # Extract description
-            description = None
-            desc_selectors = [
-                '.description',
-                '.product-description',
-                '[itemprop="description"]',
-                '.wine-description'
-            ]
+            # Extract description - platform strategy first, then the generic chain.
+            # Both go through the same filter: shipping/policy text isn't a description
+            description = clean_text(self.strategy.extract_description(soup))
+            if not is_description(description):
+                description = None
+            desc_selectors = [] if description else DESCRIPTION_SELECTORS
             for selector in desc_selectors:
                 elem = soup.select_one(selector)
                 if elem:
                     desc_text = clean_text(elem.get_text(strip=True))
-                    # Filter out shipping/policy text
-                    if desc_text and len(desc_text) > 20:
-                        # Skip if it's shipping/policy info
-                        skip_phrases = [
-                            'we ship our wines',
-                            'shipping',
-                            'delivery',
-                            'please make up your order',
-                            'bottles to ensure',
-                            'purchase limits',
-                            'terms and conditions'
-                        ]
-                        if not any(phrase in desc_text.lower() for phrase in skip_phrases):
-                            description = desc_text
-                            break
+                    if is_description(desc_text):
+                        description = desc_text
+                        break
             
             # Clean up name - remove vintage if present
             if vintage:
@@ -0,0 +1,71 @@
+"""
+Global, deadline-aware crawl frontier for product pages
+
+The nightly window is fixed, so the most valuable pages should be fetched
+first. scrape_all.py loads every winery's listing, then pushes all product
+pages that still need a visit into ONE priority queue shared by all wineries:
+
+1. NEW       - product URLs we have never saved a wine for
+2. VOLATILE  - wines whose price changed recently (most price changes first)
+3. STALE     - everything else, oldest last_seen_at first
+
+Workers pop pages until the queue is empty or the deadline passes; whatever
+is left is handed back by remaining() so the run can record it as deferred.
+"""
+import heapq
+import itertools
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+NEW = 0
+VOLATILE = 1
+STALE = 2
+
+TIER_NAMES = {NEW: 'new', VOLATILE: 'volatile', STALE: 'stale'}
+
+
+class CrawlFrontier:
+    """Priority queue of (winery_id, product_url) with a run deadline"""
+
+    def __init__(self, deadline_seconds: float = None):
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+        self._heap = []
+        self._order = itertools.count()  # FIFO among equal priorities
+        self.popped = defaultdict(int)   # pages handed out, per tier
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, winery_id: int, url: str, tier: int = NEW, sort_key: float = 0):
+        """
+        Queue a product page
+        sort_key orders pages within a tier (lower first): e.g. -price_changes
+        for VOLATILE, last_seen_at timestamp for STALE
+        """
+        heapq.heappush(self._heap, (tier, sort_key, next(self._order), winery_id, url))
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def time_left(self) -> Optional[float]:
+        """Seconds until the deadline (None = no deadline)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def pop(self) -> Optional[Tuple[int, str]]:
+        """Next (winery_id, url), or None when empty or past the deadline"""
+        if not self._heap or self.expired():
+            return None
+        tier, _, _, winery_id, url = heapq.heappop(self._heap)
+        self.popped[TIER_NAMES[tier]] += 1
+        return winery_id, url
+
+    def remaining(self) -> Dict[int, List[str]]:
+        """Drain the queue: {winery_id: [deferred urls]} in priority order"""
+        deferred = defaultdict(list)
+        while self._heap:
+            _, _, _, winery_id, url = heapq.heappop(self._heap)
+            deferred[winery_id].append(url)
+        return dict(deferred)
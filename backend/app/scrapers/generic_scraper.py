@@ -109,81 +109,3 @@ class GenericScraper(BaseScraper):
                 continue
         
         return wines
-    
-    def extract_wine_from_element(self, element) -> Dict:
-        """
-        Extract wine information from a product element
-        """
-        # Extract name
-        name = None
-        name_selectors = ['h2', 'h3', 'h4', '.product-title', '.title', '[class*="title"]', 'a']
-        for selector in name_selectors:
-            name_elem = element.select_one(selector)
-            if name_elem:
-                name = name_elem.get_text(strip=True)
-                if name and len(name) > 3:
-                    break
-        
-        if not name:
-            return None
-        
-        # Extract vintage first (before cleaning name)
-        vintage = self.extract_vintage(name)
-        
-        # Clean up the name - remove year if it's stuck to the end
-        # Convert "Ceoltoiri2024" to "Ceoltoiri 2024"
-        import re
-        if vintage:
-            # Add space before the year if it's stuck to text
-            name = re.sub(r'(\D)(' + re.escape(vintage) + r')(\D|$)', r'\1 \2\3', name)
-            # If year is at the end with no space, add space
-            name = re.sub(r'(\D)(' + re.escape(vintage) + r')$', r'\1 \2', name)
-        
-        # Extract price
-        price = None
-        price_selectors = ['.price', '[class*="price"]', 'span[data-price]', '.amount']
-        for selector in price_selectors:
-            price_elem = element.select_one(selector)
-            if price_elem:
-                price_text = price_elem.get_text(strip=True)
-                price = self.clean_price(price_text)
-                if price:
-                    break
-        
-        # Extract link
-        product_url = None
-        link = element.select_one('a')
-        if link and link.get('href'):
-            href = link['href']
-            # Make absolute URL if relative
-            if href.startswith('/'):
-                from urllib.parse import urljoin
-                product_url = urljoin(self.shop_url, href)
-            elif href.startswith('http'):
-                product_url = href
-        
-        # Extract variety from cleaned name
-        variety = self.extract_variety(name)
-        
-        # Extract description
-        description = None
-        desc_selectors = ['.description', '.product-description', 'p']
-        for selector in desc_selectors:
-            desc_elem = element.select_one(selector)
-            if desc_elem:
-                description = desc_elem.get_text(strip=True)
-                if description and len(description) > 10:
-                    break
-        
-        # Build wine data
-        wine_data = {
-            'winery_id': self.winery_id,
-            'name': name.strip(),
-            'variety': variety,
-            'vintage': vintage,
-            'price': price,
-            'description': description,
-            'product_url': product_url,
-        }
-        
-        return wine_data
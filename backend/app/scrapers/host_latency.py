@@ -0,0 +1,131 @@
+"""
+Per-host navigation latency stats and the adaptive timeouts derived from them
+
+Hardcoded timeouts fit nobody: fast sites wait 20-30s on dead pages, while slow
+hosts (Lark Hill on Square.site) time out on pages that would have loaded.
+Instead, every navigation's latency is recorded per (host, page kind) and the
+timeout becomes p99 x 1.5 of what that host has actually needed, clamped to
+SCRAPER_TIMEOUT_MIN_MS..SCRAPER_TIMEOUT_MAX_MS.
+
+- Until a host has MIN_SAMPLES samples, the old fixed defaults are used
+- A timed-out navigation is recorded as a sample of its timeout (a lower bound
+  on the real latency), so a host that keeps timing out gets longer timeouts
+- The last MAX_SAMPLES samples per host/kind are kept, so stats follow changes
+  in a site's speed
+
+Stats persist as JSON in SCRAPER_LATENCY_STATS_FILE. save() merges with what is
+on disk, so separate scrape processes don't overwrite each other's samples.
+"""
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlparse
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Timeouts used until a host has enough history
+DEFAULT_TIMEOUTS_MS = {
+    'listing': 30000,
+    'product': 20000,
+}
+MIN_SAMPLES = 5
+MAX_SAMPLES = 200
+PERCENTILE = 0.99
+HEADROOM = 1.5
+
+
+def host_of(url: str) -> str:
+    """Stats key for a URL (lowercased host, without www.)"""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+class HostLatencyStats:
+    """Navigation latency history per host, persisted between runs"""
+
+    def __init__(self, path: str = None, min_timeout_ms: int = None, max_timeout_ms: int = None):
+        path = Path(path or settings.scraper_latency_stats_file)
+        if not path.is_absolute():
+            path = BACKEND_DIR / path
+        self.path = path
+        self.min_timeout_ms = min_timeout_ms or settings.scraper_timeout_min_ms
+        self.max_timeout_ms = max_timeout_ms or settings.scraper_timeout_max_ms
+
+        self._samples = self._read()
+        self._new_samples = {}  # Recorded this run, not yet saved
+
+    def _read(self) -> Dict:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read latency stats {self.path}: {str(e)} - starting fresh")
+            return {}
+
+    def timeout_ms(self, url: str, kind: str) -> int:
+        """Navigation timeout for a URL: p99 x 1.5 of the host's history, within bounds"""
+        samples = self._samples.get(host_of(url), {}).get(kind, [])
+        if len(samples) < MIN_SAMPLES:
+            return DEFAULT_TIMEOUTS_MS[kind]
+        timeout = percentile(samples, PERCENTILE) * HEADROOM
+        return int(min(max(timeout, self.min_timeout_ms), self.max_timeout_ms))
+
+    def record(self, url: str, kind: str, elapsed_ms: float):
+        """Record one navigation's latency (or its timeout, if it timed out)"""
+        host = host_of(url)
+        elapsed_ms = round(elapsed_ms)
+        for store in (self._samples, self._new_samples):
+            samples = store.setdefault(host, {}).setdefault(kind, [])
+            samples.append(elapsed_ms)
+            del samples[:-MAX_SAMPLES]
+
+    def save(self):
+        """Merge this run's samples into the stats file"""
+        if not self._new_samples:
+            return
+        merged = self._read()
+        for host, kinds in self._new_samples.items():
+            for kind, samples in kinds.items():
+                stored = merged.setdefault(host, {}).setdefault(kind, [])
+                stored.extend(samples)
+                del stored[:-MAX_SAMPLES]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+        self._samples = merged
+        self._new_samples = {}
+
+    def summary(self) -> Dict:
+        """{host: {kind: {'samples', 'p50_ms', 'p99_ms', 'timeout_ms'}}} for reporting"""
+        report = {}
+        for host, kinds in sorted(self._samples.items()):
+            for kind, samples in kinds.items():
+                if not samples:
+                    continue
+                report.setdefault(host, {})[kind] = {
+                    'samples': len(samples),
+                    'p50_ms': percentile(samples, 0.5),
+                    'p99_ms': percentile(samples, PERCENTILE),
+                    'timeout_ms': self.timeout_ms(f"https://{host}/", kind),
+                }
+        return report
@@ -0,0 +1,148 @@
+"""
+Compressed, content-addressed archive of fetched product pages
+
+When extraction logic is fixed (e.g. the Barton Estate vintage fix), the fix
+can be re-applied to the whole catalog from this archive with reextract.py
+instead of re-crawling every site.
+
+Layout (under SCRAPER_ARCHIVE_DIR):
+    objects/ab/abcdef....html.gz    gzip'd HTML, named by SHA-256 of the HTML
+    index/<winery_id>.json          {product_url: {"sha256": ..., "fetched_at": ...}}
+
+Only the latest snapshot per product URL is indexed. Identical pages share one
+object, so nightly re-fetches of unchanged pages cost no extra disk.
+
+Retention: prune() drops index entries not re-fetched within
+SCRAPER_ARCHIVE_RETENTION_DAYS, then deletes objects nothing points to.
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+class HtmlArchive:
+    """Filesystem archive of product page HTML, content-addressed by hash"""
+
+    def __init__(self, root: str = None):
+        root = Path(root or settings.scraper_archive_dir)
+        if not root.is_absolute():
+            root = BACKEND_DIR / root
+        self.root = root
+        self.objects_dir = root / 'objects'
+        self.index_dir = root / 'index'
+        self._indexes = {}
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.html.gz"
+
+    def _index_path(self, winery_id: int) -> Path:
+        return self.index_dir / f"{winery_id}.json"
+
+    def _load_index(self, winery_id: int) -> Dict:
+        if winery_id not in self._indexes:
+            path = self._index_path(winery_id)
+            if path.exists():
+                with open(path, encoding='utf-8') as f:
+                    self._indexes[winery_id] = json.load(f)
+            else:
+                self._indexes[winery_id] = {}
+        return self._indexes[winery_id]
+
+    def _write_index(self, winery_id: int):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        path = self._index_path(winery_id)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._indexes[winery_id], f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)  # Atomic - readers never see a half-written index
+
+    def store(self, winery_id: int, url: str, html: str) -> str:
+        """
+        Archive a fetched page and point the URL's index entry at it
+        Returns: SHA-256 of the HTML
+        """
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        index = self._load_index(winery_id)
+        index[url] = {
+            'sha256': digest,
+            'fetched_at': datetime.utcnow().isoformat(timespec='seconds'),
+        }
+        self._write_index(winery_id)
+        return digest
+
+    def load(self, digest: str) -> str:
+        """Return the archived HTML for a hash"""
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def winery_ids(self):
+        """IDs of all wineries with archived pages"""
+        if not self.index_dir.exists():
+            return []
+        return sorted(int(p.stem) for p in self.index_dir.glob('*.json'))
+
+    def entries(self, winery_id: int) -> Iterator[Tuple[str, str, str]]:
+        """Yield (product_url, sha256, fetched_at) for a winery's latest snapshots"""
+        for url, entry in sorted(self._load_index(winery_id).items()):
+            yield url, entry['sha256'], entry['fetched_at']
+
+    def prune(self, retention_days: int = None) -> Dict:
+        """
+        Apply the retention policy
+
+        1. Drop index entries whose page hasn't been fetched for retention_days
+           (product no longer listed)
+        2. Delete objects no index entry references
+        Returns: counts of removed entries/objects and bytes freed
+        """
+        retention_days = retention_days or settings.scraper_archive_retention_days
+        cutoff = (datetime.utcnow() - timedelta(days=retention_days)).isoformat(timespec='seconds')
+
+        removed_entries = 0
+        referenced = set()
+        for winery_id in self.winery_ids():
+            index = self._load_index(winery_id)
+            expired = [url for url, entry in index.items() if entry['fetched_at'] < cutoff]
+            for url in expired:
+                del index[url]
+            if expired:
+                removed_entries += len(expired)
+                self._write_index(winery_id)
+            referenced.update(entry['sha256'] for entry in index.values())
+
+        removed_objects = 0
+        bytes_freed = 0
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob('*/*.html.gz'):
+                if path.name[:-len('.html.gz')] not in referenced:
+                    bytes_freed += path.stat().st_size
+                    path.unlink()
+                    removed_objects += 1
+
+        logger.info(f"Archive prune: {removed_entries} entries, {removed_objects} objects, {bytes_freed} bytes")
+        return {
+            'removed_entries': removed_entries,
+            'removed_objects': removed_objects,
+            'bytes_freed': bytes_freed,
+        }
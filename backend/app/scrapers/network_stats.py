@@ -0,0 +1,87 @@
+"""
+Network cost accounting for scraped pages
+
+Attach a NetworkStats to a Playwright page and it counts, from the page's
+request/response events:
+- requests:   every request the page made (documents, scripts, images, XHR...)
+- bytes:      response headers + body bytes as received (compressed size)
+- cache_hits: responses served from cache (304 revalidations, service worker)
+- blocked:    requests the server refused - a 401/403/429/451 response (bot
+              protection, rate limits) or ERR_BLOCKED_BY_RESPONSE
+- failed:     other failed requests (DNS, connection reset, ...)
+
+Requests that fail with net::ERR_ABORTED were cancelled by the page itself
+(a superseded navigation, a resource it stopped loading) and count as neither.
+
+Per-page stats are merged into a per-winery total, which is stored on the
+run's scrape_logs row. network_cost_report.py ranks wineries by cost per wine.
+"""
+import asyncio
+from typing import Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ('requests', 'bytes', 'cache_hits', 'blocked', 'failed')
+
+# Response statuses that mean the server refused to serve us
+REFUSED_STATUSES = {401, 403, 429, 451}
+
+
+class NetworkStats:
+    """Request/byte counters for one page (or, merged, for a whole winery)"""
+
+    def __init__(self):
+        for counter in COUNTERS:
+            setattr(self, counter, 0)
+        self._pending = set()
+
+    def attach(self, page):
+        """Start counting a page's network traffic"""
+        page.on('request', self._on_request)
+        page.on('requestfinished', self._on_request_finished)
+        page.on('requestfailed', self._on_request_failed)
+
+    def _on_request(self, request):
+        self.requests += 1
+
+    def _on_request_finished(self, request):
+        # Sizes are only available asynchronously - settle() waits for these
+        task = asyncio.ensure_future(self._measure(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _measure(self, request):
+        try:
+            response = await request.response()
+            if response is not None and (response.status == 304 or response.from_service_worker):
+                self.cache_hits += 1
+            if response is not None and response.status in REFUSED_STATUSES:
+                self.blocked += 1
+            sizes = await request.sizes()
+            self.bytes += sizes['responseHeadersSize'] + sizes['responseBodySize']
+        except Exception as e:
+            # Page closed before Playwright could report sizes
+            logger.debug(f"No size for {request.url}: {str(e)}")
+
+    def _on_request_failed(self, request):
+        failure = request.failure or ''
+        if 'ERR_ABORTED' in failure:
+            return
+        if 'ERR_BLOCKED_BY_RESPONSE' in failure:
+            self.blocked += 1
+        else:
+            self.failed += 1
+
+    async def settle(self):
+        """Wait for outstanding size lookups (call before closing the page)"""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def merge(self, other: 'NetworkStats'):
+        """Add another page's counters into this total"""
+        for counter in COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+
+    def as_dict(self) -> Dict:
+        return {counter: getattr(self, counter) for counter in COUNTERS}
@@ -0,0 +1,182 @@
+"""
+Store platform detection and per-platform extraction strategies
+
+Most wineries run on one of a handful of shop platforms, and each platform
+marks up product links, titles and prices the same way on every site. The
+platform is detected once from the listing page (generator meta tag, asset
+hosts, platform JS globals) and cached in scraper_configs.platform_type.
+
+The registry maps platform_type -> PlatformStrategy. A strategy's selectors
+are tried first; only when they find nothing does EnhancedScraper fall back to
+its generic selector chain. Winery-specific vintage/variety logic (Barton
+Estate etc.) is per-winery, not per-platform, and stays in EnhancedScraper.
+
+Adding a platform:
+    @register_strategy
+    class MyPlatformStrategy(PlatformStrategy):
+        platform_type = 'myplatform'
+        markers = ['cdn.myplatform.com']
+        ...
+"""
+import re
+from typing import Dict, List, Optional
+import logging
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+GENERIC = 'generic'
+
+STRATEGIES: Dict[str, 'PlatformStrategy'] = {}
+
+
+def register_strategy(cls):
+    """Class decorator: add a strategy to the registry under its platform_type"""
+    STRATEGIES[cls.platform_type] = cls()
+    return cls
+
+
+def get_strategy(platform_type: Optional[str]) -> 'PlatformStrategy':
+    """Strategy for a platform (generic fallback for unknown/undetected)"""
+    return STRATEGIES.get(platform_type or GENERIC, STRATEGIES[GENERIC])
+
+
+def detect_platform(html: str, url: str = '') -> str:
+    """
+    Identify the shop platform from a listing page
+
+    Checks, in order: the generator meta tag, then each strategy's markers
+    (asset hosts, JS globals, platform class names) in the raw HTML/URL.
+    Returns: platform_type ('generic' if nothing matched)
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    generator = soup.find('meta', attrs={'name': re.compile('^generator$', re.I)})
+    generator = (generator.get('content') or '').lower() if generator else ''
+
+    haystack = f"{url}\n{html}".lower()
+    for strategy in STRATEGIES.values():
+        if generator and any(g in generator for g in strategy.generators):
+            return strategy.platform_type
+    for strategy in STRATEGIES.values():
+        if any(marker in haystack for marker in strategy.markers):
+            return strategy.platform_type
+    return GENERIC
+
+
+class PlatformStrategy:
+    """
+    Generic strategy: no platform-specific selectors, so EnhancedScraper's
+    full fallback chain runs
+    """
+    platform_type = GENERIC
+    generators: List[str] = []        # Substrings of <meta name="generator">
+    markers: List[str] = []           # Substrings of the listing URL/HTML
+
+    listing_link_selectors: List[str] = []
+    name_selectors: List[str] = []
+    price_selectors: List[str] = []
+    description_selectors: List[str] = []
+
+    @staticmethod
+    def _select_text(soup, selectors: List[str]) -> Optional[str]:
+        for selector in selectors:
+            elem = soup.select_one(selector)
+            if elem is None:
+                continue
+            # <meta property="og:price:amount" content="35.00"> etc.
+            text = elem.get('content') if elem.name == 'meta' else elem.get_text(' ', strip=True)
+            if text:
+                return text
+        return None
+
+    def extract_name(self, soup) -> Optional[str]:
+        return self._select_text(soup, self.name_selectors)
+
+    def extract_price_text(self, soup) -> Optional[str]:
+        return self._select_text(soup, self.price_selectors)
+
+    def extract_description(self, soup) -> Optional[str]:
+        return self._select_text(soup, self.description_selectors)
+
+
+register_strategy(PlatformStrategy)
+
+
+@register_strategy
+class ShopifyStrategy(PlatformStrategy):
+    platform_type = 'shopify'
+    generators = ['shopify']
+    markers = ['cdn.shopify.com', 'window.shopify', 'shopify.theme', '.myshopify.com']
+
+    listing_link_selectors = ['a[href*="/products/"]']
+    name_selectors = ['h1.product__title', 'h1.product-single__title', '.product__title h1']
+    price_selectors = ['meta[property="og:price:amount"]', '.price-item--regular', '.product__price']
+    description_selectors = ['.product__description', '.product-single__description']
+
+
+@register_strategy
+class WooCommerceStrategy(PlatformStrategy):
+    platform_type = 'woocommerce'
+    generators = ['woocommerce']
+    markers = ['/wp-content/plugins/woocommerce/', 'woocommerce-page', 'wc-block-']
+
+    listing_link_selectors = ['a.woocommerce-LoopProduct-link', 'li.product a[href*="/product"]']
+    # Titles: h1.product_title is already first in the generic chain (incl. the
+    # Pankhurst inner-div handling), so no name selectors here
+    price_selectors = ['.summary .price ins .amount', '.summary .price .amount', 'p.price .amount']
+    description_selectors = [
+        '.woocommerce-product-details__short-description',
+        '#tab-description',
+    ]
+
+
+@register_strategy
+class SquarespaceStrategy(PlatformStrategy):
+    platform_type = 'squarespace'
+    generators = ['squarespace']
+    markers = ['static1.squarespace.com', 'squarespace_context', 'this is squarespace']
+
+    listing_link_selectors = ['a.grid-item-link', '.ProductList-item a', 'a.product-list-item-link']
+    name_selectors = ['h1.ProductItem-details-title', 'h1.product-title']
+    price_selectors = ['meta[property="product:price:amount"]', '.ProductItem-details .product-price', '.product-price']
+    description_selectors = ['.ProductItem-details-excerpt', '.product-description']
+
+
+@register_strategy
+class WixStrategy(PlatformStrategy):
+    platform_type = 'wix'
+    generators = ['wix.com']
+    markers = ['static.wixstatic.com', 'static.parastorage.com', 'wix-warmup-data']
+
+    listing_link_selectors = ['a[data-hook="product-item-container"]', 'a[href*="/product-page/"]']
+    name_selectors = ['[data-hook="product-title"]']
+    price_selectors = ['[data-hook="formatted-primary-price"]', '[data-hook="product-price"]']
+    description_selectors = ['[data-hook="description"]']
+
+
+@register_strategy
+class SquareStrategy(PlatformStrategy):
+    """Square Online (square.site, formerly Weebly / editmysite)"""
+    platform_type = 'square'
+    generators = ['square online', 'weebly']
+    markers = ['.square.site', 'editmysite.com', 'squarecdn.com']
+
+    listing_link_selectors = ['a[href*="/product/"]']
+    name_selectors = ['h1[class*="product-title"]', 'h1']
+    price_selectors = ['[class*="product-price"]', '[data-testid="product-price"]']
+    description_selectors = ['[class*="product-description"]']
+
+
+@register_strategy
+class GoDaddyStrategy(PlatformStrategy):
+    """GoDaddy Website Builder / Airo (heavy JS - usually needs manual entry)"""
+    platform_type = 'godaddy'
+    generators = ['godaddy', 'starfield technologies']
+    # Not a bare 'godaddy': footers and parked-domain links mention it on any host
+    markers = ['img1.wsimg.com', 'data-aid=']
+
+    listing_link_selectors = ['a[href*="/products/"]', 'a[data-aid*="PRODUCT"]']
+    name_selectors = ['[data-aid="PRODUCT_NAME_RENDERED"]']
+    price_selectors = ['[data-aid="PRODUCT_PRICE_RENDERED"]']
+    description_selectors = ['[data-aid="PRODUCT_DESCRIPTION_RENDERED"]']
@@ -0,0 +1,218 @@
+"""
+Product variants from state embedded in the page
+
+Some product pages carry several vintages (or sizes) of one wine and switch
+between them with JavaScript (Wimbaliri, many Shopify stores). Instead of
+simulating clicks, read the variant data the page already ships:
+- Shopify:      the theme's product JSON (<script data-product-json>), or any
+                other embedded product object (ProductJson-*, JSON scripts,
+                ShopifyAnalytics/`var meta`) whose handle is the page URL's -
+                pages also embed recommended / upsell products, whose variants
+                must not be read as this wine's. Prices in cents
+- Next.js:      <script id="__NEXT_DATA__"> - the "variants" of props.pageProps.product,
+                or of the product object whose handle/slug is the page URL's
+- WooCommerce:  form.variations_form[data-product_variations]
+
+extract_variants() returns a normalised list:
+    [{'label': '2019', 'price': 45.0, 'available': True}, ...]
+Turning variants into wines (which ones are vintages) is up to the scraper.
+"""
+import html as html_lib
+import json
+import re
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlparse
+import logging
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Keys a variant's display price may live under, in preference order
+PRICE_KEYS = ['display_price', 'price', 'priceAmount', 'amount', 'salePrice', 'regularPrice']
+
+
+def _to_price(value, cents: bool = False) -> Optional[float]:
+    if isinstance(value, dict):
+        # {"amount": "45.00", "currencyCode": "AUD"} (Shopify Storefront / Next.js)
+        value = value.get('amount', value.get('value'))
+    if value in (None, ''):
+        return None
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return round(price / 100, 2) if cents else price
+
+
+def _shopify_variants(product: Dict) -> List[Dict]:
+    variants = []
+    # Theme `product | json` output has integer cent prices; /products/x.js and
+    # /products/x.json have "45.00" strings
+    for variant in product.get('variants') or []:
+        raw_price = variant.get('price')
+        cents = isinstance(raw_price, int)
+        variants.append({
+            'label': variant.get('title') or variant.get('public_title') or variant.get('name') or '',
+            'price': _to_price(raw_price, cents=cents),
+            'available': variant.get('available', True) is not False,
+        })
+    return variants
+
+
+def _url_handle(url: Optional[str]) -> Optional[str]:
+    """Shopify handle from a product URL (/products/<handle>, /collections/x/products/<handle>)"""
+    if not url:
+        return None
+    return unquote(urlparse(url).path.rstrip('/').rsplit('/', 1)[-1]).lower() or None
+
+
+def _find_shopify_product(soup, url: Optional[str] = None) -> Optional[Dict]:
+    """
+    The page's own product: the data-product-json script, else an embedded
+    product object whose handle matches the URL (never just any product JSON)
+    """
+    handle = _url_handle(url)
+
+    def is_page_product(product, trusted: bool) -> bool:
+        if not isinstance(product, dict) or not isinstance(product.get('variants'), list):
+            return False
+        return trusted or (handle is not None and str(product.get('handle') or '').lower() == handle)
+
+    for script in soup.select('script[data-product-json], script[id^="ProductJson"], script[type="application/json"]'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+        product = data.get('product', data) if isinstance(data, dict) else None
+        if is_page_product(product, trusted=script.has_attr('data-product-json')):
+            return product
+
+    # ShopifyAnalytics.meta = {"product": {...}} / var meta = {"product": {...}}
+    for script in soup.find_all('script'):
+        text = script.string or ''
+        match = re.search(r'(?:var meta|ShopifyAnalytics\.meta)\s*=\s*(\{.*?\});', text, re.S)
+        if not match:
+            continue
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        product = data.get('product')
+        if is_page_product(product, trusted=False):
+            return product
+    return None
+
+
+def _has_variants(node) -> bool:
+    return isinstance(node, dict) and isinstance(node.get('variants'), list) and bool(node['variants']) \
+        and isinstance(node['variants'][0], dict)
+
+
+def _find_products(node, found: List[Dict]):
+    """Collect every object with a "variants" list (depth-first)"""
+    if isinstance(node, dict):
+        if _has_variants(node):
+            found.append(node)
+        for value in node.values():
+            _find_products(value, found)
+    elif isinstance(node, list):
+        for item in node:
+            _find_products(item, found)
+
+
+def _find_next_product(data: Dict, url: Optional[str] = None) -> Optional[Dict]:
+    """
+    The page's own product in __NEXT_DATA__: props.pageProps.product, else a
+    product object whose handle/slug is the page URL's. Other products in the
+    props (recommended, upsell, "you may also like") are never read
+    """
+    props = data.get('props', data)
+    page_props = props.get('pageProps') if isinstance(props, dict) else None
+    product = page_props.get('product') if isinstance(page_props, dict) else None
+    if _has_variants(product):
+        return product
+
+    handle = _url_handle(url)
+    if handle is None:
+        return None
+    found = []
+    _find_products(props, found)
+    for product in found:
+        if any(str(product.get(key) or '').lower() == handle for key in ('handle', 'slug')):
+            return product
+    return None
+
+
+def _next_data_variants(soup, url: Optional[str] = None) -> List[Dict]:
+    script = soup.find('script', id='__NEXT_DATA__')
+    if script is None:
+        return []
+    try:
+        data = json.loads(script.string or '')
+    except ValueError:
+        return []
+    if not isinstance(data, dict):
+        return []
+
+    product = _find_next_product(data, url)
+    if product is None:
+        return []
+
+    variants = []
+    for variant in product['variants']:
+        price = None
+        for key in PRICE_KEYS:
+            price = _to_price(variant.get(key))
+            if price is not None:
+                break
+        available = variant.get('available', variant.get('availableForSale', variant.get('inStock', True)))
+        variants.append({
+            'label': str(variant.get('title') or variant.get('name') or ''),
+            'price': price,
+            'available': available is not False,
+        })
+    return variants
+
+
+def _woocommerce_variants(soup) -> List[Dict]:
+    form = soup.select_one('form.variations_form[data-product_variations]')
+    if form is None:
+        return []
+    try:
+        # Attribute is HTML-escaped JSON; "false" means "load via AJAX" (too many variations)
+        data = json.loads(html_lib.unescape(form['data-product_variations']))
+    except ValueError:
+        return []
+    if not isinstance(data, list):
+        return []
+
+    variants = []
+    for variation in data:
+        attributes = variation.get('attributes') or {}
+        variants.append({
+            'label': ' / '.join(str(value) for value in attributes.values() if value),
+            'price': _to_price(variation.get('display_price')),
+            'available': variation.get('is_in_stock', True) is not False
+                         and variation.get('is_purchasable', True) is not False,
+        })
+    return variants
+
+
+def extract_variants(html: str, url: Optional[str] = None) -> List[Dict]:
+    """
+    Variants embedded in a product page (Shopify, Next.js, WooCommerce)
+    url: the page's URL - identifies the page's own Shopify / Next.js product
+    Returns: [] when the page has no variant data
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    product = _find_shopify_product(soup, url)
+    if product:
+        return _shopify_variants(product)
+
+    variants = _woocommerce_variants(soup)
+    if variants:
+        return variants
+
+    return _next_data_variants(soup, url)
@@ -0,0 +1,148 @@
+"""
+Wine variety names and their canonical forms
+
+Winery sites spell the same variety several ways ("Syrah", "Sauv Blanc",
+"Savvy B", "Rosé"/"Rose"). wines.variety_canonical (a generated column, see
+app.models.wine) maps the stored variety to one name per variety with this
+list, so filters and counts group the spellings together.
+
+Only the canonical column and the filters use it: what the scrapers store is
+still BaseScraper.extract_variety's own keyword list, unchanged.
+
+Canonical names follow these rules, in Python (canonical_variety) and SQL
+(variety_canonical_sql) alike - both match the same regular expressions:
+- spellings match whole words only ('Primrose' is not a Rosé)
+- one variety found: its canonical name ('Canberra Syrah' -> 'Shiraz')
+- several (a blend: 'Shiraz Viognier', 'Pinot Noir Rosé') or none ('GSM'):
+  the stored text, trimmed but otherwise unchanged (never re-cased)
+
+Changing the list changes the generated column's expression - add a migration
+that recreates wines.variety_canonical with variety_canonical_sql().
+"""
+import re
+from typing import Optional
+
+# (spelling, canonical name); several spellings of a variety share a canonical name
+VARIETY_ALIASES = [
+    ('shiraz', 'Shiraz'),
+    ('syrah', 'Shiraz'),
+    ('riesling', 'Riesling'),
+    ('chardonnay', 'Chardonnay'),
+    ('pinot noir', 'Pinot Noir'),
+    ('cabernet sauvignon', 'Cabernet Sauvignon'),
+    ('merlot', 'Merlot'),
+    ('tempranillo', 'Tempranillo'),
+    ('viognier', 'Viognier'),
+    ('sangiovese', 'Sangiovese'),
+    ('pinot gris', 'Pinot Gris'),
+    ('pinot grigio', 'Pinot Gris'),
+    ('sauvignon blanc', 'Sauvignon Blanc'),
+    # Abbreviations for Sauvignon Blanc
+    ('sauv blanc', 'Sauvignon Blanc'),
+    ('savvy b', 'Sauvignon Blanc'),
+    ('sav blanc', 'Sauvignon Blanc'),
+    ('semillon', 'Semillon'),
+    ('gewurztraminer', 'Gewurztraminer'),
+    ('cabernet franc', 'Cabernet Franc'),
+    ('cabernet', 'Cabernet Sauvignon'),
+    ('malbec', 'Malbec'),
+    ('grenache', 'Grenache'),
+    ('mourvedre', 'Mourvedre'),
+    ('marsanne', 'Marsanne'),
+    ('roussanne', 'Roussanne'),
+    ('vermentino', 'Vermentino'),
+    ('fiano', 'Fiano'),
+    ('arneis', 'Arneis'),
+    ('nebbiolo', 'Nebbiolo'),
+    ('montepulciano', 'Montepulciano'),
+    ('barbera', 'Barbera'),
+    ('zinfandel', 'Zinfandel'),
+    ('petit verdot', 'Petit Verdot'),
+    ('rose', 'Rosé'),
+    ('rosé', 'Rosé'),
+    ('sparkling', 'Sparkling'),
+    ('blanc de blancs', 'Blanc de Blancs'),
+    ('blanc de blanc', 'Blanc de Blancs'),
+    ('blanc de noirs', 'Blanc de Noirs'),
+    ('prosecco', 'Prosecco'),
+    ('methode traditionnelle', 'Methode Traditionnelle'),
+    ('champagne', 'Champagne'),
+    ('moscato', 'Moscato'),
+    # Less common but present in Canberra
+    ('gruner veltliner', 'Grüner Veltliner'),
+    ('grüner veltliner', 'Grüner Veltliner'),
+    ('chenin blanc', 'Chenin Blanc'),
+    ('verdelho', 'Verdelho'),
+    ('savagnin', 'Savagnin'),
+    ('petit manseng', 'Petit Manseng'),
+    ('albarino', 'Albariño'),
+    ('albariño', 'Albariño'),
+    ('gamay', 'Gamay'),
+    ('nero d\'avola', 'Nero d\'Avola'),
+    ('aglianico', 'Aglianico'),
+    ('graciano', 'Graciano'),
+    ('tannat', 'Tannat'),
+    ('carmenere', 'Carménère'),
+    ('carménère', 'Carménère'),
+    ('touriga nacional', 'Touriga Nacional'),
+    ('primitivo', 'Primitivo'),
+    ('dolcetto', 'Dolcetto'),
+    ('cortese', 'Cortese'),
+    ('verdicchio', 'Verdicchio'),
+]
+
+
+# Letters that continue a word (lowercase; matching is case-insensitive)
+_WORD_CHARS = "a-z0-9à-ÿ"
+
+
+def _alias_pattern(alias: str) -> str:
+    """Regex for one spelling; a word of another variety's longer spelling may not follow
+    (bare 'cabernet' is Cabernet Sauvignon, but not in 'cabernet franc')"""
+    words = r'\s+'.join(re.escape(word) for word in alias.split())
+    longer = sorted({
+        other[len(alias):].strip() for other, canonical in VARIETY_ALIASES
+        if other.startswith(alias + ' ') and canonical != dict(VARIETY_ALIASES)[alias]
+    })
+    return words + ''.join(rf'(?!\s+{re.escape(rest)})' for rest in longer)
+
+
+def _variety_patterns():
+    """(canonical name, regex matching any of its spellings as whole words), in list order"""
+    spellings = {}
+    for alias, canonical in VARIETY_ALIASES:
+        spellings.setdefault(canonical, []).append(_alias_pattern(alias))
+    return [
+        (canonical, f"(^|[^{_WORD_CHARS}])({'|'.join(patterns)})($|[^{_WORD_CHARS}])")
+        for canonical, patterns in spellings.items()
+    ]
+
+
+VARIETY_PATTERNS = _variety_patterns()
+_COMPILED_PATTERNS = [(canonical, re.compile(pattern, re.IGNORECASE)) for canonical, pattern in VARIETY_PATTERNS]
+
+
+def canonical_variety(text: Optional[str]) -> Optional[str]:
+    """
+    Canonical name for a variety as stored or typed ('syrah' -> 'Shiraz')
+    Blends and unknown varieties are returned trimmed, as given ('GSM' -> 'GSM')
+
+    Must agree with variety_canonical_sql(), which computes the column
+    """
+    trimmed = (text or '').strip(' ')  # btrim()
+    if not trimmed:
+        return None
+    found = [canonical for canonical, pattern in _COMPILED_PATTERNS if pattern.search(trimmed)]
+    return found[0] if len(found) == 1 else trimmed
+
+
+def variety_canonical_sql(column: str = 'variety') -> str:
+    """canonical_variety() as a SQL expression (immutable, for a generated column)"""
+    matches = [(canonical, f"{column} ~* '{_quote(pattern)}'") for canonical, pattern in VARIETY_PATTERNS]
+    found = ' + '.join(f"({match})::int" for _, match in matches)
+    whens = ' '.join(f"WHEN {match} THEN '{_quote(canonical)}'" for canonical, match in matches)
+    return f"CASE WHEN {found} = 1 THEN CASE {whens} END ELSE nullif(btrim({column}), '') END"
+
+
+def _quote(value: str) -> str:
+    return value.replace("'", "''")
@@ -0,0 +1,124 @@
+"""
+Catalog change feed
+
+Every mutation that matters downstream (new wine, price, availability, status)
+is appended to catalog_changes with a monotonically increasing version.
+Consumers (caches, alerts, exports) remember the last version they processed
+and read only what came after it (GET /api/admin/changes?since=N).
+
+Versions come from a sequence, and sequence values are handed out at insert
+time, not commit time - two overlapping transactions could commit versions out
+of order and a reader could skip the lower one. Writers therefore append under
+a transaction-level advisory lock, as the last step before committing, so
+versions become visible in order. Call record_changes() right before
+db.commit().
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.models.wine import Wine, CatalogChange
+
+NEW = 'new'
+PRICE = 'price'
+AVAILABILITY = 'availability'
+STATUS = 'status'
+
+# pg_advisory_xact_lock key serializing feed writers (any constant unique to the feed)
+FEED_LOCK_KEY = 7310001
+
+TRACKED_FIELDS = ['price', 'is_available', 'status']
+
+
+def _value(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def change(wine_id: int, winery_id: int, change_type: str, old_value, new_value, source: str) -> Dict:
+    if change_type == PRICE:
+        old_value, new_value = [None if v is None else f"{float(v):.2f}" for v in (old_value, new_value)]
+    return {
+        'wine_id': wine_id,
+        'winery_id': winery_id,
+        'change_type': change_type,
+        'old_value': _value(old_value),
+        'new_value': _value(new_value),
+        'source': source,
+    }
+
+
+def record_changes(db: Session, changes: Iterable[Dict]) -> int:
+    """
+    Append changes to the feed (one INSERT); call right before db.commit()
+    Returns: number of changes recorded
+    """
+    changes = list(changes)
+    if not changes:
+        return 0
+
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': FEED_LOCK_KEY})
+    now = datetime.utcnow()
+    db.execute(insert(CatalogChange.__table__), [dict(c, changed_at=now) for c in changes])
+    return len(changes)
+
+
+def wine_snapshot(wine: Wine) -> Dict:
+    """Tracked fields of a wine before an edit (pass to wine_changes afterwards)"""
+    return {field: getattr(wine, field) for field in TRACKED_FIELDS}
+
+
+def wine_changes(wine: Wine, before: Optional[Dict], source: str = 'admin') -> List[Dict]:
+    """
+    Changes between a snapshot and the wine's current state
+    before=None means the wine was just created
+    """
+    if before is None:
+        return [change(wine.id, wine.winery_id, NEW, None, wine.status, source)]
+
+    changes = []
+    if before['price'] is not None or wine.price is not None:
+        if before['price'] is None or wine.price is None or float(before['price']) != float(wine.price):
+            changes.append(change(wine.id, wine.winery_id, PRICE, before['price'], wine.price, source))
+    if before['is_available'] != wine.is_available:
+        changes.append(change(wine.id, wine.winery_id, AVAILABILITY, before['is_available'], wine.is_available, source))
+    if before['status'] != wine.status:
+        changes.append(change(wine.id, wine.winery_id, STATUS, before['status'], wine.status, source))
+    return changes
+
+
+def deleted_wine_change(wine: Wine, source: str = 'admin') -> Dict:
+    return change(wine.id, wine.winery_id, STATUS, wine.status, 'deleted', source)
+
+
+def scrape_changes(winery_id: int, saved_wines: List[Dict], removed_wines: List[Dict],
+                   source: str = 'scrape') -> List[Dict]:
+    """
+    Changes from a set-based scrape save (wine_service / wine_ingest result rows)
+    """
+    changes = []
+    for wine in saved_wines:
+        if wine['inserted']:
+            changes.append(change(wine['id'], winery_id, NEW, None, wine['status'], source))
+            continue
+        if wine['price'] != wine['old_price']:
+            changes.append(change(wine['id'], winery_id, PRICE, wine['old_price'], wine['price'], source))
+        if wine['old_available'] is False:
+            changes.append(change(wine['id'], winery_id, AVAILABILITY, False, True, source))
+        if wine['old_status'] != wine['status']:
+            changes.append(change(wine['id'], winery_id, STATUS, wine['old_status'], wine['status'], source))
+    for wine in removed_wines:
+        changes.append(change(wine['id'], winery_id, AVAILABILITY, True, False, source))
+    return changes
+
+
+def changes_since(db: Session, since: int = 0, limit: int = 1000) -> List[CatalogChange]:
+    """Feed entries after a version, oldest first"""
+    return db.query(CatalogChange).filter(
+        CatalogChange.version > since
+    ).order_by(CatalogChange.version).limit(limit).all()
@@ -0,0 +1,66 @@
+"""
+Cached list totals
+
+GET /api/wines answers the same few filter combinations over and over (no
+filter, one variety, a price range), and the count behind "Browse N wines"
+is usually the more expensive half of a request. Totals are kept in process
+for a short time (WINE_COUNT_CACHE_SECONDS) per normalized filter set, so
+paging through a result or reloading the page doesn't count again.
+
+Counts can be up to the TTL stale after a scrape or an approval - fine for a
+"N wines" label, which is all they are used for.
+"""
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from app.config import settings
+
+
+def count_key(**filters) -> Tuple:
+    """
+    Cache key for a filter set: unset filters dropped, case-insensitive (ILIKE)
+    filters lowercased, so equivalent requests share an entry
+    """
+    key = []
+    for name, value in sorted(filters.items()):
+        if value is None or value == '' or value == ():
+            continue
+        if name in ('search', 'variety'):
+            value = value.lower()
+        key.append((name, value))
+    return tuple(key)
+
+
+class CountCache:
+    """Small in-process TTL cache of totals (LRU-bounded)"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, total = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return total
+
+    def set(self, key: Hashable, total: int):
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic(), total)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+wine_counts = CountCache(settings.wine_count_cache_seconds)
@@ -0,0 +1,116 @@
+"""
+Facet counts for the wine list filters
+
+The filter sidebar needs, for the wines matching the current filters, how many
+there are of each variety, each vintage, from each winery and in each price
+range. Four GROUP BYs would be four scans; GROUPING SETS does them in one
+query and one pass over the filtered rows:
+
+    GROUP BY GROUPING SETS ((variety_canonical), (vintage), (winery.id, winery.name),
+                            (price_bucket), ())
+
+Each result row belongs to exactly one set; GROUPING(col) is 0 for the columns
+that set groups by, which tells the rows apart (a NULL variety in the variety
+set is a real "no variety" group, not a rolled-up column). The () set is the
+grand total.
+
+Counts are for the filtered set as-is: with varieties=Shiraz selected, the
+variety facet shows only Shiraz.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, tuple_
+
+from app.models.wine import Wine
+from app.models.winery import Winery
+
+# (min, max) in dollars - min inclusive, max exclusive, None = open-ended
+PRICE_BUCKETS: List[Tuple[Optional[int], Optional[int]]] = [
+    (None, 20),
+    (20, 30),
+    (30, 50),
+    (50, 75),
+    (75, 100),
+    (100, None),
+]
+
+
+def price_bucket():
+    """Index into PRICE_BUCKETS for Wine.price (NULL when the wine has no price)"""
+    return case(
+        (Wine.price.is_(None), None),
+        *[(Wine.price < high, i) for i, (_, high) in enumerate(PRICE_BUCKETS) if high is not None],
+        else_=len(PRICE_BUCKETS) - 1,
+    )
+
+
+def bucket_label(low: Optional[int], high: Optional[int]) -> str:
+    if low is None:
+        return f"Under ${high}"
+    if high is None:
+        return f"${low}+"
+    return f"${low}-${high}"
+
+
+def facets_query(query):
+    """
+    All facet counts for a select(Wine) filter query, as one GROUPING SETS query
+
+    Rows: variety, vintage, winery_id, winery_name, bucket, the four GROUPING()
+    flags (g_variety, ...) and count
+    """
+    bucket = price_bucket()
+    return (
+        query.with_only_columns(
+            Wine.variety_canonical.label('variety'),
+            Wine.vintage,
+            Winery.id.label('winery_id'),
+            Winery.name.label('winery_name'),
+            bucket.label('bucket'),
+            func.grouping(Wine.variety_canonical).label('g_variety'),
+            func.grouping(Wine.vintage).label('g_vintage'),
+            func.grouping(Winery.id).label('g_winery'),
+            func.grouping(bucket).label('g_bucket'),
+            func.count().label('count'),
+        )
+        .join(Winery, Winery.id == Wine.winery_id)
+        .group_by(func.grouping_sets(
+            tuple_(Wine.variety_canonical),
+            tuple_(Wine.vintage),
+            tuple_(Winery.id, Winery.name),
+            tuple_(bucket),
+            tuple_(),
+        ))
+    )
+
+
+def collect_facets(rows) -> Dict:
+    """Split facets_query() rows into the response sections"""
+    total = 0
+    varieties, vintages, wineries = [], [], []
+    bucket_counts = {}
+    for row in rows:
+        if not row.g_variety:
+            if row.variety is not None:
+                varieties.append({"name": row.variety, "count": row.count})
+        elif not row.g_vintage:
+            if row.vintage is not None:
+                vintages.append({"year": row.vintage, "count": row.count})
+        elif not row.g_winery:
+            wineries.append({"id": row.winery_id, "name": row.winery_name, "count": row.count})
+        elif not row.g_bucket:
+            if row.bucket is not None:
+                bucket_counts[row.bucket] = row.count
+        else:
+            total = row.count
+
+    return {
+        "total": total,
+        "varieties": sorted(varieties, key=lambda v: v["name"]),
+        "vintages": sorted(vintages, key=lambda v: v["year"], reverse=True),
+        "wineries": sorted(wineries, key=lambda w: w["name"]),
+        "price_buckets": [
+            {"label": bucket_label(low, high), "min": low, "max": high, "count": bucket_counts.get(i, 0)}
+            for i, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+    }
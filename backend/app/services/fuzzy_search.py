@@ -0,0 +1,69 @@
+"""
+Fuzzy (trigram) wine search
+
+Wine names are full of odd spellings and typos ("Savvy B", "Grüner",
+"Shiraz Viognier" typed as "shiras vio"); substring ILIKE finds none of them.
+pg_trgm compares strings by their shared three-letter chunks, and the
+gin_trgm_ops indexes on wines.name, wines.variety and wineries.name (migration
+e9a4c6b2d318) let Postgres find similar strings without a sequential scan:
+
+    name %> query       word_similarity(query, name) >= 0.6 - the query is
+                        close to some part of the (longer) name
+    variety % query     similarity(variety, query) >= 0.3 - close to the whole
+
+Matches are scored by the best of the three similarities; suggestions_query()
+gives the closest known names / varieties / winery names for "did you mean".
+
+The three conditions are on two tables, so an OR of them can't use any of
+the indexes (Postgres scans every live wine). fuzzy_wines_query() finds the
+candidate ids with one branch per index and UNIONs them instead.
+"""
+from sqlalchemy import func, select, union, union_all
+
+from app.models.wine import Wine
+from app.models.winery import Winery
+
+SUGGESTION_LIMIT = 5
+
+
+def _live():
+    return [Wine.is_available == True, Wine.status == 'live']
+
+
+def score(q: str):
+    """How well a wine (joined with its winery) matches q, 0..1"""
+    return func.greatest(
+        func.word_similarity(q, Wine.name),
+        func.coalesce(func.similarity(Wine.variety, q), 0),
+        func.word_similarity(q, Winery.name),
+    )
+
+
+def fuzzy_wines_query(q: str):
+    """Live wines whose name, variety or winery name is similar to q (select(Wine) joined to Winery)"""
+    matching_ids = union(
+        select(Wine.id).where(*_live(), Wine.name.op('%>')(q)),                 # ix_wines_name_trgm
+        select(Wine.id).where(*_live(), Wine.variety.op('%')(q)),               # ix_wines_variety_trgm
+        select(Wine.id).join(Winery).where(*_live(), Winery.name.op('%>')(q)),  # ix_wineries_name_trgm
+    )
+    return select(Wine).join(Winery).where(Wine.id.in_(matching_ids))
+
+
+def suggestions_query(q: str, limit: int = SUGGESTION_LIMIT):
+    """Distinct known terms closest to q: (term, score), best first"""
+    varieties = select(Wine.variety.label('term'), func.similarity(Wine.variety, q).label('score')).where(
+        *_live(), Wine.variety.op('%')(q)
+    )
+    wine_names = select(Wine.name.label('term'), func.similarity(Wine.name, q).label('score')).where(
+        *_live(), Wine.name.op('%')(q)
+    )
+    winery_names = select(Winery.name.label('term'), func.similarity(Winery.name, q).label('score')).where(
+        Winery.is_active == True, Winery.name.op('%')(q)
+    )
+    terms = union_all(varieties, wine_names, winery_names).subquery()
+    return (
+        select(terms.c.term, func.max(terms.c.score).label('score'))
+        .group_by(terms.c.term)
+        .order_by(func.max(terms.c.score).desc(), terms.c.term)
+        .limit(limit)
+    )
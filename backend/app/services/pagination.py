@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination
+
+OFFSET pagination makes the database walk and discard every row before the
+page, so deep pages get slower the deeper they are. Keyset pagination instead
+remembers the sort key and id of the last row returned and asks for rows
+after it:
+
+    WHERE (name, id) > (:last_name, :last_id) ORDER BY name, id LIMIT :limit
+
+which a composite (name, id) index answers by seeking straight to the
+position - the same cost for page 1 and page 1000.
+
+The cursor handed to clients is opaque: URL-safe base64 of the JSON
+[sort value, id] pair. Clients pass back the `next_cursor` of the previous
+response and must not build cursors themselves.
+"""
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, datetime_key: bool = False) -> Tuple:
+    """
+    (sort value, id) from a cursor
+    Raises: HTTPException 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if datetime_key and sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+        if not isinstance(row_id, int):
+            raise ValueError(row_id)
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, row_id
+
+
+def keyset_page(query, sort_column, id_column, cursor: Optional[str], descending: bool = False):
+    """
+    Order a select() or Query by (sort_column, id_column), starting after the cursor
+    Fetch limit + 1 rows and pass them to next_page() to build the cursor.
+    """
+    # Paging by id alone (sort_column is id_column) needs no tie-breaker
+    columns = [sort_column] if sort_column is id_column else [sort_column, id_column]
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, datetime_key=sort_column.type.python_type is datetime)
+        key = tuple_(*columns)
+        last = tuple_(*([sort_value, row_id][-len(columns):]))
+        query = query.where(key < last if descending else key > last)
+
+    if descending:
+        return query.order_by(*[column.desc() for column in columns])
+    return query.order_by(*columns)
+
+
+def next_page(rows: List, limit: int, sort_attr: str) -> Tuple[List, Optional[str]]:
+    """Trim the extra row fetched by keyset_page and return (page, next_cursor)"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(getattr(last, sort_attr), last.id)
@@ -0,0 +1,207 @@
+"""
+In-process autocomplete index for the search box
+
+GET /api/search/suggest answers from memory, without touching Postgres. The
+index holds every live wine name, active winery name and variety, with a
+popularity (how many live wines carry that name / winery / variety).
+
+Each term is stored under every word start, so "noir" completes "Pinot Noir"
+as well as "pi" does:
+
+    keys (sorted):  "noir"  "pinot noir"  ...
+    lookup prefix p: bisect_left(keys, p) .. bisect_left(keys, p + '\\uffff')
+
+Entries in that range are ranked by popularity. Short prefixes match large
+ranges, so the array is split into blocks that remember their highest
+popularity; blocks that can't beat the current top-k are skipped without
+looking at their entries.
+
+The index is rebuilt on startup and whenever the catalog changes - a
+background task polls the catalog change feed version (plus the last wine /
+winery edit) every SUGGEST_REFRESH_SECONDS and rebuilds when it moved.
+"""
+import asyncio
+import heapq
+import logging
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.database import async_session
+from app.models.wine import Wine, CatalogChange
+from app.models.winery import Winery
+
+logger = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 20
+BLOCK_SIZE = 64
+
+
+def normalize(text: str) -> str:
+    """Case- and accent-insensitive form: 'Grüner  Veltliner' -> 'gruner veltliner'"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+class SuggestIndex:
+    """Sorted-array prefix index over (term, kind, popularity)"""
+
+    def __init__(self, terms: List[Tuple[str, str, int]] = ()):
+        # Term table: index -> (display text, kind, popularity)
+        self.terms: List[Tuple[str, str, int]] = []
+
+        seen = set()
+        entries = []
+        for text, kind, popularity in terms:
+            key = normalize(text)
+            if not key or (key, kind) in seen:
+                continue
+            seen.add((key, kind))
+            term_id = len(self.terms)
+            self.terms.append((text, kind, popularity))
+            words = key.split(' ')
+            for i in range(len(words)):
+                entries.append((' '.join(words[i:]), term_id))
+        entries.sort()
+
+        # Parallel sorted arrays: word-start key -> term index, popularity
+        self.keys = [key for key, _ in entries]
+        self.term_ids = [term_id for _, term_id in entries]
+        self.popularity = [self.terms[term_id][2] for term_id in self.term_ids]
+        # Highest popularity per block of BLOCK_SIZE entries, to skip blocks
+        # that can't beat the current top-k
+        self.block_max = [
+            max(self.popularity[i:i + BLOCK_SIZE]) for i in range(0, len(self.popularity), BLOCK_SIZE)
+        ]
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _top(self, start: int, end: int, limit: int) -> List[int]:
+        """Term ids of the `limit` most popular entries in keys[start:end] (ties: alphabetical)"""
+        heap = []  # (popularity, -position, term_id), smallest first
+        in_heap = set()
+        for block in range(start // BLOCK_SIZE, (end - 1) // BLOCK_SIZE + 1 if end > start else 0):
+            if len(heap) == limit and self.block_max[block] <= heap[0][0]:
+                continue
+            for position in range(max(start, block * BLOCK_SIZE), min(end, (block + 1) * BLOCK_SIZE)):
+                term_id = self.term_ids[position]
+                if term_id in in_heap:
+                    continue
+                item = (self.popularity[position], -position, term_id)
+                if len(heap) < limit:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    in_heap.discard(heapq.heapreplace(heap, item)[2])
+                else:
+                    continue
+                in_heap.add(term_id)
+        return [term_id for _, _, term_id in sorted(heap, reverse=True)]
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict]:
+        """Top completions of query by popularity"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + '\uffff', start)
+        return [
+            {'text': text, 'kind': kind, 'count': popularity}
+            for text, kind, popularity in (self.terms[i] for i in self._top(start, end, limit))
+        ]
+
+
+# ============================================================================
+# Building from the catalog and keeping it fresh
+# ============================================================================
+
+_index = SuggestIndex()
+_built_version: Optional[Tuple] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def suggest(query: str, limit: int = 8) -> List[Dict]:
+    """Completions from the current index (empty until the first build)"""
+    return _index.suggest(query, limit)
+
+
+def _live():
+    return [Wine.is_available == True, Wine.status == 'live']
+
+
+async def catalog_version(db) -> Tuple:
+    """
+    Changes whenever the feed gets an entry (new wines, status, availability)
+    or a wine or winery is edited (renames aren't feed entries)
+    """
+    version = await db.scalar(select(func.max(CatalogChange.version)))
+    wines_updated = await db.scalar(select(func.max(Wine.updated_at)))
+    wineries = (await db.execute(select(func.count(Winery.id), func.max(Winery.updated_at)))).one()
+    return (version, wines_updated, wineries[0], wineries[1])
+
+
+async def load_terms(db) -> List[Tuple[str, str, int]]:
+    wines = (await db.execute(
+        select(Wine.name, func.count()).where(*_live()).group_by(Wine.name)
+    )).all()
+    varieties = (await db.execute(
+        select(Wine.variety_canonical, func.count())
+        .where(*_live(), Wine.variety_canonical.isnot(None)).group_by(Wine.variety_canonical)
+    )).all()
+    wineries = (await db.execute(
+        select(Winery.name, func.count(Wine.id))
+        .outerjoin(Wine, (Wine.winery_id == Winery.id) & Wine.is_available.is_(True) & (Wine.status == 'live'))
+        .where(Winery.is_active == True).group_by(Winery.name)
+    )).all()
+    return (
+        [(name, 'winery', count) for name, count in wineries]
+        + [(variety, 'variety', count) for variety, count in varieties]
+        + [(name, 'wine', count) for name, count in wines]
+    )
+
+
+async def rebuild_suggest_index(force: bool = False) -> bool:
+    """
+    Rebuild from the catalog if it changed since the last build
+    Returns: True if the index was rebuilt
+    """
+    global _index, _built_version
+    async with async_session() as db:
+        version = await catalog_version(db)
+        if not force and version == _built_version:
+            return False
+        terms = await load_terms(db)
+
+    # Sorting ~100k keys takes a moment - keep it off the event loop
+    _index = await asyncio.to_thread(SuggestIndex, terms)
+    _built_version = version
+    logger.info(f"Suggest index rebuilt: {len(_index)} terms")
+    return True
+
+
+async def _refresh_loop():
+    while True:
+        await asyncio.sleep(settings.suggest_refresh_seconds)
+        try:
+            await rebuild_suggest_index()
+        except Exception as e:
+            logger.warning(f"Suggest index refresh failed: {e}")
+
+
+async def start_suggest_index():
+    """Build at startup and keep refreshing in the background"""
+    global _refresh_task
+    try:
+        await rebuild_suggest_index(force=True)
+    except Exception as e:
+        logger.warning(f"Suggest index build failed, will retry: {e}")
+    _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_suggest_index():
+    if _refresh_task is not None:
+        _refresh_task.cancel()
@@ -0,0 +1,162 @@
+"""
+Bulk ingestion of scraped wines through a COPY-loaded staging table
+
+For batches too big for VALUES lists (multi-region runs, tens of thousands of
+wines): rows are streamed into an UNLOGGED staging table with COPY, then merged
+into wines with set-based SQL, all in the caller's transaction:
+
+1. Staged wines without a vintage take the vintage of the single stored wine
+   with the same product_url and name (wine_service's vintage fallback)
+2. INSERT ... SELECT FROM staging ON CONFLICT on the wine identity key -
+   new wines go in as 'pending', existing ones get price/availability/
+   last_seen_at, price changes get a price_history row (same statement)
+3. One UPDATE marks the batch's wineries' wines that weren't saved as
+   unavailable (wines on keep_urls pages are left alone)
+
+The merge follows the same rules as wine_service.upsert_scraped_wines and
+returns the same row dicts, so callers can use either path.
+"""
+import csv
+import io
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.wine import WINE_NAME_KEY_SQL, WINE_VINTAGE_KEY_SQL
+
+STAGING_COLUMNS = ['winery_id', 'name', 'variety', 'vintage', 'price', 'description', 'product_url']
+
+STORED_VINTAGE_SQL = f"""
+UPDATE {{staging}} SET vintage = stored.vintage
+FROM (
+    SELECT winery_id, product_url, {WINE_NAME_KEY_SQL} AS name_key, max(vintage) AS vintage
+    FROM wines
+    WHERE winery_id = ANY(:winery_ids) AND product_url IS NOT NULL
+    GROUP BY winery_id, product_url, {WINE_NAME_KEY_SQL}
+    HAVING count(*) = 1
+) stored
+WHERE {{staging}}.vintage IS NULL
+  AND stored.vintage IS NOT NULL
+  AND stored.winery_id = {{staging}}.winery_id
+  AND stored.product_url = {{staging}}.product_url
+  AND stored.name_key = {WINE_NAME_KEY_SQL}
+"""
+
+MERGE_SQL = f"""
+WITH src AS (
+    -- A statement can't update the same row twice - last duplicate wins
+    SELECT DISTINCT ON (winery_id, {WINE_NAME_KEY_SQL}, {WINE_VINTAGE_KEY_SQL}) *
+    FROM {{staging}}
+    ORDER BY winery_id, {WINE_NAME_KEY_SQL}, {WINE_VINTAGE_KEY_SQL}, seq DESC
+),
+before AS (
+    SELECT id, price, is_available, status FROM wines WHERE winery_id = ANY(:winery_ids)
+),
+saved AS (
+    INSERT INTO wines (winery_id, name, variety, vintage, price, description, product_url,
+                       bottle_size, is_available, status, first_seen_at, last_seen_at,
+                       created_at, updated_at)
+    SELECT winery_id, name, variety, vintage, price, description, product_url,
+           '750ml', true, 'pending', :now, :now, :now, :now
+    FROM src
+    ON CONFLICT (winery_id, {WINE_NAME_KEY_SQL}, {WINE_VINTAGE_KEY_SQL}) DO UPDATE SET
+        price = coalesce(excluded.price, wines.price),
+        is_available = true,
+        last_seen_at = excluded.last_seen_at,
+        product_url = coalesce(excluded.product_url, wines.product_url),
+        updated_at = now(),
+        -- A wine the archival job archived (it had gone unavailable) that's back
+        -- on sale goes through review again; one an admin archived while still
+        -- listed stays archived
+        status = CASE WHEN wines.status = 'archived' AND NOT wines.is_available
+                      THEN 'pending' ELSE wines.status END
+    RETURNING wines.id, wines.winery_id, wines.name, wines.status, wines.price, xmax = 0 AS inserted
+),
+history AS (
+    INSERT INTO price_history (wine_id, price, recorded_at)
+    SELECT saved.id, saved.price, :now
+    FROM saved LEFT JOIN before ON before.id = saved.id
+    WHERE saved.price IS NOT NULL AND (saved.inserted OR saved.price IS DISTINCT FROM before.price)
+)
+SELECT saved.id, saved.winery_id, saved.name, saved.status, saved.price,
+       before.price AS old_price, before.is_available AS old_available,
+       before.status AS old_status, saved.inserted
+FROM saved LEFT JOIN before ON before.id = saved.id
+"""
+
+MARK_MISSING_SQL = """
+UPDATE wines w SET is_available = false
+WHERE w.winery_id = ANY(:winery_ids)
+  AND w.is_available = true
+  AND coalesce(w.product_url, '') <> ALL(:keep_urls)
+  AND NOT EXISTS (SELECT 1 FROM unnest(CAST(:seen_ids AS integer[])) AS seen(id) WHERE seen.id = w.id)
+RETURNING w.id, w.winery_id, w.name, w.status
+"""
+
+
+def _copy_rows(db: Session, staging: str, rows: Iterable[Dict]):
+    """Stream rows into the staging table with COPY (CSV; empty fields are NULL)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if row.get(column) is None else row[column] for column in STAGING_COLUMNS])
+    buffer.seek(0)
+
+    # The session's own DBAPI connection, so COPY runs in its transaction
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {staging} ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def merge_via_staging(db: Session, winery_ids: List[int], scraped_wines: Iterable[Dict],
+                      keep_urls=()) -> Dict[str, List[Dict]]:
+    """
+    COPY scraped wines into a staging table and merge them into wines
+
+    winery_ids: wineries covered by this batch - their wines missing from it
+    are marked unavailable (list a winery even if it returned no wines)
+    scraped_wines: wine dicts, each with a 'winery_id'
+    keep_urls: product pages not visited this run - their wines stay available
+
+    Nothing is committed here; the caller commits (or rolls back) the lot.
+    Returns: {'saved': [{'id', 'winery_id', 'name', 'status', 'price', 'old_price', 'old_available',
+                         'old_status', 'inserted'}],
+              'removed': [{'id', 'winery_id', 'name', 'status'}]}
+    """
+    # One staging table per batch, so concurrent runs never see each other's rows.
+    # UNLOGGED: no WAL for throwaway data.
+    staging = f"wine_staging_{uuid.uuid4().hex[:12]}"
+    db.execute(text(f"""
+        CREATE UNLOGGED TABLE {staging} (
+            seq bigint GENERATED ALWAYS AS IDENTITY,
+            winery_id integer NOT NULL,
+            name varchar(500) NOT NULL,
+            variety varchar(100),
+            vintage varchar(10),
+            price numeric(10, 2),
+            description text,
+            product_url text
+        )
+    """))
+    # No cleanup on error: the caller's rollback undoes the CREATE TABLE too
+    _copy_rows(db, staging, scraped_wines)
+    db.execute(text(f"ANALYZE {staging}"))
+
+    params = {'winery_ids': list(winery_ids), 'now': datetime.utcnow()}
+    db.execute(text(STORED_VINTAGE_SQL.format(staging=staging)), {'winery_ids': params['winery_ids']})
+    saved = [dict(row._mapping) for row in db.execute(text(MERGE_SQL.format(staging=staging)), params)]
+    removed = [
+        dict(row._mapping) for row in db.execute(text(MARK_MISSING_SQL), {
+            'winery_ids': list(winery_ids),
+            'keep_urls': list(keep_urls),
+            'seen_ids': [wine['id'] for wine in saved],
+        })
+    ]
+    db.execute(text(f"DROP TABLE {staging}"))
+
+    return {'saved': saved, 'removed': removed}
@@ -0,0 +1,83 @@
+"""
+Full-text wine search
+
+wines.search_vector is a stored generated tsvector (see WINE_SEARCH_VECTOR_SQL
+in app/models/wine.py) over name (weight A), variety and vintage (B) and
+description (C), GIN-indexed by ix_wines_search_vector. Postgres keeps it up
+to date on every insert/update, so the scraper save paths don't have to.
+
+Search text becomes a prefix query - every word must match the start of a
+lexeme, so "pinot gri" finds "Pinot Grigio" while the user is still typing:
+
+    'pinot gri'  ->  to_tsquery('english', 'pinot:* & gri:*')
+
+Results are ordered by ts_rank (a name hit outranks a description hit) and
+carry a ts_headline snippet of the description with the matches marked
+(<mark>); the description is HTML-escaped first, so the snippet is safe to
+render as HTML.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import func
+
+from app.models.wine import Wine
+
+SEARCH_CONFIG = 'english'
+
+# Snippet: up to two fragments of the description around the matches
+HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8'
+
+
+def prefix_query_text(search: str) -> Optional[str]:
+    """'Pinot gri' -> 'pinot:* & gri:*' (None if there are no words to search for)"""
+    words = re.findall(r"\w+", search.lower())
+    if not words:
+        return None
+    return ' & '.join(f"{word}:*" for word in words)
+
+
+def prefix_tsquery(search: str):
+    text = prefix_query_text(search)
+    if text is None:
+        return None
+    return func.to_tsquery(SEARCH_CONFIG, text)
+
+
+def matches(tsquery):
+    return Wine.search_vector.op('@@')(tsquery)
+
+
+def rank(tsquery):
+    return func.ts_rank(Wine.search_vector, tsquery)
+
+
+# Characters HTML-escaped before ts_headline, '&' first (as html.escape does)
+HTML_ESCAPES = [('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ("'", '&#x27;')]
+
+
+def html_escaped(text):
+    """SQL expression: text with HTML special characters escaped"""
+    for char, entity in HTML_ESCAPES:
+        text = func.replace(text, char, entity)
+    return text
+
+
+def snippet(tsquery):
+    """
+    Highlighted description excerpt (the name when there's no description)
+
+    Descriptions are scraped text - they're escaped before ts_headline, so the
+    only markup in a snippet is its own <mark> tags
+    """
+    source = html_escaped(func.coalesce(Wine.description, Wine.name))
+    return func.ts_headline(SEARCH_CONFIG, source, tsquery, HEADLINE_OPTIONS)
+
+
+def ranked_page(query, tsquery, skip: int, limit: int):
+    """Page of a wine select() that matches tsquery, most relevant first, with a 'snippet' column"""
+    return (
+        query.add_columns(snippet(tsquery).label('snippet'))
+        .order_by(rank(tsquery).desc(), Wine.id)
+        .offset(skip).limit(limit)
+    )
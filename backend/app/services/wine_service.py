@@ -0,0 +1,282 @@
+"""
+Set-based writes of scraped wines
+
+A winery's scrape is saved with one INSERT ... ON CONFLICT DO UPDATE per batch
+against the wine identity key (uq_wines_identity: winery, normalized name,
+vintage) instead of loading every wine and mutating ORM objects one by one.
+The database resolves new vs existing, so concurrent workers saving the same
+winery can't create duplicates. Price changes are written to price_history by
+the same statement.
+
+A scraped wine without a vintage (the page didn't show it this time) would
+have a different identity from its stored row, be inserted as a duplicate and
+leave the curated row to be marked unavailable. So before the upsert it takes
+the vintage of the single stored wine with the same product_url and name, if
+there is exactly one (wine_ingest applies the same fallback).
+"""
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, case, cast, func, insert, literal, literal_column, or_, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.wine import Wine, PriceHistory, WINE_NAME_KEY_SQL, WINE_VINTAGE_KEY_SQL
+
+UPSERT_BATCH_SIZE = 1000
+
+# Fields an admin curates by hand (PUT /api/wines/{id}, PUT /api/admin/wines/{id});
+# editing any of them sets wines.admin_edited_at
+ADMIN_CURATED_FIELDS = ['name', 'variety', 'vintage', 'description']
+
+
+# The whitespace WINE_NAME_KEY_SQL collapses - not str.split(), which also
+# splits on NBSP and other Unicode spaces the database keeps
+NAME_WHITESPACE = re.compile(r'[ \t\n\r\f\v]+')
+
+
+def identity_key(wine_data: Dict):
+    """Python side of uq_wines_identity, for de-duplicating a batch"""
+    name = NAME_WHITESPACE.sub(' ', wine_data['name'] or '').strip(' ').lower()
+    return (name, wine_data.get('vintage') or '')
+
+
+def upsert_scraped_wines(db: Session, winery_id: int, scraped_wines: List[Dict],
+                         seen_at: Optional[datetime] = None, update_existing: bool = True) -> List[Dict]:
+    """
+    Insert new wines as 'pending' and refresh existing ones, one statement per batch
+
+    Existing wines (same identity) only get price, availability, last_seen_at
+    and product_url updated - name capitalization, vintage, description and status
+    are kept (wines archived while unavailable go back to 'pending'; wines an
+    admin archived while still listed stay archived). A missing scraped price
+    never blanks a stored one.
+    New wines and changed prices also get a price_history row.
+
+    seen_at: when the wines were on the shop (default now)
+    update_existing=False only inserts new wines - existing identities are
+    left as they are and not returned (for data older than the last scrape)
+
+    Returns one dict per saved wine:
+        {'id', 'name', 'status', 'price', 'old_price', 'old_available', 'old_status', 'inserted'}
+    (old_* are the values before this statement; None for inserted rows)
+    """
+    scraped_wines = _with_stored_vintages(db, winery_id, scraped_wines)
+    # A statement can't update the same row twice - last duplicate wins
+    unique_wines = {identity_key(wine_data): wine_data for wine_data in scraped_wines}
+
+    now = datetime.utcnow()
+    seen_at = seen_at or now
+    rows = [
+        {
+            'winery_id': winery_id,
+            'name': wine_data['name'],
+            'variety': wine_data.get('variety'),
+            'vintage': wine_data.get('vintage'),
+            'price': wine_data.get('price'),
+            'description': wine_data.get('description'),
+            'product_url': wine_data.get('product_url'),
+            'is_available': True,
+            'status': 'pending',  # New wines require admin review before going live
+            'first_seen_at': seen_at,
+            'last_seen_at': seen_at,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for wine_data in unique_wines.values()
+    ]
+
+    results = []
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        results.extend(_upsert_batch(db, winery_id, rows[start:start + UPSERT_BATCH_SIZE], update_existing))
+    return results
+
+
+def _with_stored_vintages(db: Session, winery_id: int, scraped_wines: List[Dict]) -> List[Dict]:
+    """Scraped wines without a vintage take it from the one stored wine with the same product_url + name"""
+    urls = {wine_data['product_url'] for wine_data in scraped_wines
+            if not wine_data.get('vintage') and wine_data.get('product_url')}
+    if not urls:
+        return scraped_wines
+
+    name_key = literal_column(WINE_NAME_KEY_SQL)
+    stored = {
+        (row.product_url, row.name_key): row.vintage
+        for row in db.execute(
+            select(Wine.product_url, name_key.label('name_key'), func.max(Wine.vintage).label('vintage'))
+            .where(Wine.winery_id == winery_id, Wine.product_url.in_(urls))
+            .group_by(Wine.product_url, name_key)
+            .having(func.count() == 1)
+        )
+        if row.vintage
+    }
+    return [
+        dict(wine_data, vintage=stored.get((wine_data.get('product_url'), identity_key(wine_data)[0])))
+        if not wine_data.get('vintage') else wine_data
+        for wine_data in scraped_wines
+    ]
+
+
+def _upsert_batch(db: Session, winery_id: int, rows: List[Dict], update_existing: bool = True) -> List[Dict]:
+    # Price/availability/status as they were before this statement (CTEs see the pre-statement snapshot)
+    before = select(Wine.id, Wine.price, Wine.is_available, Wine.status).where(Wine.winery_id == winery_id).cte('before')
+
+    upsert = pg_insert(Wine).values(rows)
+    excluded = upsert.excluded
+    identity = [Wine.winery_id, text(WINE_NAME_KEY_SQL), text(WINE_VINTAGE_KEY_SQL)]
+    if not update_existing:
+        upsert = upsert.on_conflict_do_nothing(index_elements=identity)
+    else:
+        upsert = upsert.on_conflict_do_update(
+            index_elements=identity,
+            set_={
+                'price': func.coalesce(excluded.price, Wine.price),
+                'is_available': True,
+                'last_seen_at': excluded.last_seen_at,
+                'product_url': func.coalesce(excluded.product_url, Wine.product_url),
+                # Column onupdate doesn't fire for ON CONFLICT DO UPDATE
+                'updated_at': func.now(),
+                # A wine the archival job archived (it had gone unavailable) that's
+                # back on sale goes through review again; one an admin archived
+                # while still listed stays archived
+                'status': case(
+                    ((Wine.status == 'archived') & (Wine.is_available == False), 'pending'),
+                    else_=Wine.status,
+                ),
+            },
+        )
+    upsert = upsert.returning(
+        Wine.id,
+        Wine.name,
+        Wine.status,
+        Wine.price,
+        # xmax is 0 only on rows this statement inserted
+        literal_column('xmax = 0').label('inserted'),
+    )
+    saved = upsert.cte('saved')
+    # Joined (not a per-row subquery) so big batches stay a hash join
+    saved_with_old = saved.outerjoin(before, before.c.id == saved.c.id)
+
+    # Price history in the same statement: a row for every new price
+    history = insert(PriceHistory).from_select(
+        ['wine_id', 'price', 'recorded_at'],
+        select(saved.c.id, saved.c.price, literal(rows[0]['last_seen_at'])).select_from(saved_with_old).where(
+            saved.c.price.isnot(None),
+            or_(saved.c.inserted, saved.c.price.is_distinct_from(before.c.price)),
+        ),
+    ).cte('history')
+
+    stmt = select(
+        saved.c.id, saved.c.name, saved.c.status, saved.c.price,
+        before.c.price.label('old_price'), before.c.is_available.label('old_available'),
+        before.c.status.label('old_status'), saved.c.inserted,
+    ).select_from(saved_with_old).add_cte(history)
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def mark_missing_unavailable(db: Session, winery_id: int, seen_ids, keep_urls=()) -> List[Dict]:
+    """
+    Mark the winery's available wines that weren't in this scrape as unavailable
+
+    keep_urls: product pages not visited this run (deferred) - their wines stay
+    Returns: [{'id', 'name', 'status'}] of the wines marked unavailable
+    """
+    stmt = Wine.__table__.update().where(
+        Wine.winery_id == winery_id,
+        Wine.is_available == True,
+        # One array parameter (hashed subplan) rather than thousands of IN params
+        Wine.id.notin_(select(func.unnest(cast(list(seen_ids), ARRAY(Integer))))),
+    )
+    if keep_urls:
+        stmt = stmt.where(func.coalesce(Wine.product_url, '').notin_(list(keep_urls)))
+    stmt = stmt.values(is_available=False).returning(Wine.id, Wine.name, Wine.status)
+
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def identity_owner(db: Session, winery_id: int, name: str, vintage: Optional[str],
+                   exclude_id: Optional[int] = None) -> Optional[int]:
+    """Id of the winery's wine with this identity (uq_wines_identity), other than exclude_id"""
+    key_name, key_vintage = identity_key({'name': name, 'vintage': vintage})
+    query = select(Wine.id).where(
+        Wine.winery_id == winery_id,
+        literal_column(WINE_NAME_KEY_SQL) == key_name,
+        literal_column(WINE_VINTAGE_KEY_SQL) == key_vintage,
+    )
+    if exclude_id is not None:
+        query = query.where(Wine.id != exclude_id)
+    return db.scalar(query.limit(1))
+
+
+def fix_wine_fields(db: Session, wine: Wine, fields: Dict) -> Optional[int]:
+    """
+    Apply corrected values (e.g. from re-extraction) to an existing wine
+
+    A new name / vintage that would give the wine another wine's identity is
+    not applied: nothing changes and that wine's id is returned (None when the
+    fix was applied). A price change also gets a price_history row. Runs in a
+    savepoint, so a skipped fix leaves the rest of the transaction intact.
+    Catalog feed entries are the caller's (wine_changes with a snapshot).
+    """
+    if 'name' in fields or 'vintage' in fields:
+        owner = identity_owner(db, wine.winery_id, fields.get('name', wine.name),
+                               fields.get('vintage', wine.vintage), exclude_id=wine.id)
+        if owner is not None:
+            return owner
+
+    now = datetime.utcnow()
+    try:
+        with db.begin_nested():
+            for field, value in fields.items():
+                setattr(wine, field, value)
+            wine.updated_at = now
+            if fields.get('price') is not None:
+                db.add(PriceHistory(wine_id=wine.id, price=fields['price'], recorded_at=now))
+            db.flush()
+    except IntegrityError:
+        # Another transaction took the identity since the check above
+        db.refresh(wine)
+        return identity_owner(db, wine.winery_id, fields.get('name', wine.name),
+                              fields.get('vintage', wine.vintage), exclude_id=wine.id) or -1
+    return None
+
+
+def flush_manual_wine(db: Session, wine: Wine) -> Optional[int]:
+    """
+    Flush a wine created or edited by hand (API / admin) without breaking uq_wines_identity
+
+    Returns None when the wine was flushed, else the id of the winery's wine
+    that already has this name + vintage. On a conflict nothing is written and
+    the session is rolled back, so the caller only has to report it.
+    """
+    winery_id, name, vintage, wine_id = wine.winery_id, wine.name, wine.vintage, wine.id
+    # Not autoflushed: the check must run before the edited row is written
+    with db.no_autoflush:
+        owner = identity_owner(db, winery_id, name, vintage, exclude_id=wine_id)
+    if owner is None:
+        try:
+            db.add(wine)
+            db.flush()
+            return None
+        except IntegrityError:
+            # Another transaction took the identity since the check above
+            db.rollback()
+            owner = identity_owner(db, winery_id, name, vintage, exclude_id=wine_id)
+    else:
+        db.rollback()
+    return owner or -1
+
+
+def identity_conflict(owner_id: int) -> HTTPException:
+    """409 for a create/edit that would duplicate another wine's winery + name + vintage"""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "The winery already has a wine with this name and vintage",
+            "wine_id": owner_id if owner_id > 0 else None,
+        },
+    )
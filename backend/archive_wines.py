@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Archive wines that have been unavailable for a long time
+
+Wines that disappeared from their winery's shop stay in `wines` with
+is_available = false, and every query and index carries them. This job
+archives the ones not seen for ARCHIVE_UNAVAILABLE_AFTER_DAYS:
+
+- default:  set status = 'archived' (hidden everywhere, kept in place)
+- --move:   move the rows (and their price history) to wines_archive /
+            price_history_archive, out of the hot tables
+
+Work is done in chunks of ARCHIVE_BATCH_SIZE rows, one short transaction each:
+    UPDATE wines SET status = 'archived' ...
+    WHERE id IN (SELECT id FROM wines WHERE <archivable> LIMIT k FOR UPDATE SKIP LOCKED)
+(--move: DELETE ... WHERE id IN (...) RETURNING *, inserted into the archive)
+so it never holds long locks and skips rows a scrape is saving right now.
+Each chunk also records 'status' entries in the catalog change feed.
+
+A wine that comes back on sale later is un-archived to 'pending' by the next
+scrape (archived in place) or re-added as a new pending wine (moved). Only
+wines archived while unavailable are un-archived - one an admin archived
+while it was still listed stays archived.
+
+Usage:
+    python archive_wines.py                  # archive in place
+    python archive_wines.py --days 180 --batch-size 1000
+    python archive_wines.py --move           # move to the archive tables
+    python archive_wines.py --dry-run        # just count candidates
+"""
+import sys
+import time
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.catalog_changes import STATUS, change, record_changes
+from sqlalchemy import text
+
+# Served by the partial index ix_wines_archivable (last_seen_at WHERE NOT is_available)
+UNAVAILABLE = "is_available = false AND last_seen_at < :cutoff"
+
+
+def archivable_sql(move: bool) -> str:
+    """--move also takes wines archived in place earlier"""
+    return UNAVAILABLE if move else f"{UNAVAILABLE} AND status <> 'archived'"
+
+
+def candidates_sql(move: bool) -> str:
+    """Next chunk of wines to archive, skipping rows another transaction holds"""
+    return f"""
+        SELECT id FROM wines
+        WHERE {archivable_sql(move)}
+        ORDER BY last_seen_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    """
+
+
+ARCHIVE_IN_PLACE_SQL = f"""
+    UPDATE wines SET status = 'archived', updated_at = :now
+    FROM (SELECT id, status FROM wines WHERE id IN ({candidates_sql(move=False)})) AS old
+    WHERE wines.id = old.id
+    RETURNING wines.id, wines.winery_id, old.status
+"""
+
+
+def move_sql(columns):
+    """Chunk of wines (+ price history) moved into the archive tables in one statement"""
+    column_list = ', '.join(columns)
+    moved_columns = ', '.join(f"m.{column}" for column in columns)
+    return f"""
+        WITH moved AS (
+            DELETE FROM wines WHERE id IN ({candidates_sql(move=True)})
+            RETURNING *
+        ),
+        archived AS (
+            INSERT INTO wines_archive ({column_list}, status, archived_at)
+            SELECT {moved_columns}, 'archived', :now FROM moved m
+        ),
+        history AS (
+            -- Reads the pre-statement snapshot, before the cascade removes these rows
+            INSERT INTO price_history_archive
+            SELECT ph.* FROM price_history ph WHERE ph.wine_id IN (SELECT id FROM moved)
+        )
+        SELECT id, winery_id, status FROM moved
+    """
+
+
+def archive_columns(db):
+    """Columns wines and wines_archive share (status is set explicitly)"""
+    rows = db.execute(text("""
+        SELECT a.column_name
+        FROM information_schema.columns a
+        JOIN information_schema.columns w
+          ON w.table_name = 'wines' AND w.column_name = a.column_name
+         AND w.table_schema = a.table_schema
+        WHERE a.table_name = 'wines_archive' AND a.table_schema = current_schema()
+          AND a.column_name NOT IN ('status', 'archived_at')
+        ORDER BY a.ordinal_position
+    """)).all()
+    return [row.column_name for row in rows]
+
+
+def archive_wines(days: int = None, batch_size: int = None, move: bool = False, dry_run: bool = False):
+    days = days if days is not None else settings.archive_unavailable_after_days
+    batch_size = batch_size or settings.archive_batch_size
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    print("=" * 80)
+    print(f"ARCHIVE WINES unavailable for more than {days} days (last seen before {cutoff:%Y-%m-%d})")
+    print(f"Mode: {'move to wines_archive' if move else 'status = archived'}, batches of {batch_size}")
+    print("=" * 80)
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    total = 0
+    batches = 0
+    try:
+        candidates = db.execute(
+            text(f"SELECT count(*) FROM wines WHERE {archivable_sql(move)}"), {'cutoff': cutoff}
+        ).scalar()
+        print(f"Candidates: {candidates}")
+        if dry_run or not candidates:
+            return {'rows': 0, 'batches': 0, 'seconds': time.perf_counter() - started}
+
+        sql = text(move_sql(archive_columns(db)) if move else ARCHIVE_IN_PLACE_SQL)
+        while True:
+            batch_started = time.perf_counter()
+            rows = db.execute(sql, {'cutoff': cutoff, 'batch_size': batch_size, 'now': datetime.utcnow()}).all()
+            if not rows:
+                db.rollback()
+                break
+
+            record_changes(db, [
+                change(row.id, row.winery_id, STATUS, row.status, 'archived', 'archive')
+                for row in rows if row.status != 'archived'
+            ])
+            db.commit()
+
+            batches += 1
+            total += len(rows)
+            print(f"  Batch {batches}: {len(rows)} wine(s) in {time.perf_counter() - batch_started:.2f}s")
+            if len(rows) < batch_size:
+                break
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    seconds = time.perf_counter() - started
+    print()
+    print("=" * 80)
+    print("Archive Summary:")
+    print(f"  Wines {'moved' if move else 'archived'}: {total}")
+    print(f"  Batches:       {batches}")
+    print(f"  Time taken:    {seconds:.2f}s" + (f" ({total / seconds:,.0f} rows/s)" if total and seconds else ""))
+    print("=" * 80)
+    return {'rows': total, 'batches': batches, 'seconds': seconds}
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    archive_wines(
+        days=int(args[args.index('--days') + 1]) if '--days' in args else None,
+        batch_size=int(args[args.index('--batch-size') + 1]) if '--batch-size' in args else None,
+        move='--move' in args,
+        dry_run='--dry-run' in args,
+    )
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the public read API
+
+Drives a running server with N concurrent clients (one asyncio task each,
+every client sends its next request as soon as the last one returns) for a
+fixed time per concurrency level, rotating over the public read endpoints:
+
+    /api/wines/?limit=50    /api/wines/?search=...    /api/wines/{id}
+    /api/wines/varieties/list    /api/wineries/    /api/wineries/{id}
+
+Reports requests/s, p50 / p99 latency and errors per level. Save a run and
+compare a later one against it to see the effect of a change:
+
+    uvicorn app.main:app --port 8000            # (ENVIRONMENT != development: no SQL echo)
+    python benchmark_api.py --save before.json
+    ... apply the change, restart the server ...
+    python benchmark_api.py --compare before.json
+
+Usage:
+    python benchmark_api.py [--url http://127.0.0.1:8000] [--levels 50 100 200 500]
+                            [--seconds 10] [--save FILE] [--compare FILE]
+"""
+import sys
+import json
+import time
+import asyncio
+from pathlib import Path
+
+import httpx
+
+DEFAULT_LEVELS = [50, 100, 200, 500]
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def discover_paths(client: httpx.AsyncClient):
+    """Endpoints to rotate over, with ids that exist on this server"""
+    wines = (await client.get("/api/wines/", params={"limit": 1})).json()["wines"]
+    wineries = (await client.get("/api/wineries/", params={"limit": 1})).json()["wineries"]
+    paths = ["/api/wines/?limit=50", "/api/wines/?search=shiraz&limit=20",
+             "/api/wines/varieties/list", "/api/wineries/"]
+    if wines:
+        paths.append(f"/api/wines/{wines[0]['id']}")
+    if wineries:
+        paths.append(f"/api/wineries/{wineries[0]['id']}")
+    return paths
+
+
+async def run_level(url: str, paths, concurrency: int, seconds: float):
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def client_loop(offset: int):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[client_loop(n) for n in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+async def benchmark(url: str, levels, seconds: float):
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        paths = await discover_paths(client)
+
+    results = []
+    for concurrency in levels:
+        result = await run_level(url, paths, concurrency, seconds)
+        results.append(result)
+        print(f"{concurrency:>6}  {result['requests']:>8}  {result['rps']:>9.1f}  "
+              f"{result['p50_ms']:>9.1f}  {result['p99_ms']:>9.1f}  {result['errors']:>6}")
+    return results
+
+
+def main():
+    args = sys.argv[1:]
+    url = args[args.index('--url') + 1] if '--url' in args else "http://127.0.0.1:8000"
+    seconds = float(args[args.index('--seconds') + 1]) if '--seconds' in args else 10
+    levels = DEFAULT_LEVELS
+    if '--levels' in args:
+        levels = []
+        for value in args[args.index('--levels') + 1:]:
+            if not value.isdigit():
+                break
+            levels.append(int(value))
+
+    print("=" * 80)
+    print(f"PUBLIC API LOAD BENCHMARK - {url}, {seconds:.0f}s per level")
+    print("=" * 80)
+    print(f"{'Conc':>6}  {'Requests':>8}  {'Req/s':>9}  {'p50 ms':>9}  {'p99 ms':>9}  {'Errors':>6}")
+    print("-" * 80)
+    results = asyncio.run(benchmark(url, levels, seconds))
+
+    if '--save' in args:
+        Path(args[args.index('--save') + 1]).write_text(json.dumps(results, indent=2))
+
+    if '--compare' in args:
+        baseline = {r['concurrency']: r for r in json.loads(Path(args[args.index('--compare') + 1]).read_text())}
+        print()
+        print("Compared with baseline:")
+        print(f"{'Conc':>6}  {'Req/s before':>12}  {'Req/s after':>11}  {'p99 before':>10}  {'p99 after':>9}")
+        for result in results:
+            before = baseline.get(result['concurrency'])
+            if before:
+                print(f"{result['concurrency']:>6}  {before['rps']:>12.1f}  {result['rps']:>11.1f}  "
+                      f"{before['p99_ms']:>10.1f}  {result['p99_ms']:>9.1f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ways of getting the total for GET /api/wines
+
+For a set of typical filters, times (median of --repeat runs):
+- Separate:  SELECT count(*) of the filtered set, then the page query
+- Window:    the page query with count(*) OVER () - one query
+- No total:  the page query alone, limit + 1 rows for has_more
+             (include_total=false, and also the cost of a count cache hit)
+
+Queries are built with the endpoint's own live_wines_query(). --seed N adds
+N synthetic live wines for the run (inside the benchmark transaction, rolled
+back afterwards) to measure a catalog bigger than the current one.
+
+Usage:
+    python benchmark_counts.py
+    python benchmark_counts.py --seed 100000 --repeat 20
+"""
+import sys
+import time
+import statistics
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, func, insert, text
+
+from app.database import SessionLocal
+from app.models.winery import Winery
+from app.models.wine import Wine
+from app.routers.wines import live_wines_query
+from app.services.pagination import keyset_page
+
+LIMIT = 50
+WINDOW_TOTAL = func.count().over().label('total')
+VARIETIES = ['Shiraz', 'Riesling', 'Pinot Noir', 'Chardonnay', 'Tempranillo']
+
+FILTER_SETS = [
+    ("no filter", {}, 0),
+    ("variety", {'variety': 'riesling'}, 0),
+    ("price 30-50", {'min_price': 30, 'max_price': 50}, 0),
+    ("search", {'search': 'shiraz 1'}, 0),
+    ("deep page (skip 1500)", {}, 1500),
+]
+
+
+def seed(db, count: int):
+    winery = Winery(name="Count Benchmark Winery", slug="count-benchmark-winery",
+                    shop_url="https://count-benchmark.test/shop")
+    db.add(winery)
+    db.flush()
+    now = datetime.utcnow()
+    rows = [{
+        'winery_id': winery.id, 'name': f"Count Benchmark {VARIETIES[i % 5]} {i}",
+        'variety': VARIETIES[i % 5], 'vintage': str(2010 + i % 12), 'price': 15 + i % 90,
+        'is_available': True, 'status': 'live', 'created_at': now, 'updated_at': now,
+    } for i in range(count)]
+    for start in range(0, count, 10000):
+        db.execute(insert(Wine.__table__), rows[start:start + 10000])
+    db.execute(text("ANALYZE wines"))
+
+
+def timed(run, repeat: int) -> float:
+    run()  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run_benchmark(repeat: int, seed_count: int):
+    db = SessionLocal()
+    try:
+        if seed_count:
+            seed(db, seed_count)
+
+        live = db.scalar(select(func.count()).select_from(live_wines_query().subquery()))
+        print("=" * 80)
+        print(f"LIST TOTALS BENCHMARK - {live} live wines, page of {LIMIT}, median of {repeat} runs")
+        print("=" * 80)
+        print(f"{'Filter':<24} {'Matches':>8} {'Separate':>10} {'Window':>10} {'No total':>10}")
+        print("-" * 80)
+
+        for label, filters, skip in FILTER_SETS:
+            query = live_wines_query(**filters)
+            page = keyset_page(query, Wine.name, Wine.id, None).offset(skip).limit(LIMIT + 1)
+            count = select(func.count()).select_from(query.subquery())
+            matches = db.scalar(count)
+
+            separate = timed(lambda: (db.scalar(count), db.execute(page).all()), repeat)
+            window = timed(lambda: db.execute(page.add_columns(WINDOW_TOTAL)).all(), repeat)
+            no_total = timed(lambda: db.execute(page).all(), repeat)
+            print(f"{label:<24} {matches:>8} {separate:>8.2f}ms {window:>8.2f}ms {no_total:>8.2f}ms")
+    finally:
+        db.rollback()
+        db.close()
+
+    print("-" * 80)
+    print("Window: one query, but the count makes it read and sort every match instead of")
+    print("stopping after one page of the name index - slower than a separate COUNT on")
+    print("large results, so the API caches totals rather than using it.")
+    print("A cached total costs the same as 'No total' until WINE_COUNT_CACHE_SECONDS expire.")
+    if seed_count:
+        print("(rolled back - no benchmark data kept)")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    repeat = int(args[args.index('--repeat') + 1]) if '--repeat' in args else 10
+    seed_count = int(args[args.index('--seed') + 1]) if '--seed' in args else 0
+    run_benchmark(repeat, seed_count)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: saving scrape batches of 1k / 10k / 100k wines
+
+Compares, for each batch size:
+- ORM:     the old save loop (load the winery's wines, match in Python,
+           add/mutate objects, flush) - skipped above --orm-max rows
+- Upsert:  wine_service.upsert_scraped_wines (INSERT ... VALUES ... ON CONFLICT
+           in chunks) + mark_missing_unavailable
+- COPY:    wine_ingest.merge_via_staging (COPY into an unlogged staging
+           table, set-based merge)
+
+Each path runs twice against a scratch winery: a first load (all new) and a
+re-scrape where 10% of prices changed and 5% of wines disappeared.
+Everything runs in one transaction that is rolled back - no data is kept.
+
+Usage:
+    python benchmark_ingest.py                     # 1000 10000 100000
+    python benchmark_ingest.py --sizes 1000 5000
+    python benchmark_ingest.py --orm-max 100000    # include the ORM loop at 100k
+"""
+import sys
+import time
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models.winery import Winery
+from app.models.wine import Wine
+from app.services.wine_ingest import merge_via_staging
+from app.services.wine_service import upsert_scraped_wines, mark_missing_unavailable, identity_key
+
+
+def make_batch(winery_id: int, size: int, rescrape: bool = False):
+    """Synthetic scrape: on a re-scrape every 10th price changes and every 20th wine is gone"""
+    wines = []
+    for i in range(size):
+        if rescrape and i % 20 == 0:
+            continue
+        price = 20 + i % 80 + (5 if rescrape and i % 10 == 0 else 0)
+        wines.append({
+            'winery_id': winery_id,
+            'name': f"Benchmark Shiraz {i}",
+            'vintage': str(2015 + i % 10),
+            'variety': 'Shiraz',
+            'price': float(price),
+            'description': f"Benchmark wine {i}, cool-climate Shiraz",
+            'product_url': f"https://benchmark.test/products/{i}",
+        })
+    return wines
+
+
+def orm_save(db, winery_id: int, scraped_wines):
+    """The per-row save loop scrape_and_save used before the set-based paths"""
+    existing = {
+        identity_key({'name': wine.name, 'vintage': wine.vintage}): wine
+        for wine in db.query(Wine).filter(Wine.winery_id == winery_id).all()
+    }
+    seen = set()
+    for wine_data in scraped_wines:
+        wine = existing.get(identity_key(wine_data))
+        if wine is None:
+            wine = Wine(winery_id=winery_id, name=wine_data['name'], vintage=wine_data['vintage'],
+                        variety=wine_data['variety'], price=wine_data['price'],
+                        description=wine_data['description'], product_url=wine_data['product_url'],
+                        is_available=True, status='pending',
+                        first_seen_at=datetime.utcnow(), last_seen_at=datetime.utcnow())
+            db.add(wine)
+            existing[identity_key(wine_data)] = wine
+        else:
+            wine.price = wine_data['price']
+            wine.is_available = True
+            wine.last_seen_at = datetime.utcnow()
+        seen.add(identity_key(wine_data))
+    for key, wine in existing.items():
+        if key not in seen:
+            wine.is_available = False
+    db.flush()
+
+
+def upsert_save(db, winery_id: int, scraped_wines):
+    saved = upsert_scraped_wines(db, winery_id, scraped_wines)
+    mark_missing_unavailable(db, winery_id, [wine['id'] for wine in saved])
+
+
+def copy_save(db, winery_id: int, scraped_wines):
+    merge_via_staging(db, [winery_id], scraped_wines)
+
+
+PATHS = [('ORM', orm_save), ('Upsert', upsert_save), ('COPY', copy_save)]
+
+
+def run_benchmark(sizes, orm_max: int = 10000):
+    db = SessionLocal()
+    try:
+        print("=" * 80)
+        print("SCRAPE BATCH INGESTION BENCHMARK")
+        print("=" * 80)
+        print(f"{'Rows':>8}  {'Path':<8} {'First load':>12} {'Re-scrape':>12} {'Rows/s (re)':>12}")
+        print("-" * 80)
+
+        for size in sizes:
+            for label, save in PATHS:
+                if label == 'ORM' and size > orm_max:
+                    print(f"{size:>8}  {label:<8} {'skipped':>12}")
+                    continue
+
+                winery = Winery(name=f"Benchmark {label} {size}", slug=f"benchmark-{label.lower()}-{size}",
+                                shop_url="https://benchmark.test/shop")
+                db.add(winery)
+                db.flush()
+
+                timings = []
+                for rescrape in (False, True):
+                    batch = make_batch(winery.id, size, rescrape=rescrape)
+                    started = time.perf_counter()
+                    save(db, winery.id, batch)
+                    timings.append(time.perf_counter() - started)
+                    db.expunge_all()
+
+                print(f"{size:>8}  {label:<8} {timings[0]:>11.2f}s {timings[1]:>11.2f}s "
+                      f"{size / timings[1]:>12,.0f}")
+            print("-" * 80)
+    finally:
+        db.rollback()
+        db.close()
+
+    print("(rolled back - no benchmark data kept)")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    sizes = [1000, 10000, 100000]
+    if '--sizes' in args:
+        sizes = [int(value) for value in args[args.index('--sizes') + 1:] if value.isdigit()]
+    orm_max = int(args[args.index('--orm-max') + 1]) if '--orm-max' in args else 10000
+    run_benchmark(sizes, orm_max=orm_max)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark: wine search latency at 1k / 10k / 100k live wines
+
+For each catalog size and search term, times (median of --repeat runs) the
+page query plus its count, as GET /api/wines runs them:
+- ILIKE:     search_mode=name - Wine.name ILIKE '%term%', ordered by name
+- Fulltext:  search_mode=fulltext - search_vector @@ prefix tsquery, ordered
+             by ts_rank, with ts_headline snippets for the page
+- Fuzzy:     GET /api/search/fuzzy - exact name matches, or else trigram
+             matches + "did you mean" suggestions (needs pg_trgm; n/a without)
+
+Synthetic wines (names, varieties and tasting-note descriptions) are added
+on top of the existing catalog to reach each size, inside one transaction
+that is rolled back - no data is kept.
+
+Usage:
+    python benchmark_search.py
+    python benchmark_search.py --sizes 1000 10000 --repeat 20
+"""
+import sys
+import time
+import random
+import statistics
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, func, insert, text
+from sqlalchemy.orm import contains_eager
+
+from app.database import SessionLocal
+from app.models.winery import Winery
+from app.models.wine import Wine
+from app.routers.wines import live_wines_query
+from app.services import fuzzy_search, wine_search
+from app.services.pagination import keyset_page
+
+PAGE_SIZE = 50
+TERMS = ['shiraz', 'pepper', 'pinot gri', 'tumbarumba pinot', 'sangiovse', 'zzzz']
+
+VARIETIES = ['Shiraz', 'Riesling', 'Pinot Noir', 'Chardonnay', 'Pinot Grigio', 'Tempranillo',
+             'Sangiovese', 'Cabernet Sauvignon', 'Sauvignon Blanc', 'Gruner Veltliner']
+REGIONS = ['Canberra District', 'Murrumbateman', 'Hall', 'Gundaroo', 'Tumbarumba', 'Bungendore']
+NOTES = ['black pepper', 'dark plum', 'lemon zest', 'white peach', 'wet stone', 'cherry', 'violet',
+         'toasted oak', 'fine tannins', 'crisp acidity', 'spice', 'blackcurrant', 'honeysuckle',
+         'lime', 'mulberry', 'earthy', 'savoury', 'minerality', 'strawberry', 'nectarine']
+
+
+def make_wines(winery_id: int, start: int, count: int, rng: random.Random):
+    now = datetime.utcnow()
+    wines = []
+    for i in range(start, start + count):
+        variety = VARIETIES[i % len(VARIETIES)]
+        region = REGIONS[i % len(REGIONS)]
+        notes = ', '.join(rng.sample(NOTES, 4))
+        wines.append({
+            'winery_id': winery_id, 'name': f"{region} {variety} {i}", 'variety': variety,
+            'vintage': str(2010 + i % 14), 'price': 18 + i % 80,
+            'description': f"A {region} {variety.lower()} showing {notes}. "
+                           f"Hand-picked and estate grown, cellar for {2 + i % 8} years.",
+            'is_available': True, 'status': 'live', 'created_at': now, 'updated_at': now,
+        })
+    return wines
+
+
+def timed(run, repeat: int) -> float:
+    run()  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def ilike_search(db, term: str):
+    query = live_wines_query(search=term)
+    db.execute(keyset_page(query, Wine.name, Wine.id, None).limit(PAGE_SIZE + 1)).all()
+    return db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+def fulltext_search(db, term: str):
+    query = live_wines_query(search=term, search_mode='fulltext')
+    db.execute(wine_search.ranked_page(query, wine_search.prefix_tsquery(term), 0, PAGE_SIZE + 1)).all()
+    return db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+def fuzzy(db, term: str):
+    """The queries GET /api/search/fuzzy runs"""
+    exact = db.execute(live_wines_query(search=term).order_by(Wine.name, Wine.id).limit(20)).all()
+    if exact:
+        return len(exact)
+    score = fuzzy_search.score(term)
+    rows = db.execute(
+        fuzzy_search.fuzzy_wines_query(term).add_columns(score.label('score'))
+        .options(contains_eager(Wine.winery)).order_by(score.desc(), Wine.id).limit(20)
+    ).all()
+    db.execute(fuzzy_search.suggestions_query(term)).all()
+    return len(rows)
+
+
+def run_benchmark(sizes, repeat: int):
+    rng = random.Random(42)
+    db = SessionLocal()
+    try:
+        winery = Winery(name="Search Benchmark Winery", slug="search-benchmark-winery",
+                        shop_url="https://search-benchmark.test/shop")
+        db.add(winery)
+        db.flush()
+        seeded = 0
+        has_trgm = db.scalar(text("SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'")) > 0
+
+        print("=" * 80)
+        print(f"WINE SEARCH BENCHMARK - page of {PAGE_SIZE} + count, median of {repeat} runs")
+        print("=" * 80)
+        print(f"{'Wines':>8}  {'Term':<17} {'ILIKE':>9} {'(hits)':>6} {'Fulltext':>9} {'(hits)':>6} "
+              f"{'Fuzzy':>9} {'(hits)':>6}")
+        print("-" * 80)
+
+        for size in sizes:
+            live = db.scalar(select(func.count()).select_from(live_wines_query().subquery()))
+            if live < size:
+                rows = make_wines(winery.id, seeded, size - live, rng)
+                for start in range(0, len(rows), 10000):
+                    db.execute(insert(Wine.__table__), rows[start:start + 10000])
+                seeded += len(rows)
+                db.execute(text("ANALYZE wines"))
+                live = size
+
+            for term in TERMS:
+                ilike_hits = ilike_search(db, term)
+                fulltext_hits = fulltext_search(db, term)
+                ilike_ms = timed(lambda: ilike_search(db, term), repeat)
+                fulltext_ms = timed(lambda: fulltext_search(db, term), repeat)
+                fuzzy_column = f"{'n/a':>9} {'':>6}"
+                if has_trgm:
+                    fuzzy_hits = fuzzy(db, term)
+                    fuzzy_column = f"{timed(lambda: fuzzy(db, term), repeat):>7.2f}ms {fuzzy_hits:>6}"
+                print(f"{live:>8}  {term:<17} {ilike_ms:>7.2f}ms {ilike_hits:>6} "
+                      f"{fulltext_ms:>7.2f}ms {fulltext_hits:>6} {fuzzy_column}")
+            print("-" * 80)
+    finally:
+        db.rollback()
+        db.close()
+
+    print("ILIKE only sees names; fulltext also matches variety, vintage and description.")
+    if not has_trgm:
+        print("Fuzzy: pg_trgm is not installed in this database (alembic upgrade head installs it)")
+    print("(rolled back - no benchmark data kept)")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    sizes = [1000, 10000, 100000]
+    if '--sizes' in args:
+        sizes = []
+        for value in args[args.index('--sizes') + 1:]:
+            if not value.isdigit():
+                break
+            sizes.append(int(value))
+    repeat = int(args[args.index('--repeat') + 1]) if '--repeat' in args else 10
+    run_benchmark(sizes, repeat)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: autocomplete index build time and lookup latency
+
+Builds the /api/search/suggest index from the live catalog (as the API does
+at startup), optionally padded with N synthetic wine names, then times
+lookups of every 1-6 letter prefix of a sample of terms.
+
+Usage:
+    python benchmark_suggest.py
+    python benchmark_suggest.py --synthetic 100000
+"""
+import sys
+import time
+import random
+import asyncio
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import async_session, dispose_async_engine
+from app.services.suggest_index import SuggestIndex, load_terms
+
+VARIETIES = ['Shiraz', 'Riesling', 'Pinot Noir', 'Chardonnay', 'Grüner Veltliner', 'Sangiovese']
+WORDS = ['Reserve', 'Estate', 'Single Vineyard', 'Block', 'Hilltops', 'Old Vine', 'Rosé', 'Sparkling']
+
+
+async def catalog_terms():
+    async with async_session() as db:
+        terms = await load_terms(db)
+    await dispose_async_engine()
+    return terms
+
+
+def synthetic_terms(count: int, rng: random.Random):
+    return [
+        (f"{rng.choice(WORDS)} {VARIETIES[i % len(VARIETIES)]} {2010 + i % 14} No.{i}", 'wine', rng.randint(1, 4))
+        for i in range(count)
+    ]
+
+
+def run_benchmark(synthetic: int):
+    rng = random.Random(7)
+    terms = asyncio.run(catalog_terms())
+    catalog = len(terms)
+    terms += synthetic_terms(synthetic, rng)
+
+    started = time.perf_counter()
+    index = SuggestIndex(terms)
+    build_seconds = time.perf_counter() - started
+
+    sample = rng.sample([text for text, _, _ in terms], min(500, len(terms)))
+    prefixes = [text.lower()[:length] for text in sample for length in range(1, 7)]
+    latencies = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.suggest(prefix, 8)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+
+    print("=" * 80)
+    print("AUTOCOMPLETE INDEX BENCHMARK")
+    print("=" * 80)
+    print(f"Terms:       {len(index):,} ({catalog:,} from the catalog, {synthetic:,} synthetic)")
+    print(f"Keys:        {len(index.keys):,} (one per word start)")
+    print(f"Build:       {build_seconds:.2f}s")
+    print(f"Lookups:     {len(latencies):,} prefixes of 1-6 letters")
+    print(f"  p50:       {statistics.median(latencies):.3f}ms")
+    print(f"  p99:       {latencies[int(len(latencies) * 0.99) - 1]:.3f}ms")
+    print(f"  max:       {latencies[-1]:.3f}ms")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run_benchmark(int(args[args.index('--synthetic') + 1]) if '--synthetic' in args else 0)
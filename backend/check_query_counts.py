@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Query-count check for the wine list endpoints
+
+Each list endpoint returns wines together with their winery. Loading
+wine.winery lazily costs one extra SELECT per wine on the page (N+1); the
+endpoints load wineries in the same query instead. This script seeds a
+scratch set of wines spread over several wineries, calls every list endpoint
+with a large page and counts the SQL statements each request runs (sync and
+async engine). A request may run at most MAX_QUERIES statements (count + page)
+whatever the page size; the seeded rows are deleted afterwards.
+
+Exits non-zero if any endpoint exceeds the limit, so it can run in CI.
+
+Usage:
+    python check_query_counts.py
+"""
+import sys
+from pathlib import Path
+from contextlib import contextmanager
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event
+
+from app.config import settings
+from app.database import SessionLocal, engine, get_async_engine
+from app.main import app
+from app.models.winery import Winery
+from app.models.wine import Wine
+
+MAX_QUERIES = 2
+WINERIES = 5
+WINES_PER_WINERY = 20
+SLUG_PREFIX = "query-count-check"
+
+ENDPOINTS = [
+    ("/api/wines/", {'search': 'Query Count', 'limit': 100}),
+    ("/api/wines/admin/pending", {'limit': 100}),
+    ("/api/wines/admin/all", {'search': 'Query Count', 'limit': 100}),
+    ("/api/admin/wines", {'search': 'Query Count', 'limit': 100}),
+]
+
+
+@contextmanager
+def count_queries():
+    """Counts statements on both engines while the block runs"""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = [engine, get_async_engine().sync_engine]
+    for target in engines:
+        event.listen(target, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", on_execute)
+
+
+def seed(db):
+    """Live and pending wines over several wineries"""
+    winery_ids = []
+    for n in range(WINERIES):
+        winery = Winery(name=f"Query Count Winery {n}", slug=f"{SLUG_PREFIX}-{n}",
+                        shop_url="https://query-count.test/shop")
+        db.add(winery)
+        db.flush()
+        winery_ids.append(winery.id)
+        for i in range(WINES_PER_WINERY):
+            db.add(Wine(winery_id=winery.id, name=f"Query Count Wine {n}-{i}", vintage="2020",
+                        variety="Shiraz", price=30, is_available=True,
+                        status='live' if i % 2 else 'pending'))
+    db.commit()
+    return winery_ids
+
+
+def cleanup(db):
+    winery_ids = [w.id for w in db.query(Winery).filter(Winery.slug.like(f"{SLUG_PREFIX}-%")).all()]
+    if winery_ids:
+        db.execute(delete(Wine).where(Wine.winery_id.in_(winery_ids)))
+        db.execute(delete(Winery).where(Winery.id.in_(winery_ids)))
+    db.commit()
+
+
+def check_query_counts():
+    print("=" * 80)
+    print(f"QUERY COUNT CHECK - at most {MAX_QUERIES} statements per list request")
+    print("=" * 80)
+
+    db = SessionLocal()
+    failures = 0
+    try:
+        cleanup(db)
+        seed(db)
+
+        with TestClient(app) as client:
+            auth = (settings.admin_username, settings.admin_password)
+            for path, params in ENDPOINTS:
+                with count_queries() as statements:
+                    response = client.get(path, params=params, auth=auth)
+                response.raise_for_status()
+
+                wines = response.json()['wines']
+                wineries = {w['winery']['id'] if 'winery' in w else w['winery_id'] for w in wines}
+                ok = len(statements) <= MAX_QUERIES
+                failures += not ok
+                print(f"{'✓' if ok else '✗'} {path:<28} {len(wines):>4} wines / {len(wineries)} wineries: "
+                      f"{len(statements)} queries")
+                if not ok:
+                    for statement in statements[MAX_QUERIES:MAX_QUERIES + 3]:
+                        print(f"    extra: {' '.join(statement.split())[:100]}")
+    finally:
+        cleanup(db)
+        db.close()
+
+    print("=" * 80)
+    print("All list endpoints load wineries with the page" if not failures
+          else f"{failures} endpoint(s) issue a query per wine")
+    print("=" * 80)
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_counts() else 1)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Query plan check: no sequential scans of wines on the public endpoints
+
+Every public query reads the live catalog (status = 'live' AND is_available)
+and should be answered from an index - the ix_wines_live_* partial indexes,
+the search vector, the variety / vintage columns. A missing or unusable index
+shows up as a Seq Scan on wines, which is cheap on a small dev database and
+slow on a large one, so this check seeds a large fixture (--wines N, default
+50,000 over 40 wineries, some pending / archived / unavailable), runs ANALYZE,
+then calls each public endpoint and EXPLAINs every SELECT it issues, with the
+endpoint's own SQL and parameters.
+
+Fails (exit code 1) if any plan has a Seq Scan on wines. Name and variety
+substring (ILIKE) and fuzzy search need the pg_trgm indexes and are skipped
+without the extension.
+
+Usage:
+    python check_query_plans.py
+    python check_query_plans.py --wines 200000
+"""
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, insert, text
+
+from app.main import app
+from app.database import SessionLocal, engine, get_async_engine
+from app.models.winery import Winery
+from app.models.wine import Wine
+from app.services.count_cache import wine_counts
+
+WINERIES = 40
+SLUG_PREFIX = "query-plan-check"
+VARIETIES = ['Shiraz', 'Syrah', 'Riesling', 'Pinot Noir', 'Chardonnay', 'Sauv Blanc',
+             'Tempranillo', 'Pinot Gris', 'Cabernet Sauvignon', 'Rosé', 'Sparkling', 'Red Blend']
+
+# Descriptions make up most of a wine row - about the length scraped ones are
+TASTING_NOTE = (
+    "Deep crimson with a purple rim. The nose shows ripe plum, blackberry and a lift of "
+    "white pepper over savoury oak. The palate is medium bodied with fine, chalky tannins, "
+    "dark cherry and spice carrying through to a long finish. Drinking well now and will "
+    "reward careful cellaring over the next eight to ten years."
+)
+
+
+def seed(db, count: int):
+    """count wines over WINERIES wineries; returns (winery ids, a live wine id)"""
+    winery_ids = []
+    for n in range(WINERIES):
+        winery = Winery(name=f"Plan Check Winery {n}", slug=f"{SLUG_PREFIX}-{n}",
+                        shop_url="https://query-plan.test/shop")
+        db.add(winery)
+        db.flush()
+        winery_ids.append(winery.id)
+
+    now = datetime.utcnow()
+    rows = [{
+        'winery_id': winery_ids[i % WINERIES],
+        'name': f"Plan Check {VARIETIES[i % len(VARIETIES)]} {i}",
+        'variety': VARIETIES[i % len(VARIETIES)],
+        'vintage': 'NV' if i % 25 == 0 else str(2000 + i % 25),
+        'price': None if i % 50 == 0 else 12 + (i * 7) % 180,
+        'description': f"Plan check wine number {i}. " + TASTING_NOTE,
+        'is_available': i % 20 != 7,
+        'status': 'pending' if i % 10 == 1 else 'archived' if i % 20 == 3 else 'live',
+        'created_at': now, 'updated_at': now,
+    } for i in range(count)]
+    for start in range(0, count, 10000):
+        db.execute(insert(Wine.__table__), rows[start:start + 10000])
+    db.commit()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE wines"))
+        conn.execute(text("ANALYZE wineries"))
+
+    live_id = db.scalar(text(
+        "SELECT id FROM wines WHERE winery_id = :winery_id AND status = 'live' AND is_available LIMIT 1"
+    ), {'winery_id': winery_ids[0]})
+    return winery_ids, live_id
+
+
+def cleanup(db):
+    winery_ids = [w.id for w in db.query(Winery).filter(Winery.slug.like(f"{SLUG_PREFIX}-%")).all()]
+    if winery_ids:
+        db.execute(delete(Wine).where(Wine.winery_id.in_(winery_ids)))
+        db.execute(delete(Winery).where(Winery.id.in_(winery_ids)))
+    db.commit()
+
+
+def cases(winery_id: int, wine_id: int, cursor: str, has_trgm: bool):
+    """(label, path, params) for every public read endpoint"""
+    checked = [
+        ("wine list", "/api/wines/", {}),
+        ("wine list, next page", "/api/wines/", {'cursor': cursor}),
+        ("winery", "/api/wines/", {'winery_id': winery_id}),
+        ("variety", "/api/wines/", {'varieties': 'Shiraz'}),
+        ("varieties", "/api/wines/", {'varieties': ['Riesling', 'Pinot Noir']}),
+        ("vintage", "/api/wines/", {'vintage': '2015'}),
+        ("vintage range", "/api/wines/", {'vintage_from': 2010, 'vintage_to': 2012}),
+        ("non-vintage", "/api/wines/", {'vintage': 'NV'}),
+        ("price range", "/api/wines/", {'min_price': 30, 'max_price': 35}),
+        ("full-text search", "/api/wines/", {'search': 'plum shiraz', 'search_mode': 'fulltext'}),
+        ("facets, variety", "/api/wines/facets", {'varieties': 'Riesling'}),
+        ("facets, winery", "/api/wines/facets", {'winery_id': winery_id}),
+        ("wine detail", f"/api/wines/{wine_id}", {}),
+        ("facets", "/api/wines/facets", {}),
+        ("varieties list", "/api/wines/varieties/list", {}),
+        ("vintages list", "/api/wines/vintages/list", {}),
+    ]
+    trigram = [
+        ("name search", "/api/wines/", {'search': 'Check Shiraz 1234'}),
+        ("variety substring", "/api/wines/", {'variety': 'pinot'}),
+        ("fuzzy search", "/api/search/fuzzy", {'q': 'plan chek shiras'}),
+    ]
+    return checked + (trigram if has_trgm else []), ([] if has_trgm else trigram)
+
+
+@contextmanager
+def explain_selects():
+    """EXPLAINs each SELECT on the async engine (public endpoints) just before it runs"""
+    plans = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plans.append((statement, cursor.fetchall()[0][0][0]['Plan']))
+
+    event.listen(get_async_engine().sync_engine, "before_cursor_execute", on_execute)
+    try:
+        yield plans
+    finally:
+        event.remove(get_async_engine().sync_engine, "before_cursor_execute", on_execute)
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def check_query_plans(count: int):
+    print("=" * 80)
+    print(f"QUERY PLAN CHECK - no Seq Scan on wines ({count:,}-wine fixture)")
+    print("=" * 80)
+
+    db = SessionLocal()
+    failures = 0
+    try:
+        cleanup(db)
+        winery_ids, wine_id = seed(db, count)
+        has_trgm = db.scalar(text("SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'")) > 0
+
+        with TestClient(app) as client:
+            cursor = client.get("/api/wines/").json()['next_cursor']
+            checked, skipped = cases(winery_ids[0], wine_id, cursor, has_trgm)
+            for label, path, params in checked:
+                wine_counts.clear()  # totals must be counted, not served from the cache
+                with explain_selects() as plans:
+                    response = client.get(path, params=params)
+                response.raise_for_status()
+
+                scans = [node for _, plan in plans for node in plan_nodes(plan)
+                         if node.get('Relation Name') == 'wines']
+                seq_scans = [node for node in scans if node['Node Type'] == 'Seq Scan']
+                indexes = sorted({node['Index Name'] for _, plan in plans for node in plan_nodes(plan)
+                                  if 'wines' in node.get('Index Name', '')})
+                ok = bool(plans) and not seq_scans
+                failures += not ok
+                print(f"{'✓' if ok else '✗'} {label:<22} {len(plans)} queries  {', '.join(indexes)}")
+                for statement, plan in plans:
+                    if any(node['Node Type'] == 'Seq Scan' and node.get('Relation Name') == 'wines'
+                           for node in plan_nodes(plan)):
+                        print(f"    seq scan: {' '.join(statement.split())[:100]}")
+            for label, _, _ in skipped:
+                print(f"- {label:<22} skipped (needs pg_trgm)")
+    finally:
+        cleanup(db)
+        db.close()
+
+    print("=" * 80)
+    print("Every public query uses an index" if not failures
+          else f"{failures} endpoint(s) scan the whole wines table")
+    print("=" * 80)
+    return failures == 0
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    wines = int(args[args.index('--wines') + 1]) if '--wines' in args else 50000
+    sys.exit(0 if check_query_plans(wines) else 1)
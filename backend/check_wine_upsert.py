@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Behaviour check for saving scraped wines
+
+Scrapes are saved through two paths that must follow the same rules:
+- ORM / VALUES:  app.services.wine_service.upsert_scraped_wines
+- COPY:          app.services.wine_ingest.merge_via_staging
+
+For each case this script seeds a scratch winery, saves a scrape through each
+path and checks the stored rows. Everything runs in a transaction that is
+rolled back, so nothing is left behind.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python check_wine_upsert.py
+"""
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models.winery import Winery
+from app.models.wine import Wine
+from app.services.wine_service import upsert_scraped_wines
+from app.services.wine_ingest import merge_via_staging
+
+SHOP_URL = "https://upsert-check.test/shop"
+
+
+def save_orm(db, winery_id, scraped):
+    upsert_scraped_wines(db, winery_id, scraped)
+
+
+def save_copy(db, winery_id, scraped):
+    merge_via_staging(db, [winery_id], [dict(wine, winery_id=winery_id) for wine in scraped])
+
+
+PATHS = [("ORM upsert", save_orm), ("COPY merge", save_copy)]
+
+
+def add_wine(db, winery_id, name, **fields):
+    long_ago = datetime.utcnow() - timedelta(days=400)
+    wine = Wine(winery_id=winery_id, name=name, product_url=f"{SHOP_URL}/{name.lower().replace(' ', '-')}",
+                last_seen_at=long_ago, **fields)
+    db.add(wine)
+    db.flush()
+    return wine
+
+
+def scraped(wine, **fields):
+    return {'name': wine.name, 'vintage': wine.vintage, 'price': 30, 'product_url': wine.product_url, **fields}
+
+
+def case_archived(db, winery_id, save):
+    """Job-archived wines come back as pending; admin-archived ones stay archived"""
+    job = add_wine(db, winery_id, "Upsert Check Job Archived", vintage="2019",
+                   status='archived', is_available=False)
+    admin = add_wine(db, winery_id, "Upsert Check Admin Archived", vintage="2020",
+                     status='archived', is_available=True)
+    save(db, winery_id, [scraped(job), scraped(admin)])
+    db.expire_all()
+    return [
+        ("archived by the job (was unavailable) -> pending", job.status == 'pending'),
+        ("archived by an admin (still listed) -> stays archived", admin.status == 'archived'),
+    ]
+
+
+def case_missing_vintage(db, winery_id, save):
+    """A scrape without the vintage updates the one stored wine on that page and name"""
+    stored = add_wine(db, winery_id, "Upsert Check Reserve Shiraz", vintage="2019", price=20,
+                      status='live', is_available=True)
+    two = [add_wine(db, winery_id, "Upsert Check Riesling", vintage=vintage, status='live', is_available=True)
+           for vintage in ("2021", "2022")]
+    for wine in two:
+        wine.product_url = f"{SHOP_URL}/upsert-check-riesling"
+    db.flush()
+    save(db, winery_id, [scraped(stored, name="upsert check reserve  shiraz", vintage=None),
+                         scraped(two[0], vintage=None)])
+    db.expire_all()
+    shiraz = db.query(Wine).filter(Wine.winery_id == winery_id, Wine.name.ilike("%reserve%shiraz")).all()
+    riesling = db.query(Wine).filter(Wine.winery_id == winery_id, Wine.name == "Upsert Check Riesling").all()
+    return [
+        ("no vintage, one stored wine -> that wine, no duplicate", [w.id for w in shiraz] == [stored.id]),
+        ("stored vintage kept, price updated", stored.vintage == "2019" and stored.price == 30),
+        ("stored wine still available", stored.is_available),
+        ("no vintage, two stored vintages -> not guessed (new wine)", len(riesling) == 3),
+    ]
+
+
+CASES = [case_archived, case_missing_vintage]
+
+
+def check_wine_upsert():
+    print("=" * 80)
+    print("WINE UPSERT CHECK - ORM and COPY paths")
+    print("=" * 80)
+
+    failures = 0
+    for path_label, save in PATHS:
+        print(f"{path_label}:")
+        for run_case in CASES:
+            db = SessionLocal()
+            try:
+                winery = Winery(name="Upsert Check Winery", slug="upsert-check-winery", shop_url=SHOP_URL)
+                db.add(winery)
+                db.flush()
+                for label, ok in run_case(db, winery.id, save):
+                    failures += not ok
+                    print(f"  {'✓' if ok else '✗'} {label}")
+            finally:
+                db.rollback()
+                db.close()
+
+    print("=" * 80)
+    print("Both paths save wines the same way" if not failures else f"{failures} check(s) failed")
+    print("=" * 80)
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_wine_upsert() else 1)
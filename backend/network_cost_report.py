@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Network cost report: which wineries are most expensive to scrape?
+
+Ranks wineries by bytes transferred per extracted wine over their full
+('success') scrapes in the last N days, using the network totals recorded on
+scrape_logs. The top of this list is where cheaper fetch strategies (blocking
+images/fonts, listing-only scrapes, platform APIs) pay off most.
+
+Usage:
+    python network_cost_report.py              # last 30 days
+    python network_cost_report.py --days 7
+    python network_cost_report.py --pages 3    # also show each winery's 3 heaviest pages
+"""
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models.winery import Winery
+from app.models.wine import Wine  # noqa: F401 - registers Winery.wines relationship
+from app.models.scraper import ScrapeLog
+from sqlalchemy import func
+
+
+def format_bytes(num_bytes) -> str:
+    num_bytes = float(num_bytes or 0)
+    for unit in ['B', 'KB', 'MB']:
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def network_cost_by_winery(db, days: int = 30):
+    """
+    Per-winery network totals over recent full scrapes, most expensive per wine first
+    Returns: list of dicts
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    rows = db.query(
+        Winery.id,
+        Winery.name,
+        func.count(ScrapeLog.id).label('runs'),
+        func.sum(ScrapeLog.wines_found).label('wines'),
+        func.sum(ScrapeLog.network_requests).label('requests'),
+        func.sum(ScrapeLog.network_bytes).label('bytes'),
+        func.sum(ScrapeLog.network_cache_hits).label('cache_hits'),
+        func.sum(ScrapeLog.network_blocked).label('blocked'),
+        func.max(ScrapeLog.scrape_finished_at).label('last_run'),
+    ).join(ScrapeLog, ScrapeLog.winery_id == Winery.id).filter(
+        ScrapeLog.status == 'success',
+        ScrapeLog.network_bytes.isnot(None),
+        ScrapeLog.scrape_started_at >= cutoff
+    ).group_by(Winery.id, Winery.name).all()
+
+    report = []
+    for row in rows:
+        wines = row.wines or 0
+        report.append({
+            'winery_id': row.id,
+            'winery_name': row.name,
+            'runs': row.runs,
+            'wines': wines,
+            'requests': row.requests or 0,
+            'bytes': row.bytes or 0,
+            'cache_hits': row.cache_hits or 0,
+            'blocked': row.blocked or 0,
+            'bytes_per_wine': (row.bytes or 0) / wines if wines else None,
+            'requests_per_wine': (row.requests or 0) / wines if wines else None,
+            'last_run': row.last_run,
+        })
+
+    # Wineries that cost bandwidth but yielded no wines are the worst of all
+    report.sort(key=lambda r: r['bytes_per_wine'] if r['bytes_per_wine'] is not None else float('inf'), reverse=True)
+    return report
+
+
+def heaviest_pages(db, winery_id: int, limit: int):
+    """Heaviest pages recorded on the winery's latest full scrape"""
+    last_run = db.query(ScrapeLog).filter(
+        ScrapeLog.winery_id == winery_id,
+        ScrapeLog.status == 'success',
+        ScrapeLog.network_heaviest_pages.isnot(None)
+    ).order_by(ScrapeLog.scrape_finished_at.desc()).first()
+    return (last_run.network_heaviest_pages or [])[:limit] if last_run else []
+
+
+def print_report(days: int = 30, pages: int = 0):
+    db = SessionLocal()
+    try:
+        report = network_cost_by_winery(db, days)
+
+        print("=" * 100)
+        print(f"NETWORK COST PER EXTRACTED WINE (full scrapes, last {days} days)")
+        print("=" * 100)
+
+        if not report:
+            print("No scrape runs with network metrics yet.")
+            return
+
+        print(f"{'#':>3}  {'Winery':<32} {'Runs':>4} {'Wines':>6} {'Per wine':>11} {'Req/wine':>9} {'Total':>11} {'Cached':>7} {'Blocked':>7}")
+        print("-" * 100)
+        for rank, row in enumerate(report, 1):
+            per_wine = format_bytes(row['bytes_per_wine']) if row['bytes_per_wine'] is not None else 'no wines'
+            req_per_wine = f"{row['requests_per_wine']:.0f}" if row['requests_per_wine'] is not None else '-'
+            print(f"{rank:>3}  {row['winery_name'][:32]:<32} {row['runs']:>4} {row['wines']:>6} "
+                  f"{per_wine:>11} {req_per_wine:>9} {format_bytes(row['bytes']):>11} "
+                  f"{row['cache_hits']:>7} {row['blocked']:>7}")
+
+            for page in heaviest_pages(db, row['winery_id'], pages):
+                print(f"       {format_bytes(page['bytes']):>10} {page['requests']:>4} req  {page['url']}")
+
+        total_bytes = sum(r['bytes'] for r in report)
+        total_wines = sum(r['wines'] for r in report)
+        print("-" * 100)
+        print(f"Total: {format_bytes(total_bytes)} for {total_wines} wines"
+              + (f" ({format_bytes(total_bytes / total_wines)} per wine)" if total_wines else ""))
+        print("=" * 100)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    days = int(args[args.index('--days') + 1]) if '--days' in args else 30
+    pages = int(args[args.index('--pages') + 1]) if '--pages' in args else 0
+    print_report(days=days, pages=pages)
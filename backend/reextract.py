@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Re-run current extraction logic over the raw HTML archive and save the results
+
+After fixing extraction (e.g. a vintage or name cleanup fix), this applies the
+fix to every archived product page in parallel - no network traffic.
+
+Matching is by product URL (the archive is keyed by URL), so a fix that changes
+a wine's name or vintage updates the existing row instead of creating a new one.
+Pages with several vintages match per vintage within the URL:
+- Existing wine (same winery + product_url): extracted fields are corrected -
+  status/availability untouched
+  - price only if the archived page is newer than the wine's last_seen_at
+    (an older page would roll back a price a later scrape saved)
+  - name, variety, vintage, description are left alone on wines an admin
+    has edited (admin_edited_at)
+  - a fix that would give the wine another wine's identity (same winery,
+    name and vintage) is skipped and reported; the rest of the winery is saved
+  - price changes go to price_history, and every change to the catalog feed
+- No existing wine for that URL: inserted as 'pending' for review through the
+  scrape upsert (an identity that already exists is left as it is)
+
+Usage:
+    python reextract.py                  # all archived wineries
+    python reextract.py 1 11 32          # specific wineries
+    python reextract.py --dry-run        # show changes, don't save
+    python reextract.py --prune          # apply archive retention policy first
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models.winery import Winery
+from app.models.wine import Wine
+from app.models.scraper import ScraperConfig
+from app.scrapers.enhanced_scraper import EnhancedScraper
+from app.scrapers.html_archive import HtmlArchive
+from app.services.catalog_changes import record_changes, scrape_changes, wine_changes, wine_snapshot
+from app.services.wine_service import ADMIN_CURATED_FIELDS, fix_wine_fields, upsert_scraped_wines
+
+EXTRACTED_FIELDS = ['name', 'variety', 'vintage', 'price', 'description']
+
+
+def comparable(value):
+    """Prices come back from the DB as Decimal but are scraped as float"""
+    if isinstance(value, (float, Decimal)):
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    return value
+
+
+def extract_archived_page(job):
+    """
+    Worker: load one archived page and run current extraction on it
+    (top-level function so it can be pickled for the process pool)
+    Returns: list of wines on the page, each with the page's fetched_at
+    """
+    winery_id, winery_name, shop_url, platform_type, url, digest, fetched_at = job
+    html = HtmlArchive().load(digest)
+    scraper = EnhancedScraper(winery_id=winery_id, winery_name=winery_name, shop_url=shop_url,
+                              config={'platform_type': platform_type})
+    return [
+        dict(wine_data, fetched_at=datetime.fromisoformat(fetched_at))
+        for wine_data in scraper.parse_product_wines(html, url)
+        if scraper.validate_wine_data(wine_data)
+    ]
+
+
+def match_by_url(candidates, wine_data, single_wine_page: bool):
+    """
+    Existing wine for a re-extracted one, among the rows with its product URL
+
+    Same vintage wins. A page that yields a single wine also matches a lone
+    row with a different vintage - that's the vintage fix we're applying.
+    """
+    for wine in candidates:
+        if (wine.vintage or '') == (wine_data.get('vintage') or ''):
+            return wine
+    if single_wine_page and len(candidates) == 1:
+        return candidates[0]
+    return None
+
+
+def corrected_fields(wine: Wine, wine_data):
+    """
+    Fields re-extraction may correct on an existing wine: {field: (old, new)}
+
+    Price only from a page fetched after the wine was last seen; curated
+    fields only on wines no admin has edited.
+    """
+    fields = EXTRACTED_FIELDS
+    if wine.admin_edited_at:
+        fields = [field for field in fields if field not in ADMIN_CURATED_FIELDS]
+    if wine.last_seen_at and wine_data['fetched_at'] <= wine.last_seen_at:
+        fields = [field for field in fields if field != 'price']
+    return {
+        field: (getattr(wine, field), wine_data[field])
+        for field in fields
+        if wine_data.get(field) is not None
+        and comparable(getattr(wine, field)) != comparable(wine_data[field])
+    }
+
+
+def upsert_reextracted(db, winery: Winery, extracted, dry_run: bool = False):
+    """
+    Apply re-extracted wines to the database, matching on product URL
+    Returns: (fixed, new, skipped) counts
+    """
+    existing_by_url = {}
+    for wine in db.query(Wine).filter(
+        Wine.winery_id == winery.id,
+        Wine.product_url.isnot(None)
+    ).all():
+        existing_by_url.setdefault(wine.product_url, []).append(wine)
+
+    wines_per_url = {}
+    for wine_data in extracted:
+        wines_per_url[wine_data['product_url']] = wines_per_url.get(wine_data['product_url'], 0) + 1
+
+    changed_count = 0
+    skipped_count = 0
+    new_wines = []
+    feed = []
+    for wine_data in extracted:
+        existing_wine = match_by_url(
+            existing_by_url.get(wine_data['product_url'], []),
+            wine_data,
+            single_wine_page=wines_per_url[wine_data['product_url']] == 1
+        )
+
+        if existing_wine:
+            changes = corrected_fields(existing_wine, wine_data)
+            if not changes:
+                continue
+            summary = ', '.join(f"{field}: {old!r} → {new!r}" for field, (old, new) in changes.items())
+            if dry_run:
+                changed_count += 1
+                print(f"  ↻ FIXED: {existing_wine.name} ({summary})")
+                continue
+
+            before = wine_snapshot(existing_wine)
+            conflict = fix_wine_fields(db, existing_wine, {field: new for field, (_, new) in changes.items()})
+            if conflict:
+                skipped_count += 1
+                print(f"  ⚠️  SKIPPED: {existing_wine.name} ({summary}) - same name/vintage as wine {conflict}")
+            else:
+                changed_count += 1
+                print(f"  ↻ FIXED: {existing_wine.name} ({summary})")
+                feed.extend(wine_changes(existing_wine, before, source='reextract'))
+        else:
+            print(f"  ⏳ PENDING REVIEW: {wine_data['name']} (${wine_data.get('price')}) [not in database]")
+            new_wines.append(wine_data)
+
+    new_count = len(new_wines)
+    if not dry_run:
+        # Same upsert as a scrape, seen when the page was fetched; a wine whose
+        # identity already exists (under another URL) isn't touched
+        pages = {}
+        for wine_data in new_wines:
+            pages.setdefault(wine_data['fetched_at'], []).append(wine_data)
+        saved = []
+        for fetched_at, page_wines in pages.items():
+            saved.extend(upsert_scraped_wines(db, winery.id, page_wines, seen_at=fetched_at,
+                                              update_existing=False))
+        new_count = len(saved)
+        if len(saved) < len(new_wines):
+            print(f"  - {len(new_wines) - len(saved)} already in database under another URL")
+
+        feed.extend(scrape_changes(winery.id, saved, [], source='reextract'))
+        record_changes(db, feed)
+        db.commit()
+
+    return changed_count, new_count, skipped_count
+
+
+def reextract(winery_ids=None, dry_run: bool = False, workers: int = None):
+    """Re-extract archived pages for the given wineries (default: all archived)"""
+    archive = HtmlArchive()
+    winery_ids = winery_ids or archive.winery_ids()
+    db = SessionLocal()
+
+    try:
+        wineries = db.query(Winery).filter(Winery.id.in_(winery_ids)).order_by(Winery.id).all()
+
+        platform_types = dict(
+            db.query(ScraperConfig.winery_id, ScraperConfig.platform_type).filter(
+                ScraperConfig.winery_id.in_(winery_ids)
+            ).all()
+        )
+
+        jobs = []
+        for winery in wineries:
+            for url, digest, fetched_at in archive.entries(winery.id):
+                jobs.append((winery.id, winery.name, winery.shop_url, platform_types.get(winery.id),
+                             url, digest, fetched_at))
+
+        print(f"Re-extracting {len(jobs)} archived pages from {len(wineries)} wineries...")
+
+        # BeautifulSoup parsing is CPU-bound - use processes, not threads
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            results = list(pool.map(extract_archived_page, jobs, chunksize=8))
+
+        extracted_by_winery = {}
+        for job, page_wines in zip(jobs, results):
+            extracted_by_winery.setdefault(job[0], []).extend(page_wines)
+
+        total_changed = 0
+        total_new = 0
+        total_skipped = 0
+        for winery in wineries:
+            extracted = extracted_by_winery.get(winery.id, [])
+            print()
+            print(f"{winery.name}: {len(extracted)} wines extracted")
+            changed, new, skipped = upsert_reextracted(db, winery, extracted, dry_run=dry_run)
+            total_changed += changed
+            total_new += new
+            total_skipped += skipped
+
+        print()
+        print("=" * 80)
+        print("Re-extract Summary:" + (" (DRY RUN - nothing saved)" if dry_run else ""))
+        print(f"  Pages re-extracted:         {len(jobs)}")
+        print(f"  Wines fixed:                {total_changed}")
+        print(f"  New wines (pending review): {total_new}")
+        print(f"  Fixes skipped (identity):   {total_skipped}")
+        print("=" * 80)
+
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+
+    if '--prune' in sys.argv[1:]:
+        print(f"Pruning archive: {HtmlArchive().prune()}")
+
+    reextract(
+        winery_ids=[int(arg) for arg in args] or None,
+        dry_run='--dry-run' in sys.argv[1:]
+    )
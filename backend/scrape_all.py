@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Scrape every active winery concurrently and save to database
+
+All wineries share ONE browser (app/scrapers/browser_pool.py), so the whole
+region runs inside a fixed memory envelope:
+- SCRAPER_PARALLEL_WORKERS listing pages are loaded at the same time
+- SCRAPER_MAX_OPEN_PAGES caps open pages across all of them
+- Contexts are recycled after SCRAPER_CONTEXT_MAX_PAGES pages or above SCRAPER_MAX_RSS_MB
+
+Per-host latency stats (adaptive timeouts) are shared too and saved once at the end.
+
+Product pages from all wineries go through one crawl frontier
+(app/scrapers/frontier.py): new URLs first, then recently price-volatile
+wines, then the longest-unseen. With a deadline (SCRAPER_RUN_DEADLINE_MINUTES
+or --deadline-minutes) the run stops handing out pages when time is up and
+records what it deferred on each winery's scrape log.
+
+Usage: python scrape_all.py [--force] [--deadline-minutes N]
+"""
+import sys
+import asyncio
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.winery import Winery
+from app.models.wine import Wine, PriceHistory
+from app.models.scraper import ScrapeLog
+from app.scrapers.browser_pool import BrowserPool
+from app.scrapers.frontier import CrawlFrontier, NEW, VOLATILE, STALE
+from app.scrapers.host_latency import HostLatencyStats
+from scrape_and_save import build_scraper, save_scrape_results
+from sqlalchemy import func
+
+
+class WineryRun:
+    """One winery's progress through a region run"""
+    
+    def __init__(self, winery_id: int):
+        self.winery_id = winery_id
+        self.scraper = None
+        self.scrape_log = ScrapeLog(
+            winery_id=winery_id,
+            scrape_started_at=datetime.utcnow(),
+            status='running'
+        )
+        self.wines = []
+        self.listing_deferred = False
+        self.error = None
+
+
+def get_crawl_priorities(db, winery_id: int):
+    """
+    Frontier priority for each product URL we already know
+    Returns: {product_url: (tier, sort_key)} - URLs not in here are NEW
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.scraper_volatility_days)
+    price_changes = dict(
+        db.query(PriceHistory.wine_id, func.count(func.distinct(PriceHistory.price)))
+        .join(Wine, Wine.id == PriceHistory.wine_id)
+        .filter(Wine.winery_id == winery_id, PriceHistory.recorded_at >= cutoff)
+        .group_by(PriceHistory.wine_id)
+        .having(func.count(func.distinct(PriceHistory.price)) > 1)
+        .all()
+    )
+    
+    priorities = {}
+    for wine in db.query(Wine).filter(Wine.winery_id == winery_id, Wine.product_url.isnot(None)).all():
+        if wine.id in price_changes:
+            priority = (VOLATILE, -price_changes[wine.id])
+        else:
+            priority = (STALE, wine.last_seen_at.timestamp() if wine.last_seen_at else 0)
+        # Several wines per URL (vintage variants): the most urgent one counts
+        priorities[wine.product_url] = min(priority, priorities.get(wine.product_url, priority))
+    return priorities
+
+
+async def load_listing(pool: BrowserPool, latency: HostLatencyStats, run: WineryRun, force: bool,
+                       frontier: CrawlFrontier, workers: asyncio.Semaphore):
+    """Load one winery's listing and queue the product pages that need a visit"""
+    async with workers:
+        if frontier.expired():
+            run.listing_deferred = True
+            return
+        
+        db = SessionLocal()
+        try:
+            winery = db.query(Winery).filter(Winery.id == run.winery_id).first()
+            run.scraper = build_scraper(db, winery, force, browser_pool=pool, host_latency=latency)
+            product_urls = await run.scraper.load_listing(pool)
+            if run.scraper.listing_unchanged:
+                return
+            
+            priorities = get_crawl_priorities(db, winery.id)
+            for url in product_urls:
+                card_wine = run.scraper.take_listing_card(url)
+                if card_wine:
+                    run.wines.append(card_wine)
+                else:
+                    frontier.push(run.winery_id, url, *priorities.get(url, (NEW, 0)))
+        except Exception as e:
+            run.error = str(e)
+            print(f"Error loading listing for winery {run.winery_id}: {str(e)}")
+        finally:
+            db.close()
+
+
+async def crawl_worker(pool: BrowserPool, frontier: CrawlFrontier, runs):
+    """Visit product pages from the shared frontier until it's empty or time is up"""
+    while True:
+        item = frontier.pop()
+        if item is None:
+            return
+        winery_id, url = item
+        run = runs[winery_id]
+        run.wines.extend(await run.scraper.scrape_product(pool, url))
+
+
+def save_run(run: WineryRun, deferred_urls, memory_stats):
+    """Save one winery's results in its own session"""
+    db = SessionLocal()
+    scrape_log = run.scrape_log
+    try:
+        winery = db.query(Winery).filter(Winery.id == run.winery_id).first()
+        print("=" * 80)
+        print(f"Saving: {winery.name}")
+        print("=" * 80)
+        
+        if run.listing_deferred or run.error:
+            scrape_log.status = 'deferred' if run.listing_deferred else 'failed'
+            scrape_log.error_message = run.error or 'Run deadline reached before listing was loaded'
+            scrape_log.scrape_finished_at = datetime.utcnow()
+            db.add(scrape_log)
+            db.commit()
+            print(scrape_log.error_message)
+            return
+        
+        run.scraper.memory_stats = memory_stats
+        save_scrape_results(db, winery, run.scraper, run.wines, scrape_log, deferred_urls=deferred_urls)
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving winery {run.winery_id}: {str(e)}")
+        try:
+            scrape_log.status = 'failed'
+            scrape_log.error_message = str(e)
+            scrape_log.scrape_finished_at = datetime.utcnow()
+            db.add(scrape_log)
+            db.commit()
+        except Exception:
+            db.rollback()
+    finally:
+        db.close()
+
+
+async def scrape_all(force: bool = False, deadline_minutes: int = None):
+    """Scrape all active wineries through one shared browser pool and crawl frontier"""
+    db = SessionLocal()
+    try:
+        winery_ids = [
+            w.id for w in db.query(Winery).filter(Winery.is_active == True).order_by(Winery.id).all()
+        ]
+    finally:
+        db.close()
+    
+    if deadline_minutes is None:
+        deadline_minutes = settings.scraper_run_deadline_minutes
+    frontier = CrawlFrontier(deadline_seconds=deadline_minutes * 60 if deadline_minutes else None)
+    
+    print(f"Scraping {len(winery_ids)} wineries with {settings.scraper_parallel_workers} workers"
+          + (f", deadline {deadline_minutes} min" if deadline_minutes else ""))
+    print()
+    
+    runs = {winery_id: WineryRun(winery_id) for winery_id in winery_ids}
+    workers = asyncio.Semaphore(settings.scraper_parallel_workers)
+    latency = HostLatencyStats()
+    async with BrowserPool() as pool:
+        # 1. Listings (one page per winery) fill the frontier
+        await asyncio.gather(*[
+            load_listing(pool, latency, run, force, frontier, workers) for run in runs.values()
+        ])
+        queued = len(frontier)
+        
+        # 2. Product pages, most valuable first, across all wineries
+        await asyncio.gather(*[
+            crawl_worker(pool, frontier, runs) for _ in range(settings.scraper_max_open_pages)
+        ])
+        deferred = frontier.remaining()
+        metrics = pool.metrics_snapshot()
+    latency.save()
+    
+    # 3. Save each winery (deferred pages are kept, not marked unavailable)
+    for run in runs.values():
+        save_run(run, deferred.get(run.winery_id, []), metrics)
+    
+    print()
+    print("=" * 80)
+    print("Crawl Frontier Summary:")
+    print(f"  Product pages queued:   {queued}")
+    print(f"  Visited (new/volatile/stale): "
+          f"{frontier.popped['new']}/{frontier.popped['volatile']}/{frontier.popped['stale']}")
+    print(f"  Deferred by deadline:   {sum(len(urls) for urls in deferred.values())} pages, "
+          f"{sum(1 for run in runs.values() if run.listing_deferred)} listings")
+    print()
+    print("Browser Memory Summary:")
+    print(f"  Pages opened:       {metrics['pages_opened']}")
+    print(f"  Contexts created:   {metrics['contexts_created']}")
+    print(f"  Contexts recycled:  {metrics['contexts_recycled']}")
+    print(f"  Browser restarts:   {metrics['browser_restarts']}")
+    print(f"  Peak RSS:           {metrics['peak_rss_mb']} MB (ceiling {settings.scraper_max_rss_mb} MB)")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(scrape_all(
+        force='--force' in args,
+        deadline_minutes=int(args[args.index('--deadline-minutes') + 1]) if '--deadline-minutes' in args else None
+    ))
@@ -5,27 +5,247 @@ Handles duplicates intelligently - updates existing wines, adds new ones
 Preserves existing capitalization and data
 """
 import sys
-import os
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.database import engine, SessionLocal
+from app.config import settings
+from app.database import SessionLocal
 from app.models.winery import Winery
 from app.models.wine import Wine
+from app.models.scraper import ScrapeLog, ScraperConfig
 from app.scrapers.enhanced_scraper import EnhancedScraper
-from sqlalchemy import text, func
-from datetime import datetime
+from app.scrapers.html_archive import HtmlArchive
+from app.services.catalog_changes import record_changes, scrape_changes
+from app.services.wine_ingest import merge_via_staging
+from app.services.wine_service import upsert_scraped_wines, mark_missing_unavailable
+from sqlalchemy import func
+from datetime import datetime, timedelta
 
 
-def normalize_for_comparison(text):
-    """Normalize text for duplicate detection (case-insensitive, whitespace-normalized)"""
-    if not text:
-        return ""
-    return " ".join(text.lower().split())
+def get_fresh_fingerprint(db, winery_id: int):
+    """
+    Return the listing fingerprint of the last full scrape, if it is younger
+    than SCRAPER_FINGERPRINT_MAX_AGE_HOURS. Only 'success' runs count, so a
+    static catalog still gets a full scrape once the fingerprint expires.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=settings.scraper_fingerprint_max_age_hours)
+    last_full_scrape = db.query(ScrapeLog).filter(
+        ScrapeLog.winery_id == winery_id,
+        ScrapeLog.status == 'success',
+        ScrapeLog.listing_fingerprint.isnot(None),
+        ScrapeLog.scrape_finished_at >= cutoff
+    ).order_by(ScrapeLog.scrape_finished_at.desc()).first()
+    
+    return last_full_scrape.listing_fingerprint if last_full_scrape else None
+
+
+def get_known_wines(db, winery_id: int):
+    """{product_url: wine details} for hybrid listing mode to compare listing cards against"""
+    wines_by_url = {}
+    for wine in db.query(Wine).filter(
+        Wine.winery_id == winery_id,
+        Wine.product_url.isnot(None)
+    ).all():
+        wines_by_url.setdefault(wine.product_url, []).append(wine)
+    
+    # Multi-vintage product pages always need a visit - a card shows one vintage
+    return {
+        url: {
+            'name': wine.name,
+            'variety': wine.variety,
+            'vintage': wine.vintage,
+            'price': float(wine.price) if wine.price is not None else None,
+            'description': wine.description,
+        }
+        for url, (wine, *others) in wines_by_url.items()
+        if not others
+    }
+
+
+def build_scraper(db, winery: Winery, force: bool = False, browser_pool=None,
+                  host_latency=None) -> EnhancedScraper:
+    """Create the scraper for a winery, primed with its change-gating fingerprint and platform"""
+    scraper_config = db.query(ScraperConfig).filter(ScraperConfig.winery_id == winery.id).first()
+    return EnhancedScraper(
+        winery_id=winery.id,
+        winery_name=winery.name,
+        shop_url=winery.shop_url,
+        config={
+            'listing_fingerprint': None if force else get_fresh_fingerprint(db, winery.id),
+            'platform_type': scraper_config.platform_type if scraper_config else None,
+            'hybrid_listing': settings.scraper_hybrid_listing,
+            'known_wines': get_known_wines(db, winery.id) if settings.scraper_hybrid_listing else {},
+        },
+        browser_pool=browser_pool,
+        html_archive=HtmlArchive() if settings.scraper_archive_enabled else None,
+        host_latency=host_latency
+    )
+
 
+HEAVIEST_PAGES_KEPT = 10
 
-def scrape_and_save(winery_id: int):
+
+def record_run_metrics(scrape_log: ScrapeLog, scraper: EnhancedScraper):
+    """Copy the scraper's per-run browser memory and network metrics onto the run record"""
+    memory = scraper.memory_stats or {}
+    scrape_log.peak_rss_mb = memory.get('peak_rss_mb')
+    scrape_log.contexts_recycled = memory.get('contexts_recycled')
+    
+    network = scraper.network_stats
+    scrape_log.network_requests = network.requests
+    scrape_log.network_bytes = network.bytes
+    scrape_log.network_cache_hits = network.cache_hits
+    scrape_log.network_blocked = network.blocked
+    scrape_log.network_failed = network.failed
+    heaviest = sorted(scraper.page_network_stats.items(), key=lambda item: item[1]['bytes'], reverse=True)
+    scrape_log.network_heaviest_pages = [
+        dict(url=url, **stats) for url, stats in heaviest[:HEAVIEST_PAGES_KEPT]
+    ]
+
+
+def save_platform_type(db, winery: Winery, scraper: EnhancedScraper):
+    """Cache a newly detected platform in scraper_configs so later runs skip detection"""
+    if not scraper.platform_type:
+        return
+    scraper_config = db.query(ScraperConfig).filter(ScraperConfig.winery_id == winery.id).first()
+    if scraper_config is None:
+        db.add(ScraperConfig(winery_id=winery.id, platform_type=scraper.platform_type, requires_javascript=True))
+        print(f"Detected platform: {scraper.platform_type}")
+    elif not scraper_config.platform_type:
+        scraper_config.platform_type = scraper.platform_type
+        print(f"Detected platform: {scraper.platform_type}")
+
+
+def save_scrape_results(db, winery: Winery, scraper: EnhancedScraper, scraped_wines, scrape_log: ScrapeLog,
+                        deferred_urls=None):
+    """
+    Save a finished scrape for one winery and record the run in scrape_logs
+    
+    deferred_urls: product pages the run deadline left unvisited (scrape_all.py).
+    Their wines are neither refreshed nor marked unavailable, and the run is
+    recorded as 'partial' without a fingerprint so the next run does them.
+    """
+    winery_id = winery.id
+    deferred_urls = deferred_urls or []
+    record_run_metrics(scrape_log, scraper)
+    save_platform_type(db, winery, scraper)
+    
+    if scraper.listing_unchanged:
+        # Nothing changed on the listing page - just confirm the wines are still there
+        now = datetime.utcnow()
+        refreshed = db.query(Wine).filter(
+            Wine.winery_id == winery_id,
+            Wine.is_available == True
+        ).update({Wine.last_seen_at: now}, synchronize_session=False)
+        
+        winery.last_scraped_at = now
+        scrape_log.status = 'unchanged'
+        scrape_log.listing_fingerprint = scraper.listing_fingerprint
+        scrape_log.scrape_finished_at = now
+        db.add(scrape_log)
+        db.commit()
+        
+        print()
+        print(f"Listing unchanged since last full scrape - refreshed {refreshed} wine(s)")
+        print("(use --force to scrape product pages anyway)")
+        return
+    
+    if not scraped_wines and not deferred_urls:
+        print("No wines found!")
+        scrape_log.status = 'failed'
+        scrape_log.error_message = '; '.join(scraper.errors) or 'No wines found'
+        scrape_log.scrape_finished_at = datetime.utcnow()
+        db.add(scrape_log)
+        db.commit()
+        return
+    
+    print()
+    print(f"Found {len(scraped_wines)} wines. Processing...")
+    print()
+    
+    # Set-based save: new wines go in as 'pending', existing ones (same
+    # winery/name/vintage) get price, availability and last_seen. Wines missing
+    # from this scrape are marked unavailable (pages not visited this run are
+    # no evidence a wine is gone).
+    if len(scraped_wines) >= settings.scraper_copy_threshold:
+        merged = merge_via_staging(
+            db, [winery_id], [dict(wine_data, winery_id=winery_id) for wine_data in scraped_wines],
+            keep_urls=deferred_urls
+        )
+        saved_wines, removed_wines = merged['saved'], merged['removed']
+    else:
+        saved_wines = upsert_scraped_wines(db, winery_id, scraped_wines)
+        removed_wines = mark_missing_unavailable(
+            db, winery_id, [wine['id'] for wine in saved_wines], keep_urls=deferred_urls
+        )
+    
+    saved_count = 0
+    updated_count = 0
+    skipped_count = 0
+    pending_count = 0
+    
+    for wine in saved_wines:
+        if wine['inserted']:
+            print(f"  ⏳ PENDING REVIEW: {wine['name']} (${wine['price']}) [new wine]")
+            saved_count += 1
+            pending_count += 1
+        elif wine['price'] != wine['old_price']:
+            print(f"  ↻ UPDATED: {wine['name']} (${wine['old_price']} → ${wine['price']}) [status: {wine['status']}]")
+            updated_count += 1
+        else:
+            print(f"  = UNCHANGED: {wine['name']} [status: {wine['status']}]")
+            skipped_count += 1
+    
+    for wine in removed_wines:
+        print(f"  - REMOVED: {wine['name']} (no longer available) [status: {wine['status']}]")
+    removed_count = len(removed_wines)
+    
+    # Commit all changes (feed entries last - they serialize on the feed lock)
+    record_changes(db, scrape_changes(winery_id, saved_wines, removed_wines))
+    db.commit()
+    
+    # Update winery last_scraped_at and record the run
+    winery.last_scraped_at = datetime.utcnow()
+    scrape_log.status = 'partial' if deferred_urls else 'success'
+    scrape_log.wines_found = len(scraped_wines)
+    scrape_log.wines_added = saved_count
+    scrape_log.wines_updated = updated_count
+    scrape_log.wines_removed = removed_count
+    scrape_log.pages_deferred = len(deferred_urls)
+    scrape_log.deferred_urls = deferred_urls or None
+    scrape_log.listing_fingerprint = None if deferred_urls else scraper.listing_fingerprint
+    scrape_log.scrape_finished_at = datetime.utcnow()
+    db.add(scrape_log)
+    db.commit()
+    
+    print()
+    print("=" * 80)
+    print("Save Summary:")
+    print(f"  New wines (pending review): {pending_count}")
+    print(f"  Wines updated:              {updated_count}")
+    print(f"  Wines unchanged:            {skipped_count}")
+    print(f"  Total wines processed:      {len(scraped_wines)}")
+    if deferred_urls:
+        print(f"  Pages deferred (deadline):  {len(deferred_urls)}")
+    print("=" * 80)
+    
+    # Show status breakdown for this winery
+    status_counts = db.query(Wine.status, func.count(Wine.id)).filter(
+        Wine.winery_id == winery_id,
+        Wine.is_available == True
+    ).group_by(Wine.status).all()
+    
+    print(f"\nWine status for {winery.name}:")
+    for status, count in status_counts:
+        print(f"  {status.upper()}: {count}")
+    
+    if pending_count > 0:
+        print(f"\n⚠️  {pending_count} wine(s) are pending review!")
+        print("   Visit admin dashboard to review and approve.")
+
+
+def scrape_and_save(winery_id: int, force: bool = False):
     """
     Scrape wines from a winery and intelligently save to database
     
@@ -36,8 +256,14 @@ def scrape_and_save(winery_id: int):
     - Removed wines: mark is_available=False (don't change status)
     
     This allows admin to review new wines before they appear on public site.
+    
+    CHANGE GATING:
+    If the listing fingerprint matches the last full scrape (and that scrape is
+    still fresh), product pages are skipped and only last_seen_at is refreshed.
+    Pass force=True to always do a full scrape.
     """
     db = SessionLocal()
+    scrape_log = None
     
     try:
         # Get winery
@@ -46,141 +272,51 @@ def scrape_and_save(winery_id: int):
             print(f"Winery with ID {winery_id} not found")
             return
         
-        print(f"=" * 80)
+        print("=" * 80)
         print(f"Scraping: {winery.name}")
         print(f"URL: {winery.shop_url}")
-        print(f"=" * 80)
+        print("=" * 80)
         print()
         
-        # Run scraper
-        scraper = EnhancedScraper(
+        scrape_log = ScrapeLog(
             winery_id=winery.id,
-            winery_name=winery.name,
-            shop_url=winery.shop_url
+            scrape_started_at=datetime.utcnow(),
+            status='running'
         )
         
+        # Run scraper
+        scraper = build_scraper(db, winery, force)
         scraped_wines = scraper.scrape()
         
-        if not scraped_wines:
-            print("No wines found!")
-            return
-        
-        print()
-        print(f"Found {len(scraped_wines)} wines. Processing...")
-        print()
-        
-        # Get all existing wines for this winery
-        existing_wines = db.query(Wine).filter(Wine.winery_id == winery_id).all()
-        existing_wines_map = {}
-        
-        for wine in existing_wines:
-            # Create lookup key: normalized name
-            key = normalize_for_comparison(wine.name)
-            existing_wines_map[key] = wine
-        
-        saved_count = 0
-        updated_count = 0
-        skipped_count = 0
-        pending_count = 0
-        
-        # Process scraped wines
-        for wine_data in scraped_wines:
-            # Create lookup key for this scraped wine
-            scraped_key = normalize_for_comparison(wine_data['name'])
-            
-            # Check if wine already exists
-            if scraped_key in existing_wines_map:
-                # Wine exists - update only price and availability
-                existing_wine = existing_wines_map[scraped_key]
-                
-                # Update price if changed
-                if wine_data.get('price') and existing_wine.price != wine_data['price']:
-                    old_price = existing_wine.price
-                    existing_wine.price = wine_data['price']
-                    print(f"  ↻ UPDATED: {existing_wine.name} (${old_price} → ${wine_data['price']}) [status: {existing_wine.status}]")
-                    updated_count += 1
-                else:
-                    print(f"  = UNCHANGED: {existing_wine.name} [status: {existing_wine.status}]")
-                    skipped_count += 1
-                
-                # Update availability and last_seen
-                existing_wine.is_available = True
-                existing_wine.last_seen_at = datetime.utcnow()
-                
-                # Update product URL if it changed
-                if wine_data.get('product_url'):
-                    existing_wine.product_url = wine_data['product_url']
-                
-            else:
-                # New wine - add it with 'pending' status for review
-                new_wine = Wine(
-                    winery_id=winery_id,
-                    name=wine_data['name'],
-                    variety=wine_data.get('variety'),
-                    vintage=wine_data.get('vintage'),
-                    price=wine_data.get('price'),
-                    description=wine_data.get('description'),
-                    product_url=wine_data.get('product_url'),
-                    is_available=True,
-                    status='pending',  # NEW: Requires admin review before going live
-                    first_seen_at=datetime.utcnow(),
-                    last_seen_at=datetime.utcnow()
-                )
-                db.add(new_wine)
-                print(f"  ⏳ PENDING REVIEW: {wine_data['name']} (${wine_data.get('price')}) [new wine]")
-                saved_count += 1
-                pending_count += 1
-        
-        # Mark wines as unavailable if they weren't in this scrape
-        scraped_keys = {normalize_for_comparison(w['name']) for w in scraped_wines}
-        for key, existing_wine in existing_wines_map.items():
-            if key not in scraped_keys and existing_wine.is_available:
-                existing_wine.is_available = False
-                print(f"  - REMOVED: {existing_wine.name} (no longer available) [status: {existing_wine.status}]")
-        
-        # Commit all changes
-        db.commit()
-        
-        # Update winery last_scraped_at
-        winery.last_scraped_at = datetime.utcnow()
-        db.commit()
-        
-        print()
-        print("=" * 80)
-        print("Save Summary:")
-        print(f"  New wines (pending review): {pending_count}")
-        print(f"  Wines updated:              {updated_count}")
-        print(f"  Wines unchanged:            {skipped_count}")
-        print(f"  Total wines processed:      {len(scraped_wines)}")
-        print("=" * 80)
-        
-        # Show status breakdown for this winery
-        status_counts = db.query(Wine.status, func.count(Wine.id)).filter(
-            Wine.winery_id == winery_id,
-            Wine.is_available == True
-        ).group_by(Wine.status).all()
-        
-        print(f"\nWine status for {winery.name}:")
-        for status, count in status_counts:
-            print(f"  {status.upper()}: {count}")
-        
-        if pending_count > 0:
-            print(f"\n⚠️  {pending_count} wine(s) are pending review!")
-            print(f"   Visit admin dashboard to review and approve.")
+        save_scrape_results(db, winery, scraper, scraped_wines, scrape_log)
         
     except Exception as e:
         db.rollback()
         print(f"Error: {str(e)}")
         import traceback
         traceback.print_exc()
+        
+        # Record the failed run (best effort - don't mask the original error)
+        if scrape_log is not None:
+            try:
+                scrape_log.status = 'failed'
+                scrape_log.error_message = str(e)
+                scrape_log.scrape_finished_at = datetime.utcnow()
+                db.add(scrape_log)
+                db.commit()
+            except Exception:
+                db.rollback()
         raise
     finally:
         db.close()
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python scrape_and_save.py <winery_id>")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    force = '--force' in sys.argv[1:]
+    
+    if len(args) != 1:
+        print("Usage: python scrape_and_save.py <winery_id> [--force]")
         print("\nExample: python scrape_and_save.py 4")
         print("\nNEW BEHAVIOR (Review Workflow):")
         print("  - Scrapes all wines from the winery")
@@ -188,7 +324,8 @@ if __name__ == "__main__":
         print("  - EXISTING wines keep their current status")
         print("  - Price updates preserve status")
         print("  - Review pending wines in admin dashboard before going live")
+        print("  - Unchanged listings skip product pages (--force to scrape anyway)")
         sys.exit(1)
     
-    winery_id = int(sys.argv[1])
-    scrape_and_save(winery_id)
+    winery_id = int(args[0])
+    scrape_and_save(winery_id, force=force)
@@ -0,0 +1,878 @@
+#!/usr/bin/env python3
+"""
+Offline checks of scraper and API helpers - no database, no network
+
+- Listing fingerprint: independent of display order, changes with URLs/prices
+- BrowserPool: contexts recycled after N pages or over the RSS ceiling
+- Shared browser: connect to the server's endpoint, else launch locally
+- HtmlArchive.prune: expired index entries and unreferenced objects go
+- Host latency: p99 x 1.5 timeouts within bounds, merged on save
+- NetworkStats: bytes, cache hits, refused vs failed vs aborted requests
+- detect_platform / get_strategy: generator tag, markers (not a bare
+  mention of the platform), generic fallback
+- Listing cards: which card belongs to which product URL, and which card
+  descriptions are trusted
+- expand_vintage_variants: one wine per available vintage
+- Shopify / Next.js variants: only the page's own product is read
+- CrawlFrontier: new, then volatile, then stale pages; stops at the deadline
+- identity_key: same whitespace handling as the SQL key and unique index
+- upsert_scraped_wines: one statement per batch, price_history in it,
+  updated_at set on update
+- COPY staging: CSV rows survive commas, quotes and newlines; None is NULL
+- Catalog feed: which edits and scrape results become feed entries
+- Cursor encode/decode, including a NULL sort value and bad cursors
+- CountCache: TTL expiry, LRU bound, equivalent filters share a key
+- Full-text search: prefix tsquery text, snippet source HTML-escaped
+- Fuzzy search: one UNION branch per trigram index, no OR across tables;
+  a whitespace-only query matches nothing
+- SuggestIndex: word-start prefix lookup; block-max top-k equals a full scan
+- collect_facets: GROUPING SETS rows split into the facet sections
+- canonical_variety: whole words, blends and unknown names, same patterns as
+  the variety_canonical migration; extract_variety unaffected by the alias table
+- Vintage filter: only 4 ASCII digits are read as a year
+- Live-catalog partial indexes: model, migrations and public filter agree
+
+Exits non-zero if any check fails.
+
+Usage:
+    python test_helpers.py
+"""
+import ast
+import asyncio
+import csv
+import html
+import io
+import json
+import random
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bs4 import BeautifulSoup
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.models.wine import LIVE_WINES_SQL, WINE_NAME_KEY_SQL, Wine
+from app.models.winery import Winery  # noqa: F401 - registers the Wine.winery relationship
+from app.routers.search import fuzzy_search_wines
+from app.routers.wines import live_wines_query
+from app.scrapers.browser_pool import BrowserPool
+from app.scrapers.browser_server import endpoint_url
+from app.scrapers.enhanced_scraper import EnhancedScraper
+from app.scrapers.frontier import NEW, STALE, VOLATILE, CrawlFrontier
+from app.scrapers.host_latency import DEFAULT_TIMEOUTS_MS, HostLatencyStats, host_of
+from app.scrapers.html_archive import HtmlArchive
+from app.scrapers.network_stats import NetworkStats
+from app.scrapers.platforms import GENERIC, detect_platform, get_strategy
+from app.scrapers.varieties import VARIETY_PATTERNS, canonical_variety
+from app.scrapers.variants import extract_variants
+from app.services import wine_search
+from app.services.catalog_changes import scrape_changes, wine_changes, wine_snapshot
+from app.services.count_cache import CountCache, count_key
+from app.services.facets import PRICE_BUCKETS, collect_facets
+from app.services.fuzzy_search import fuzzy_wines_query, suggestions_query
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.suggest_index import BLOCK_SIZE, SuggestIndex, normalize
+from app.services.wine_ingest import MERGE_SQL, STAGING_COLUMNS, _copy_rows
+from app.services.wine_service import identity_key, upsert_scraped_wines
+
+SHOP_URL = "https://helpers.test/shop"
+
+# BeautifulSoup's ':contains' deprecation in the generic price selectors
+warnings.simplefilter('ignore', FutureWarning)
+
+
+def scraper():
+    return EnhancedScraper(winery_id=1, winery_name="Helpers Test", shop_url=SHOP_URL,
+                           config={'platform_type': 'woocommerce'})
+
+
+class FakePage:
+    """Just enough of a Playwright page for code that only reads its HTML"""
+
+    def __init__(self, html):
+        self.html = html
+
+    async def content(self):
+        return self.html
+
+
+def check_listing_fingerprint():
+    def fingerprint(urls, prices):
+        cards = ''.join(f'<li class="product"><span class="price">${price:.2f}</span></li>' for price in prices)
+        page = FakePage(f'<ul>{cards}</ul>')
+        return asyncio.run(scraper().compute_listing_fingerprint(page, [f"{SHOP_URL}/{url}" for url in urls]))
+
+    before = fingerprint(['shiraz', 'riesling'], [45, 28])
+    return [
+        ("same URLs and prices in another order: unchanged",
+         fingerprint(['riesling', 'shiraz', 'riesling'], [28, 45]) == before),
+        ("a price change changes the fingerprint", fingerprint(['shiraz', 'riesling'], [45, 30]) != before),
+        ("a new product changes the fingerprint", fingerprint(['shiraz', 'riesling', 'merlot'], [45, 28]) != before),
+        ("a removed product changes the fingerprint", fingerprint(['shiraz'], [45, 28]) != before),
+    ]
+
+
+class FakeContext:
+    closed = False
+
+    async def new_page(self):
+        return FakePage('')
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    """Playwright browser stand-in: keeps its contexts (no Chromium)"""
+
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+
+    async def new_context(self):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    """Playwright stand-in: chromium.launch() gives a FakeBrowser, connect() one if the server is up"""
+
+    def __init__(self, server_up: bool = False):
+        self.chromium = self
+        self.server_up = server_up
+        self.launched = []
+        self.connected = []
+
+    async def connect(self, endpoint, timeout=None):
+        if not self.server_up:
+            raise ConnectionError(f"connect ECONNREFUSED {endpoint}")
+        self.connected.append(FakeBrowser())
+        return self.connected[-1]
+
+    async def launch(self, headless=True):
+        self.launched.append(FakeBrowser())
+        return self.launched[-1]
+
+
+def check_browser_pool():
+    async def run(pages, rss_mb):
+        pool = BrowserPool(max_pages_per_context=3, max_open_pages=2, max_rss_mb=1000, endpoint='')
+        pool._playwright = playwright = FakePlaywright()
+        pool.sample_memory = lambda: rss_mb
+        await pool._launch_browser()
+        for _ in range(pages):
+            async with pool.page():
+                pass
+        return pool, playwright.launched
+
+    recycled, recycled_browsers = asyncio.run(run(7, 100))
+    heavy, heavy_browsers = asyncio.run(run(2, 5000))
+    return [
+        ("a context is recycled after max_pages_per_context pages",
+         recycled.metrics['contexts_created'] == 3 and recycled.metrics['contexts_recycled'] == 2),
+        ("recycled contexts are closed", [c.closed for c in recycled_browsers[0].contexts] == [True, True, False]),
+        ("over the RSS ceiling every page's context is retired",
+         heavy.metrics['contexts_recycled'] == 2 and heavy.metrics['browser_restarts'] == 2),
+        ("...and the browser restarted", len(heavy_browsers) == 3
+         and all(browser.closed for browser in heavy_browsers[:2])),
+    ]
+
+
+def check_shared_browser():
+    endpoint = endpoint_url('127.0.0.1', 3789)
+
+    async def launch(server_up):
+        pool = BrowserPool(endpoint=endpoint)
+        pool._playwright = playwright = FakePlaywright(server_up)
+        await pool._launch_browser()
+        return pool, playwright
+
+    shared, shared_playwright = asyncio.run(launch(True))
+    fallback, fallback_playwright = asyncio.run(launch(False))
+    return [
+        ("endpoint is a fixed ws:// URL", endpoint == "ws://127.0.0.1:3789/cbr-wine-hunter"),
+        ("server up: connects instead of launching", shared.connected_remote
+         and len(shared_playwright.connected) == 1 and not shared_playwright.launched),
+        ("server down: launches a local browser", not fallback.connected_remote
+         and len(fallback_playwright.launched) == 1),
+    ]
+
+
+def check_archive_prune():
+    with tempfile.TemporaryDirectory() as root:
+        archive = HtmlArchive(root)
+        kept = archive.store(1, f"{SHOP_URL}/kept", "<html>kept</html>")
+        archive.store(1, f"{SHOP_URL}/shared-old", "<html>shared</html>")
+        archive.store(2, f"{SHOP_URL}/shared-new", "<html>shared</html>")
+        expired = archive.store(2, f"{SHOP_URL}/expired", "<html>expired</html>")
+
+        # Age two entries past the retention window
+        long_ago = (datetime.utcnow() - timedelta(days=400)).isoformat(timespec='seconds')
+        for winery_id, url in [(1, f"{SHOP_URL}/shared-old"), (2, f"{SHOP_URL}/expired")]:
+            index_path = Path(root) / 'index' / f"{winery_id}.json"
+            index = json.loads(index_path.read_text())
+            index[url]['fetched_at'] = long_ago
+            index_path.write_text(json.dumps(index))
+
+        result = HtmlArchive(root).prune(retention_days=30)
+        after = HtmlArchive(root)
+        urls = {url for winery_id in after.winery_ids() for url, _, _ in after.entries(winery_id)}
+        return [
+            ("prune drops entries older than the retention window", result['removed_entries'] == 2
+             and urls == {f"{SHOP_URL}/kept", f"{SHOP_URL}/shared-new"}),
+            ("prune deletes only objects nothing points to", result['removed_objects'] == 1
+             and not after._object_path(expired).exists()),
+            ("an object still referenced by another winery is kept", after.load(
+                next(digest for _, digest, _ in after.entries(2))) == "<html>shared</html>"),
+            ("untouched pages still load", after.load(kept) == "<html>kept</html>"),
+        ]
+
+
+def check_host_latency():
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / 'latency.json'
+        stats = HostLatencyStats(str(path), min_timeout_ms=5000, max_timeout_ms=60000)
+        url = "https://www.fast.test/shop"
+        for elapsed_ms in [1000, 1200, 900, 1100]:
+            stats.record(url, 'product', elapsed_ms)
+        few_samples = stats.timeout_ms(url, 'product')
+        stats.record(url, 'product', 8000)
+        learned = stats.timeout_ms(url, 'product')
+        for _ in range(5):
+            stats.record("https://slow.test/", 'listing', 90000)
+        capped = stats.timeout_ms("https://slow.test/", 'listing')
+
+        # Another process saved its own samples in the meantime
+        other = HostLatencyStats(str(path))
+        other.record("https://other.test/", 'product', 2000)
+        other.save()
+        stats.save()
+        merged = json.loads(path.read_text())
+    return [
+        ("hosts keyed without www.", host_of(url) == 'fast.test'),
+        ("fewer than MIN_SAMPLES: the fixed default", few_samples == DEFAULT_TIMEOUTS_MS['product']),
+        ("then p99 x 1.5 of the host's samples", learned == 12000),
+        ("clamped to the maximum", capped == 60000),
+        ("save() merges with samples other processes saved",
+         set(merged) == {'fast.test', 'slow.test', 'other.test'}),
+    ]
+
+
+class FakeRequest:
+    """Playwright request stand-in with a response status and sizes"""
+
+    def __init__(self, status=200, body=1000, failure=None, from_service_worker=False):
+        self.url = f"{SHOP_URL}/asset"
+        self.failure = failure
+        self.status = status
+        self.body = body
+        self.from_service_worker = from_service_worker
+
+    async def response(self):
+        return self
+
+    async def sizes(self):
+        return {'responseHeadersSize': 100, 'responseBodySize': self.body}
+
+
+def check_network_stats():
+    async def load(requests):
+        stats = NetworkStats()
+        for request in requests:
+            stats._on_request(request)
+            if request.failure:
+                stats._on_request_failed(request)
+            else:
+                stats._on_request_finished(request)
+        await stats.settle()
+        return stats
+
+    page = asyncio.run(load([
+        FakeRequest(),
+        FakeRequest(status=304, body=0),
+        FakeRequest(from_service_worker=True),
+        FakeRequest(status=403, body=200),
+        FakeRequest(status=404, body=200),
+        FakeRequest(failure='net::ERR_BLOCKED_BY_RESPONSE'),
+        FakeRequest(failure='net::ERR_NAME_NOT_RESOLVED'),
+        FakeRequest(failure='net::ERR_ABORTED'),
+    ]))
+    total = NetworkStats()
+    total.merge(page)
+    total.merge(page)
+    return [
+        ("every request counted", page.requests == 8),
+        ("header + body bytes of finished requests", page.bytes == 5 * 100 + 1000 + 0 + 1000 + 200 + 200),
+        ("304s and service worker responses are cache hits", page.cache_hits == 2),
+        ("403 and ERR_BLOCKED_BY_RESPONSE are blocked (a 404 isn't)", page.blocked == 2),
+        ("other failures are failed, ERR_ABORTED is neither", page.failed == 1),
+        ("merge adds the counters", total.as_dict() == {k: 2 * v for k, v in page.as_dict().items()}),
+    ]
+
+
+def check_platforms():
+    shopify_page = '<html><script src="https://cdn.shopify.com/s/theme.js"></script></html>'
+    # A WooCommerce shop that links to a Shopify-hosted gift card page
+    woo_generator = ('<html><meta name="generator" content="WooCommerce 8.5">'
+                     '<a href="https://gifts.myshopify.com/">Gift cards</a></html>')
+    product = BeautifulSoup('<h1 class="product__title">Reserve Shiraz</h1>'
+                            '<meta property="og:price:amount" content="45.00">', 'html.parser')
+    shopify = get_strategy('shopify')
+    return [
+        ("asset host marker -> shopify", detect_platform(shopify_page, SHOP_URL) == 'shopify'),
+        ("the generator tag wins over other markers", detect_platform(woo_generator, SHOP_URL) == 'woocommerce'),
+        ("shop domain in the URL -> square", detect_platform('<html></html>', 'https://cellar.square.site/') == 'square'),
+        ("nothing recognised -> generic", detect_platform('<html><p>Wines</p></html>', SHOP_URL) == GENERIC),
+        ("a page that only mentions GoDaddy (footer) -> generic",
+         detect_platform('<html><footer>Domain by GoDaddy</footer></html>', SHOP_URL) == GENERIC),
+        ("GoDaddy builder markup -> godaddy",
+         detect_platform('<html><div data-aid="PRODUCT_NAME_RENDERED">Shiraz</div></html>', SHOP_URL) == 'godaddy'),
+        ("unknown or missing platform_type -> generic strategy",
+         get_strategy('nope').platform_type == GENERIC and get_strategy(None).platform_type == GENERIC),
+        ("strategy selectors read text and meta content",
+         shopify.extract_name(product) == 'Reserve Shiraz' and shopify.extract_price_text(product) == '45.00'),
+    ]
+
+
+LISTING_HTML = f"""
+<div class="products-grid">
+  <li class="product">
+    <a href="/shop/reserve-shiraz?ref=grid"><img src="x.jpg"></a>
+    <h2><a href="{SHOP_URL}/reserve-shiraz">Reserve Shiraz 2021</a></h2>
+    <span class="price">$45.00</span>
+  </li>
+  <li class="product">
+    <a href="{SHOP_URL}/riesling#reviews"><h2>Estate Riesling 2023</h2></a>
+    <span class="price">$28.00</span>
+  </li>
+  <li class="product">
+    <a href="{SHOP_URL}/merlot"><h2>Hilltop Merlot 2022</h2></a>
+    <span class="price">$32.00</span>
+    <p>Free shipping on 6+ bottles</p>
+  </li>
+  <li class="product">
+    <a href="{SHOP_URL}/pinot"><h2>Cool Climate Pinot Noir 2022</h2></a>
+    <span class="price">$38.00</span>
+    <div class="product-description">Bright cherry fruit, fine tannins and a long savoury finish.</div>
+  </li>
+  <li class="product">
+    <a href="{SHOP_URL}/not-wanted"><h2>Gift Voucher</h2></a>
+    <span class="price">$50.00</span>
+  </li>
+</div>
+"""
+
+
+def check_listing_cards():
+    wanted = [f"{SHOP_URL}/reserve-shiraz", f"{SHOP_URL}/riesling", f"{SHOP_URL}/merlot", f"{SHOP_URL}/pinot"]
+    hybrid = scraper()
+    hybrid.listing_cards = cards = hybrid.extract_listing_cards(LISTING_HTML, wanted)
+    known = {'name': 'Reserve Shiraz', 'price': 45}
+    return [
+        ("one card per wanted product URL (grid wrapper ignored)", sorted(cards) == sorted(wanted)),
+        ("links with query strings / anchors map to the product URL",
+         cards.get(f"{SHOP_URL}/riesling", {}).get('product_url') == f"{SHOP_URL}/riesling"),
+        ("card name and price are read", cards.get(f"{SHOP_URL}/reserve-shiraz", {}).get('price') == 45.0),
+        ("card matches the known wine on name words and price",
+         EnhancedScraper.card_matches_known({'name': 'Reserve Shiraz 2021', 'price': 45.0}, known)),
+        ("a changed price doesn't match the known wine",
+         not EnhancedScraper.card_matches_known({'name': 'Reserve Shiraz 2021', 'price': 49.0}, known)),
+        ("shipping text in a card <p> is not a description",
+         cards.get(f"{SHOP_URL}/merlot", {}).get('description') is None),
+        ("a new wine without a real card description needs its product page",
+         hybrid.wine_from_listing_card(f"{SHOP_URL}/merlot") is None),
+        ("a new wine with a card description is taken from the card",
+         (hybrid.wine_from_listing_card(f"{SHOP_URL}/pinot") or {}).get('name') == 'Cool Climate Pinot Noir'),
+    ]
+
+
+def check_vintage_variants():
+    wine = {'name': 'Wimbaliri Shiraz 2021', 'vintage': '2021', 'price': 40.0,
+            'product_url': f"{SHOP_URL}/wimbaliri-shiraz"}
+    variants = [
+        {'label': '2019', 'price': 55.0, 'available': True},
+        {'label': '2021 Vintage', 'price': None, 'available': True},
+        {'label': '2022', 'price': 42.0, 'available': False},
+        {'label': '6 Pack', 'price': 210.0, 'available': True},
+    ]
+    wines = scraper().expand_vintage_variants(wine, variants)
+    by_vintage = {w['vintage']: w for w in wines}
+    single = scraper().expand_vintage_variants(wine, [{'label': '750ml'}, {'label': '2021'}])
+    sizes = {w['vintage']: w['price'] for w in scraper().expand_vintage_variants(wine, [
+        {'label': '2019 / 750ml', 'price': 55.0, 'available': False},
+        {'label': '2019 / Magnum 1.5L', 'price': 120.0, 'available': True},
+        {'label': '2021 / Magnum 1.5L', 'price': 95.0, 'available': True},
+        {'label': '2021 / 750ml', 'price': 42.0, 'available': True},
+    ])}
+    return [
+        ("one wine per available vintage (sold-out and 6-pack left out)", sorted(by_vintage) == ['2019', '2021']),
+        ("vintage removed from the shared name", {w['name'] for w in wines} == {'Wimbaliri Shiraz'}),
+        ("variant price, else the page price", by_vintage.get('2019', {}).get('price') == 55.0
+         and by_vintage.get('2021', {}).get('price') == 40.0),
+        ("fewer than two vintages: the page's wine as is", single == [wine]),
+        ("a vintage listed twice keeps its available variant", sizes.get('2019') == 120.0),
+        ("...and prefers the 750ml bottle over a magnum", sizes.get('2021') == 42.0),
+    ]
+
+
+def check_shopify_product():
+    url = "https://helpers.test/collections/red/products/reserve-shiraz?variant=1"
+    own = {'handle': 'reserve-shiraz', 'variants': [{'title': '2019', 'price': 4500},
+                                                    {'title': '2021', 'price': 4800}]}
+    upsell = {'handle': 'gift-box', 'variants': [{'title': '6 Pack', 'price': 21000}]}
+
+    def page(*scripts):
+        return '<html>' + ''.join(f'<script {attrs}>{json.dumps(data)}</script>' for attrs, data in scripts) + '</html>'
+
+    def labels(html, page_url=url):
+        return [variant['label'] for variant in extract_variants(html, page_url)]
+
+    return [
+        ("data-product-json is the page's product", labels(page(
+            ('type="application/json"', {'product': upsell}),
+            ('type="application/json" data-product-json', own))) == ['2019', '2021']),
+        ("another product's JSON (upsell) is ignored", labels(page(('type="application/json"', {'product': upsell}))) == []),
+        ("other JSON with the URL's handle is read", labels(page(('type="application/json"', own))) == ['2019', '2021']),
+        ("without a URL only data-product-json counts", labels(page(('type="application/json"', own)), None) == []),
+    ]
+
+
+def check_next_data_product():
+    url = "https://helpers.test/wines/reserve-shiraz"
+    own = {'slug': 'reserve-shiraz', 'variants': [{'title': '2019', 'price': '45.00'},
+                                                 {'title': '2021', 'price': '48.00'}]}
+    # Longer than the page's own list - the old "longest variants list" pick
+    upsell = {'slug': 'mixed-dozen', 'variants': [{'title': f'Bottle {n}', 'price': '30.00'} for n in range(6)]}
+
+    def labels(page_props, page_url=url):
+        html = (f'<html><script id="__NEXT_DATA__" type="application/json">'
+                f'{json.dumps({"props": {"pageProps": page_props}})}</script></html>')
+        return [variant['label'] for variant in extract_variants(html, page_url)]
+
+    return [
+        ("pageProps.product is the page's product",
+         labels({'product': own, 'related': [upsell]}) == ['2019', '2021']),
+        ("elsewhere in the props, the product with the URL's slug",
+         labels({'data': {'wine': own}, 'related': [upsell]}) == ['2019', '2021']),
+        ("other products' variants (upsell) are ignored", labels({'related': [upsell]}) == []),
+        ("without a URL only pageProps.product counts", labels({'data': {'wine': own}}, None) == []),
+    ]
+
+
+def check_frontier():
+    frontier = CrawlFrontier()
+    frontier.push(1, 'stale-old', STALE, sort_key=100)
+    frontier.push(2, 'volatile-1', VOLATILE, sort_key=-1)
+    frontier.push(1, 'new-a', NEW)
+    frontier.push(2, 'stale-older', STALE, sort_key=50)
+    frontier.push(1, 'volatile-3', VOLATILE, sort_key=-3)
+    frontier.push(2, 'new-b', NEW)
+    order = [frontier.pop()[1] for _ in range(4)]
+    left = frontier.remaining()
+
+    expired = CrawlFrontier(deadline_seconds=1)
+    expired.deadline -= 2
+    expired.push(3, 'new-c', NEW)
+    return [
+        ("new pages first (FIFO), then most-changed volatile pages",
+         order == ['new-a', 'new-b', 'volatile-3', 'volatile-1']),
+        ("pages handed out are counted per tier", dict(frontier.popped) == {'new': 2, 'volatile': 2}),
+        ("remaining() returns the rest per winery, oldest stale first",
+         left == {2: ['stale-older'], 1: ['stale-old']} and len(frontier) == 0),
+        ("past the deadline nothing is handed out", expired.pop() is None and expired.time_left() == 0.0),
+        ("...and the page is deferred", expired.remaining() == {3: ['new-c']}),
+    ]
+
+
+class RecordingSession:
+    """Session stand-in that records the statements it is asked to run (returns no rows)"""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, *args):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return []
+
+
+def check_identity_key():
+    def key(name):
+        return identity_key({'name': name, 'vintage': None})[0]
+
+    migrations = ''.join(path.read_text() for path in (Path(__file__).parent / 'alembic' / 'versions').glob('*.py'))
+    return [
+        ("case and inner whitespace runs are normalized", key("Reserve  SHIRAZ\t2021") == 'reserve shiraz 2021'),
+        ("leading / trailing tabs and newlines are trimmed (collapse, then btrim)",
+         key("\tReserve Shiraz\n") == 'reserve shiraz'),
+        ("NBSP is not collapsed (the SQL whitespace class doesn't have it)", key("Reserve\xa0Shiraz") == 'reserve\xa0shiraz'),
+        ("uq_wines_identity is created with the model's name key",
+         WINE_NAME_KEY_SQL.replace('\\', '\\\\') in migrations),
+    ]
+
+
+def check_upsert_statement():
+    db = RecordingSession()
+    wines = [{'name': f'Shiraz No.{i}', 'vintage': '2021', 'price': 30.0 + i, 'product_url': f"{SHOP_URL}/{i}"}
+             for i in range(3)]
+    upsert_scraped_wines(db, 1, wines)
+    sql = db.statements[-1] if db.statements else ''
+    return [
+        ("vintaged wines need no stored-vintage lookup: one statement", len(db.statements) == 1),
+        ("the upsert is on the wine identity key", 'ON CONFLICT (winery_id, lower(' in sql),
+        ("price_history rows are written by the same statement", 'INSERT INTO price_history' in sql),
+        ("...only for new wines and changed prices",
+         'saved.inserted OR saved.price IS DISTINCT FROM before.price' in sql),
+        # Column onupdate doesn't fire for ON CONFLICT DO UPDATE
+        ("an update sets updated_at (here and in the COPY merge)",
+         'updated_at = now()' in sql and 'updated_at = now()' in MERGE_SQL),
+    ]
+
+
+class CopyCursor:
+    """DBAPI cursor stand-in that keeps what COPY was sent"""
+
+    sql = copied = None
+
+    def copy_expert(self, sql, buffer):
+        self.sql, self.copied = sql, buffer.read()
+
+    def close(self):
+        pass
+
+
+def check_copy_rows():
+    cursor = CopyCursor()
+    # session.connection().connection is the DBAPI connection
+    db = SimpleNamespace(connection=lambda: SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor)))
+    wine = {'winery_id': 1, 'name': 'Shiraz, "Old Vine"', 'variety': None, 'vintage': '2021',
+            'price': 45.5, 'description': 'Line one\nline two', 'product_url': f"{SHOP_URL}/shiraz"}
+    _copy_rows(db, 'staging_x', [wine])
+    rows = list(csv.reader(io.StringIO(cursor.copied or '')))
+    return [
+        ("COPY lists the staging columns in order",
+         cursor.sql == f"COPY staging_x ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"),
+        ("one CSV row per wine, values round-trip", len(rows) == 1
+         and rows[0][1] == wine['name'] and rows[0][5] == wine['description']),
+        ("None is an empty (NULL) field", rows[0][2] == '' if rows else False),
+    ]
+
+
+def check_catalog_changes():
+    wine = Wine(id=7, winery_id=1, name='Reserve Shiraz', price=45, is_available=True, status='pending')
+    created = wine_changes(wine, None)
+    before = wine_snapshot(wine)
+    wine.price, wine.status, wine.name = 45.0, 'live', 'Reserve Shiraz (Magnum)'
+    edited = wine_changes(wine, before)
+
+    saved = [
+        {'id': 1, 'inserted': True, 'status': 'pending', 'price': 30.0,
+         'old_price': None, 'old_available': None, 'old_status': None},
+        {'id': 2, 'inserted': False, 'status': 'live', 'price': 32.0,
+         'old_price': 30.0, 'old_available': False, 'old_status': 'live'},
+        {'id': 3, 'inserted': False, 'status': 'live', 'price': 40.0,
+         'old_price': 40.0, 'old_available': True, 'old_status': 'live'},
+    ]
+    scraped = [(c['wine_id'], c['change_type'], c['old_value'], c['new_value'])
+               for c in scrape_changes(1, saved, [{'id': 4}])]
+    return [
+        ("a created wine is one 'new' entry", [(c['change_type'], c['new_value']) for c in created] == [('new', 'pending')]),
+        ("only tracked fields changing make entries (45 -> 45.0 and renames don't)",
+         [(c['change_type'], c['old_value'], c['new_value']) for c in edited] == [('status', 'pending', 'live')]),
+        ("scrape: new wine, price change, back in stock, gone - unchanged wines are left out", scraped == [
+            (1, 'new', None, 'pending'),
+            (2, 'price', '30.00', '32.00'),
+            (2, 'availability', 'false', 'true'),
+            (4, 'availability', 'true', 'false'),
+        ]),
+    ]
+
+
+def check_cursors():
+    created = datetime(2026, 10, 19, 12, 30, 5)
+
+    def rejected(cursor):
+        try:
+            decode_cursor(cursor)
+        except HTTPException as e:
+            return e.status_code == 400
+        return False
+
+    return [
+        ("name cursor round-trips", decode_cursor(encode_cursor("Rosé d'Été", 42)) == ("Rosé d'Été", 42)),
+        ("datetime cursor round-trips", decode_cursor(encode_cursor(created, 7), datetime_key=True) == (created, 7)),
+        ("NULL sort value round-trips", decode_cursor(encode_cursor(None, 9), datetime_key=True) == (None, 9)),
+        ("cursor is URL-safe without padding", '=' not in encode_cursor("a?b/c", 1)),
+        ("garbage cursor -> 400", rejected("not a cursor!")),
+        ("non-integer id -> 400", rejected(encode_cursor("Shiraz", "7"))),
+    ]
+
+
+def check_count_cache():
+    clock = [1000.0]
+    with mock.patch('app.services.count_cache.time.monotonic', lambda: clock[0]):
+        cache = CountCache(ttl_seconds=60, max_entries=2)
+        cache.set('all', 511)
+        clock[0] += 59
+        fresh = cache.get('all')
+        clock[0] += 2
+        expired = cache.get('all')
+
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        lru = (cache.get('a'), cache.get('b'), cache.get('c'))
+
+        disabled = CountCache(ttl_seconds=0)
+        disabled.set('all', 511)
+    return [
+        ("a total is reused within the TTL", fresh == 511),
+        ("and counted again after it", expired is None),
+        ("least recently used entry dropped past max_entries", lru == (1, None, 3)),
+        ("TTL 0 never caches", disabled.get('all') is None),
+        ("unset filters are dropped and search is case-insensitive",
+         count_key(search='Shiraz', variety=None, min_price=20) == count_key(min_price=20, search='shiraz', winery_id=None)),
+        ("different filters get different keys", count_key(min_price=20) != count_key(max_price=20)),
+    ]
+
+
+def check_fulltext():
+    compiled = wine_search.snippet(wine_search.prefix_tsquery('pinot')).compile(dialect=postgresql.dialect())
+    # Innermost replace() first
+    replaces = [compiled.params[f'replace_{i}'] for i in range(1, 2 * len(wine_search.HTML_ESCAPES) + 1)]
+    description = "<img src=x onerror=\"alert(1)\"> Tom & Jerry's Shiraz"
+    escaped = description
+    for char, entity in wine_search.HTML_ESCAPES:
+        escaped = escaped.replace(char, entity)
+    return [
+        ("every word becomes a prefix term", wine_search.prefix_query_text('Pinot  gri') == 'pinot:* & gri:*'),
+        ("tsquery operators in the search text are dropped",
+         wine_search.prefix_query_text("shiraz & !merlot | (rosé)") == 'shiraz:* & merlot:* & rosé:*'),
+        ("nothing to search for -> None", wine_search.prefix_query_text(' &! ') is None
+         and wine_search.prefix_tsquery('--') is None),
+        ("the replaces escape like html.escape ('&' first, no double escaping)",
+         escaped == html.escape(description)),
+        ("ts_headline runs on the escaped description",
+         str(compiled).startswith("ts_headline(%(ts_headline_1)s, replace(")
+         and replaces == [value for pair in wine_search.HTML_ESCAPES for value in pair]),
+    ]
+
+
+def check_fuzzy_queries():
+    # psycopg2 paramstyle doubles the % of the trigram operators
+    fuzzy_sql = str(fuzzy_wines_query('shiras vio').compile(dialect=postgresql.dialect())).replace('%%', '%')
+    suggest_sql = str(suggestions_query('shiras').compile(dialect=postgresql.dialect()))
+    return [
+        ("three branches UNIONed (one per trigram index)", fuzzy_sql.count(' UNION ') == 2),
+        ("names and winery names by word similarity, variety by similarity",
+         fuzzy_sql.count('wines.name %>') == 1 and fuzzy_sql.count('wineries.name %>') == 1
+         and 'wines.variety %' in fuzzy_sql),
+        ("no OR of the conditions (it would scan every live wine)", ' OR ' not in fuzzy_sql),
+        ("suggestions: distinct terms, best score first",
+         'GROUP BY anon_1.term' in suggest_sql and 'ORDER BY max(anon_1.score) DESC' in suggest_sql),
+        # No session: these must return before any query
+        ("whitespace-only q finds nothing (not every live wine)",
+         asyncio.run(fuzzy_search_wines(q='   ', limit=20, db=None))['wines'] == []),
+        ("...nor does a single character padded past min_length",
+         asyncio.run(fuzzy_search_wines(q=' a ', limit=20, db=None))['wines'] == []),
+    ]
+
+
+def check_suggest_index():
+    index = SuggestIndex([
+        ('Pinot Noir', 'variety', 40),
+        ('Pinot Gris', 'variety', 12),
+        ('Grüner Veltliner', 'variety', 5),
+        ('Lark Hill', 'winery', 30),
+        ('Hilltops Shiraz 2021', 'wine', 3),
+        ('pinot noir', 'variety', 99),  # same key and kind as 'Pinot Noir': kept once
+    ])
+
+    def texts(query, limit=8):
+        return [s['text'] for s in index.suggest(query, limit)]
+
+    # Block skipping must not change the answer: compare with ranking every match
+    rng = random.Random(7)
+    words = ['reserve', 'estate', 'block', 'shiraz', 'riesling', 'rosé', 'sparkling', 'hill']
+    terms = [(f"{rng.choice(words)} {rng.choice(words)} no {i}", 'wine', rng.randint(1, 50))
+             for i in range(BLOCK_SIZE * 20)]
+    big = SuggestIndex(terms)
+
+    def matches(text, prefix):
+        key_words = normalize(text).split()
+        return any(' '.join(key_words[i:]).startswith(normalize(prefix)) for i in range(len(key_words)))
+
+    agree = True
+    for prefix in ['r', 're', 'shiraz', 'no 1', 'hill', 'rose', 'zzz']:
+        full_scan = sorted((p for text, _, p in terms if matches(text, prefix)), reverse=True)[:10]
+        agree &= [s['count'] for s in big.suggest(prefix, 10)] == full_scan
+    return [
+        ("prefix of the first word", texts('pin') == ['Pinot Noir', 'Pinot Gris']),
+        ("prefix of a later word", texts('noi') == ['Pinot Noir'] and texts('hill') == ['Lark Hill', 'Hilltops Shiraz 2021']),
+        ("case- and accent-insensitive", texts('GRUN') == ['Grüner Veltliner']),
+        ("most popular first, limited", texts('p', 1) == ['Pinot Noir']),
+        ("duplicate terms kept once", len(index) == 5),
+        ("no match / empty query -> []", texts('zz') == [] and texts('  ') == []),
+        ("block-max top-k equals ranking every match", agree),
+    ]
+
+
+def check_facets():
+    def row(count, variety=None, vintage=None, winery_id=None, winery_name=None, bucket=None, grouped=()):
+        # GROUPING() flag is 0 for the columns the row's set groups by
+        flags = {flag: int(flag not in grouped) for flag in ('g_variety', 'g_vintage', 'g_winery', 'g_bucket')}
+        return SimpleNamespace(count=count, variety=variety, vintage=vintage, winery_id=winery_id,
+                               winery_name=winery_name, bucket=bucket, **flags)
+
+    facets = collect_facets([
+        row(7, variety='Shiraz', grouped={'g_variety'}),
+        row(2, variety=None, grouped={'g_variety'}),
+        row(3, variety='Riesling', grouped={'g_variety'}),
+        row(4, vintage='2019', grouped={'g_vintage'}),
+        row(6, vintage='2021', grouped={'g_vintage'}),
+        row(10, winery_id=2, winery_name='Lark Hill', grouped={'g_winery'}),
+        row(5, bucket=2, grouped={'g_bucket'}),
+        row(1, bucket=None, grouped={'g_bucket'}),
+        row(12),
+    ])
+    return [
+        ("grand total from the () set", facets['total'] == 12),
+        ("varieties by name, no-variety group left out",
+         facets['varieties'] == [{'name': 'Riesling', 'count': 3}, {'name': 'Shiraz', 'count': 7}]),
+        ("vintages newest first", [v['year'] for v in facets['vintages']] == ['2021', '2019']),
+        ("wineries with id and name", facets['wineries'] == [{'id': 2, 'name': 'Lark Hill', 'count': 10}]),
+        ("every price bucket listed, empty ones as 0",
+         [b['count'] for b in facets['price_buckets']] == [0, 0, 5] + [0] * (len(PRICE_BUCKETS) - 3)),
+        ("bucket labels", [b['label'] for b in facets['price_buckets']][:2] == ['Under $20', '$20-$30']),
+    ]
+
+
+VARIETY_CASES = [
+    ('syrah', 'Shiraz'),
+    ('  Canberra District Shiraz ', 'Shiraz'),
+    ('Sauv Blanc', 'Sauvignon Blanc'),
+    ('ROSÉ', 'Rosé'),
+    ('Cabernet', 'Cabernet Sauvignon'),
+    ('Cabernet Franc', 'Cabernet Franc'),
+    ('Primrose', 'Primrose'),
+    ('Shiraz Viognier', 'Shiraz Viognier'),
+    ('Cabernet Merlot', 'Cabernet Merlot'),
+    ('Pinot Noir Rosé', 'Pinot Noir Rosé'),
+    ('GSM', 'GSM'),
+    ('red blend', 'red blend'),
+    ('', None),
+    ('   ', None),
+    (None, None),
+]
+
+
+def check_varieties():
+    migration = next((Path(__file__).parent / 'alembic' / 'versions').glob('*_f3b8d1c7a420_*.py')).read_text()
+    patterns = next(ast.literal_eval(node.value) for node in ast.parse(migration).body
+                    if isinstance(node, ast.Assign) and node.targets[0].id == 'PATTERNS')
+    return [
+        ("the migration adding variety_canonical uses the current whole-word patterns",
+         patterns == VARIETY_PATTERNS),
+    ] + [
+        (f"canonical_variety({text!r}) -> {expected!r}", canonical_variety(text) == expected)
+        for text, expected in VARIETY_CASES
+    ] + [
+        # The alias table is for the canonical column only - scraped varieties are as before
+        (f"extract_variety({text!r}) -> {expected!r}", scraper().extract_variety(text) == expected)
+        for text, expected in [('2021 Cabernet', None), ('Blanc de Blancs', 'Blanc De Blanc'),
+                               ('Canberra Syrah', 'Syrah')]
+    ]
+
+
+def check_vintage_filter():
+    def filtered_on(vintage):
+        return str(live_wines_query(vintage=vintage).whereclause)
+
+    return [
+        ("4-digit vintage filters on vintage_year", 'vintage_year' in filtered_on(' 2021 ')),
+        ("NV filters on is_non_vintage", 'is_non_vintage' in filtered_on('nv')),
+        ("a Unicode digit ('²') is compared as text, not int()", 'wines.vintage =' in filtered_on('²')),
+        ("an over-long number is compared as text", 'wines.vintage =' in filtered_on('12345678901')),
+    ]
+
+
+def check_live_indexes():
+    live_indexes = sorted((index for index in Wine.__table__.indexes if index.name.startswith('ix_wines_live_')),
+                          key=lambda index: index.name)
+    migrations = ''.join(path.read_text() for path in (Path(__file__).parent / 'alembic' / 'versions').glob('*.py'))
+    where = str(live_wines_query().whereclause.compile(dialect=postgresql.dialect()))
+    return [
+        ("the public list, winery, variety and price indexes are partial on the live catalog",
+         [index.name for index in live_indexes] == ['ix_wines_live_name_id', 'ix_wines_live_price_id',
+                                                    'ix_wines_live_variety_name_id', 'ix_wines_live_winery_name_id']
+         and all(f"WHERE {LIVE_WINES_SQL}" in str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+                 for index in live_indexes)),
+        ("every one is created by a migration with the same predicate",
+         all(f"CREATE INDEX {index.name} ON wines" in migrations for index in live_indexes)
+         and f'LIVE = "WHERE {LIVE_WINES_SQL}"' in migrations),
+        ("public queries filter on exactly that predicate (so the planner can use them)",
+         where == "wines.is_available = true AND wines.status = %(status_1)s"
+         and live_wines_query().whereclause.compile().params['status_1'] == 'live'),
+    ]
+
+
+CHECKS = [
+    ("Listing fingerprint", check_listing_fingerprint),
+    ("Browser pool recycling", check_browser_pool),
+    ("Shared browser server", check_shared_browser),
+    ("HTML archive prune", check_archive_prune),
+    ("Adaptive timeouts", check_host_latency),
+    ("Network cost accounting", check_network_stats),
+    ("Platform detection", check_platforms),
+    ("Listing cards", check_listing_cards),
+    ("Vintage variants", check_vintage_variants),
+    ("Shopify product JSON", check_shopify_product),
+    ("Next.js product data", check_next_data_product),
+    ("Crawl frontier", check_frontier),
+    ("Wine identity key", check_identity_key),
+    ("Upsert with price history", check_upsert_statement),
+    ("COPY staging rows", check_copy_rows),
+    ("Catalog change feed", check_catalog_changes),
+    ("Pagination cursors", check_cursors),
+    ("Count cache", check_count_cache),
+    ("Full-text search", check_fulltext),
+    ("Fuzzy search queries", check_fuzzy_queries),
+    ("Suggest index", check_suggest_index),
+    ("Facet rows", check_facets),
+    ("Canonical varieties", check_varieties),
+    ("Vintage filter", check_vintage_filter),
+    ("Live-catalog indexes", check_live_indexes),
+]
+
+
+def run_checks():
+    print("=" * 80)
+    print("HELPER CHECKS - scraper and API helpers, offline")
+    print("=" * 80)
+
+    failures = 0
+    for title, check in CHECKS:
+        print(f"{title}:")
+        for label, ok in check():
+            failures += not ok
+            print(f"  {'✓' if ok else '✗'} {label}")
+
+    print("=" * 80)
+    print("All checks passed" if not failures else f"{failures} check(s) failed")
+    print("=" * 80)
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_checks() else 1)
@@ -1,6 +1,5 @@
 import { useState, useEffect } from 'react';
-import { getWines, getVarieties, getVintages } from '../services/wineService';
-import { getWineries } from '../services/wineryService';
+import { getWines, getFacets, getSuggestions } from '../services/wineService';
 import WineCard from '../components/WineCard';
 
 export default function WinesPage() {
@@ -8,11 +7,16 @@ export default function WinesPage() {
   const [wineries, setWineries] = useState([]);
   const [varieties, setVarieties] = useState([]);
   const [vintages, setVintages] = useState([]);
+  // Wines per variety / vintage / winery under the current filters
+  const [facetCounts, setFacetCounts] = useState(null);
   const [loading, setLoading] = useState(true);
   const [totalWines, setTotalWines] = useState(0);
 
   // Filter states
   const [searchTerm, setSearchTerm] = useState('');
+  // What's typed: autocompletes after a short pause, searches once typing pauses
+  const [searchInput, setSearchInput] = useState('');
+  const [suggestions, setSuggestions] = useState([]);
   const [selectedVariety, setSelectedVariety] = useState('');
   const [selectedVintage, setSelectedVintage] = useState('');
   const [selectedWinery, setSelectedWinery] = useState('');
@@ -21,51 +25,108 @@ export default function WinesPage() {
 
   // Pagination states
   const [limit, setLimit] = useState(100);
-  const [offset, setOffset] = useState(0);
+  // Keyset pagination: cursor of every page visited so far (first page has none)
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const offset = (cursors.length - 1) * limit;
   const [showAll, setShowAll] = useState(false);
 
+  // Suggestions once typing pauses briefly. Each keystroke aborts the previous
+  // request, so a slow older response can't overwrite newer suggestions.
   useEffect(() => {
-    loadData();
-  }, []);
+    const term = searchInput.trim();
+    if (term.length < 2) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      getSuggestions(term, 8, controller.signal)
+        .then((data) => {
+          if (!controller.signal.aborted) setSuggestions(data.suggestions || []);
+        })
+        .catch(() => {
+          if (!controller.signal.aborted) setSuggestions([]);
+        });
+    }, 120);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [searchInput]);
+
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      if (searchInput !== searchTerm) {
+        setSearchTerm(searchInput);
+        handleResetPagination();
+      }
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchInput]);
+
+  useEffect(() => {
+    loadFacets();
+  }, [searchTerm, selectedVariety, selectedVintage, selectedWinery, minPrice, maxPrice]);
 
   useEffect(() => {
     loadWines();
-  }, [searchTerm, selectedVariety, selectedVintage, selectedWinery, minPrice, maxPrice, limit, offset, showAll]);
+  }, [searchTerm, selectedVariety, selectedVintage, selectedWinery, minPrice, maxPrice, limit, cursors, showAll]);
+
+  const filterParams = () => {
+    const params = {};
+    if (searchTerm) params.search = searchTerm;
+    if (selectedVariety) params.varieties = selectedVariety;
+    if (selectedVintage) params.vintage = selectedVintage;
+    if (selectedWinery) params.winery_id = selectedWinery;
+    if (minPrice) params.min_price = parseFloat(minPrice);
+    if (maxPrice) params.max_price = parseFloat(maxPrice);
+    return params;
+  };
 
-  const loadData = async () => {
+  // One request for the dropdown options and their counts. The options come
+  // from the unfiltered catalog (first load); counts follow the filters.
+  const loadFacets = async () => {
     try {
-      const [varietiesData, vintagesData, wineriesData] = await Promise.all([
-        getVarieties(),
-        getVintages(),
-        getWineries()
-      ]);
-      setVarieties(varietiesData.varieties?.map(v => v.name) || []);
-      setVintages(vintagesData.vintages?.map(v => v.year) || []);
-      setWineries(wineriesData.wineries || []);
+      const params = filterParams();
+      const data = await getFacets(params);
+      if (Object.keys(params).length === 0) {
+        setVarieties(data.varieties?.map(v => v.name) || []);
+        setVintages(data.vintages?.map(v => v.year) || []);
+        setWineries(data.wineries || []);
+      }
+      setFacetCounts({
+        varieties: Object.fromEntries((data.varieties || []).map(v => [v.name, v.count])),
+        vintages: Object.fromEntries((data.vintages || []).map(v => [v.year, v.count])),
+        wineries: Object.fromEntries((data.wineries || []).map(w => [w.id, w.count])),
+      });
     } catch (error) {
       console.error('Error loading filter data:', error);
     }
   };
 
+  // " (12)" after an option - left off in a dropdown whose own filter is set,
+  // where every other option would read 0
+  const countLabel = (facet, value, selected) => {
+    if (!facetCounts || selected) return '';
+    return ` (${facetCounts[facet][value] || 0})`;
+  };
+
   const loadWines = async () => {
     setLoading(true);
     console.log('Loading wines with:', { limit: showAll ? 1000 : limit, offset: showAll ? 0 : offset, showAll });
     try {
       const params = {
+        ...filterParams(),
         limit: showAll ? 1000 : limit,
-        skip: showAll ? 0 : offset,
       };
-
-      if (searchTerm) params.search = searchTerm;
-      if (selectedVariety) params.variety = selectedVariety;
-      if (selectedVintage) params.vintage = selectedVintage;
-      if (selectedWinery) params.winery_id = selectedWinery;
-      if (minPrice) params.min_price = parseFloat(minPrice);
-      if (maxPrice) params.max_price = parseFloat(maxPrice);
+      const cursor = cursors[cursors.length - 1];
+      if (!showAll && cursor) params.cursor = cursor;
 
       const data = await getWines(params);
       setWines(data.wines || []);
       setTotalWines(data.total || 0);
+      setNextCursor(data.next_cursor || null);
     } catch (error) {
       console.error('Error loading wines:', error);
     } finally {
@@ -75,32 +136,33 @@ export default function WinesPage() {
 
   const handleShowAll = () => {
     setShowAll(true);
-    setOffset(0);
+    setCursors([null]);
   };
 
   const handleNext = () => {
-    if (offset + limit < totalWines) {
-      setOffset(offset + limit);
+    if (nextCursor) {
+      setCursors([...cursors, nextCursor]);
       setShowAll(false);
       window.scrollTo({ top: 0, behavior: 'smooth' });
     }
   };
 
   const handlePrevious = () => {
-    if (offset > 0) {
-      setOffset(Math.max(0, offset - limit));
+    if (cursors.length > 1) {
+      setCursors(cursors.slice(0, -1));
       setShowAll(false);
       window.scrollTo({ top: 0, behavior: 'smooth' });
     }
   };
 
   const handleResetPagination = () => {
-    setOffset(0);
+    setCursors([null]);
     setShowAll(false);
   };
 
   const clearFilters = () => {
     setSearchTerm('');
+    setSearchInput('');
     setSelectedVariety('');
     setSelectedVintage('');
     setSelectedWinery('');
@@ -149,13 +211,18 @@ export default function WinesPage() {
                 <input
                   type="text"
                   placeholder="Wine name..."
-                  value={searchTerm}
-                  onChange={(e) => {
-                    setSearchTerm(e.target.value);
-                    handleResetPagination();
-                  }}
+                  value={searchInput}
+                  onChange={(e) => setSearchInput(e.target.value)}
+                  list="wine-search-suggestions"
                   className="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-wine-burgundy"
                 />
+                <datalist id="wine-search-suggestions">
+                  {suggestions.map((s) => (
+                    <option key={`${s.kind}-${s.text}`} value={s.text}>
+                      {s.kind}
+                    </option>
+                  ))}
+                </datalist>
               </div>
 
               {/* Winery Filter */}
@@ -176,7 +243,7 @@ export default function WinesPage() {
                     .sort((a, b) => a.name.localeCompare(b.name))
                     .map((winery) => (
                       <option key={winery.id} value={winery.id}>
-                        {winery.name}
+                        {winery.name}{countLabel('wineries', winery.id, selectedWinery)}
                       </option>
                     ))}
                 </select>
@@ -198,7 +265,7 @@ export default function WinesPage() {
                   <option value="">All Varieties</option>
                   {varieties.map((variety) => (
                     <option key={variety} value={variety}>
-                      {variety}
+                      {variety}{countLabel('varieties', variety, selectedVariety)}
                     </option>
                   ))}
                 </select>
@@ -220,7 +287,7 @@ export default function WinesPage() {
                   <option value="">All Vintages</option>
                   {vintages.map((vintage) => (
                     <option key={vintage} value={vintage}>
-                      {vintage}
+                      {vintage}{countLabel('vintages', vintage, selectedVintage)}
                     </option>
                   ))}
                 </select>
@@ -291,9 +358,9 @@ export default function WinesPage() {
                     
                     <button
                       onClick={handleNext}
-                      disabled={offset + limit >= totalWines}
+                      disabled={!nextCursor}
                       className={`px-4 py-2 rounded-md transition-colors ${
-                        offset + limit >= totalWines
+                        !nextCursor
                           ? 'bg-gray-300 text-gray-500 cursor-not-allowed'
                           : 'bg-wine-burgundy text-white hover:bg-wine-deep-red'
                       }`}
@@ -307,7 +374,7 @@ export default function WinesPage() {
                   <button
                     onClick={() => {
                       setShowAll(false);
-                      setOffset(0);
+                      setCursors([null]);
                     }}
                     className="px-4 py-2 bg-wine-burgundy text-white rounded-md hover:bg-wine-deep-red transition-colors"
                   >
@@ -381,9 +448,9 @@ export default function WinesPage() {
                       
                       <button
                         onClick={handleNext}
-                        disabled={offset + limit >= totalWines}
+                        disabled={!nextCursor}
                         className={`px-4 py-2 rounded-md transition-colors ${
-                          offset + limit >= totalWines
+                          !nextCursor
                             ? 'bg-gray-300 text-gray-500 cursor-not-allowed'
                             : 'bg-wine-burgundy text-white hover:bg-wine-deep-red'
                         }`}
@@ -397,7 +464,7 @@ export default function WinesPage() {
                     <button
                       onClick={() => {
                         setShowAll(false);
-                        setOffset(0);
+                        setCursors([null]);
                         window.scrollTo({ top: 0, behavior: 'smooth' });
                       }}
                       className="px-4 py-2 bg-wine-burgundy text-white rounded-md hover:bg-wine-deep-red transition-colors"
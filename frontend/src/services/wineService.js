@@ -1,3 +1,4 @@
+import axios from 'axios'
 import api from './api'
 
 /**
@@ -43,3 +44,24 @@ export const getVintages = async () => {
     throw error
   }
 }
+
+export const getFacets = async (params = {}) => {
+  try {
+    const response = await api.get('/wines/facets', { params })
+    return response.data
+  } catch (error) {
+    console.error('Error fetching facets:', error)
+    throw error
+  }
+}
+
+export const getSuggestions = async (q, limit = 8, signal) => {
+  try {
+    const response = await api.get('/search/suggest', { params: { q, limit }, signal })
+    return response.data
+  } catch (error) {
+    // Aborted because a newer keystroke superseded it - not an error
+    if (!axios.isCancel(error)) console.error('Error fetching suggestions:', error)
+    throw error
+  }
+}